@@ -8,10 +8,22 @@ from flask_cors import CORS
 from dotenv import load_dotenv
 import spotipy
 from spotipy.oauth2 import SpotifyOAuth, SpotifyClientCredentials
+import importlib.util
 import requests
 from functools import wraps
 import yt_dlp
 
+# The Spotify -> YouTube mapping is shared with the bot. It only needs the standard library, so it is
+# loaded from its file: importing the utils package would pull in the bot, and putting utils/ on
+# sys.path would let its modules shadow other top-level names
+_track_mapping_spec = importlib.util.spec_from_file_location(
+    'track_mapping',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'utils', 'track_mapping.py')
+)
+_track_mapping_module = importlib.util.module_from_spec(_track_mapping_spec)
+_track_mapping_spec.loader.exec_module(_track_mapping_module)
+TrackMapping = _track_mapping_module.TrackMapping
+
 # Load environment variables
 load_dotenv()
 
@@ -50,6 +62,9 @@ client_credentials = SpotifyClientCredentials(
 )
 sp_client = spotipy.Spotify(client_credentials_manager=client_credentials)
 
+# Spotify tracks already matched to a YouTube video (by the bot or by this backend)
+track_mapping = TrackMapping()
+
 def require_auth(f):
     """Decorator to require authentication"""
     @wraps(f)
@@ -114,6 +129,7 @@ def get_youtube_stream(query):
             
             return {
                 'url': stream_url,
+                'video_id': info.get('id'),
                 'title': info.get('title'),
                 'duration': info.get('duration'),
                 'thumbnail': info.get('thumbnail')
@@ -233,8 +249,14 @@ def get_stream():
     if not track_id and not query:
         return jsonify({'error': 'Either track_id or query is required'}), 400
     
+    # A track matched before goes straight to its video, without Spotify or YouTube searches
+    isrc = None
+    mapped = track_mapping.lookup(spotify_id=track_id) if track_id else None
+    if mapped:
+        query = f"https://www.youtube.com/watch?v={mapped['video_id']}"
+
     # Try to get track info from Spotify first
-    if track_id:
+    elif track_id:
         try:
             token_info = session.get('token_info')
             if token_info:
@@ -243,7 +265,12 @@ def get_stream():
                 sp = sp_client
             
             track = sp.track(track_id)
-            query = f"{track['name']} {' '.join([artist['name'] for artist in track['artists']])}"
+            isrc = track.get('external_ids', {}).get('isrc')
+            mapped = track_mapping.lookup(isrc=isrc) if isrc else None
+            if mapped:
+                query = f"https://www.youtube.com/watch?v={mapped['video_id']}"
+            else:
+                query = f"{track['name']} {' '.join([artist['name'] for artist in track['artists']])}"
         except Exception as e:
             # If Spotify fails, try YouTube directly with the query
             print(f"Spotify lookup failed: {e}, falling back to YouTube")
@@ -252,6 +279,8 @@ def get_stream():
     if query:
         stream_info = get_youtube_stream(query)
         if stream_info:
+            if track_id and stream_info.get('video_id'):
+                track_mapping.store(track_id, stream_info['video_id'], isrc, stream_info['title'], stream_info['duration'])
             return jsonify(stream_info)
         else:
             return jsonify({'error': 'Could not find stream'}), 404
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Benchmark discord.py's thread-per-player AudioPlayer against the multiplexed
+AudioScheduler with simulated streams (no network, no FFmpeg).
+
+Reports OS thread count, context switches and per-stream packet jitter
+(mean absolute deviation from the 20 ms send interval).
+
+Usage: python benchmarks/bench_audio_scheduler.py [streams ...] [--seconds N] [--engines thread multiplexed]
+"""
+
+import os
+import sys
+import asyncio
+import argparse
+import resource
+import threading
+import time
+
+# Add the project directory to Python path (parent directory)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import discord
+from discord.player import AudioPlayer
+from utils.audio_scheduler import AudioScheduler, FRAME_LENGTH
+
+class FakeOpusSource(discord.AudioSource):
+    """Endless source of pre-encoded frames"""
+
+    FRAME = b'\xfc' + b'\x00' * 159
+
+    def read(self):
+        return self.FRAME
+
+    def is_opus(self):
+        return True
+
+class FakeWebSocket:
+    async def speak(self, state):
+        return None
+
+class FakeVoiceClient:
+    """Records send times to measure jitter, instead of sending UDP packets"""
+
+    timeout = 60
+
+    def __init__(self, loop):
+        self.ws = FakeWebSocket()
+        self.client = type('FakeClient', (), {'loop': loop})()
+        self._player = None
+        self.packets = 0
+        self.deviation_total = 0.0
+        self._last_send = None
+
+    def is_connected(self):
+        return True
+
+    def is_playing(self):
+        return self._player is not None and self._player.is_playing()
+
+    def send_audio_packet(self, data, *, encode=True):
+        now = time.perf_counter()
+        if self._last_send is not None:
+            self.deviation_total += abs((now - self._last_send) - FRAME_LENGTH)
+        self._last_send = now
+        self.packets += 1
+
+def context_switches():
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_nvcsw + usage.ru_nivcsw
+
+def run_engine(engine, streams, seconds, loop):
+    """Run `streams` simulated players for `seconds` and collect metrics"""
+    clients = [FakeVoiceClient(loop) for _ in range(streams)]
+    players = []
+    threads_before = threading.active_count()
+    switches_before = context_switches()
+
+    if engine == 'thread':
+        for client in clients:
+            player = AudioPlayer(FakeOpusSource(), client)
+            client._player = player
+            player.start()
+            players.append(player)
+    else:
+        scheduler = AudioScheduler()
+        for client in clients:
+            players.append(scheduler.play(client, FakeOpusSource()))
+
+    time.sleep(seconds)
+    threads_during = threading.active_count() - threads_before
+    switches = context_switches() - switches_before
+
+    for player in players:
+        player.stop()
+    if engine == 'thread':
+        for player in players:
+            player.join()
+    else:
+        time.sleep(FRAME_LENGTH * 3)
+
+    packets = sum(client.packets for client in clients)
+    intervals = sum(max(0, client.packets - 1) for client in clients)
+    jitter = sum(client.deviation_total for client in clients) / max(1, intervals)
+    expected = streams * seconds / FRAME_LENGTH
+
+    return {
+        'threads': threads_during,
+        'context_switches': switches,
+        'jitter_ms': jitter * 1000,
+        'delivery': packets / expected if expected else 0.0
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('streams', nargs='*', type=int, default=[100, 1000, 5000])
+    parser.add_argument('--seconds', type=float, default=5.0)
+    parser.add_argument('--engines', nargs='+', choices=['thread', 'multiplexed'], default=['thread', 'multiplexed'])
+    args = parser.parse_args()
+
+    # Speaking-state updates are scheduled onto an event loop, so run one in the background
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+
+    print("🎵 Audio Engine Benchmark")
+    print("=" * 78)
+    print(f"{'streams':>8} {'engine':>12} {'threads':>8} {'ctx switches':>13} {'jitter ms':>10} {'delivered':>10}")
+
+    for streams in args.streams:
+        for engine in args.engines:
+            try:
+                result = run_engine(engine, streams, args.seconds, loop)
+            except RuntimeError as e:
+                # Typically "can't start new thread" at high stream counts
+                print(f"{streams:>8} {engine:>12}  failed: {e}")
+                continue
+            print(
+                f"{streams:>8} {engine:>12} {result['threads']:>8} {result['context_switches']:>13} "
+                f"{result['jitter_ms']:>10.3f} {result['delivery']:>9.1%}"
+            )
+
+if __name__ == "__main__":
+    main()
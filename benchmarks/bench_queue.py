@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Benchmark the IndexedQueue against collections.deque for the queue operations
+the bot performs: positional insert/remove/move/jump, shuffle, reading a page
+of the queue and popping the next song.
+
+Usage: python benchmarks/bench_queue.py [sizes ...] [--ops N]
+"""
+
+import os
+import sys
+import argparse
+import random
+import time
+from collections import deque
+
+# Add the project directory to Python path (parent directory)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.indexed_queue import IndexedQueue
+
+def deque_move(queue, source, destination):
+    item = queue[source]
+    del queue[source]
+    queue.insert(destination, item)
+
+def deque_jump(queue, index):
+    return [queue.popleft() for _ in range(index)]
+
+OPERATIONS = {
+    # name: (deque version, IndexedQueue version), each called as fn(queue, rng)
+    'insert': (
+        lambda q, rng: q.insert(rng.randrange(len(q)), -1),
+        lambda q, rng: q.insert(rng.randrange(len(q)), -1),
+    ),
+    'remove': (
+        lambda q, rng: (q.insert(len(q) // 2, -1), q.remove(-1)),
+        lambda q, rng: (q.insert(len(q) // 2, -1), q.pop(len(q) // 2)),
+    ),
+    'move': (
+        lambda q, rng: deque_move(q, rng.randrange(len(q)), rng.randrange(len(q))),
+        lambda q, rng: q.move(rng.randrange(len(q)), rng.randrange(len(q))),
+    ),
+    'jump': (
+        lambda q, rng: deque_jump(q, len(q) // 2),
+        lambda q, rng: q.jump(len(q) // 2),
+    ),
+    'page': (
+        lambda q, rng: list(q)[len(q) // 2:len(q) // 2 + 10],
+        lambda q, rng: list(q[len(q) // 2:len(q) // 2 + 10]),
+    ),
+    'popleft+append': (
+        lambda q, rng: q.append(q.popleft()),
+        lambda q, rng: q.append(q.popleft()),
+    ),
+    'shuffle': (
+        lambda q, rng: rng.shuffle(q),
+        lambda q, rng: q.shuffle(rng),
+    ),
+}
+
+# Untimed steps that put back what an operation took out, so the size stays the same
+RESTORE = {
+    'jump': lambda q, dropped: q.extend(dropped),
+}
+
+def time_operation(factory, name, operation, size, ops):
+    """Microseconds per operation"""
+    queue = factory(range(size))
+    rng = random.Random(size)
+    restore = RESTORE.get(name)
+    # Shuffles are O(n) for both, fewer runs keep large sizes quick
+    runs = max(1, ops // 100) if name == 'shuffle' else ops
+    elapsed = 0
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = operation(queue, rng)
+        elapsed += time.perf_counter() - start
+        if restore:
+            restore(queue, result)
+    return elapsed / runs * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark IndexedQueue against deque")
+    parser.add_argument('sizes', nargs='*', type=int, default=[100, 10_000, 100_000])
+    parser.add_argument('--ops', type=int, default=1000, help="Operations per measurement")
+    args = parser.parse_args()
+
+    print(f"{'operation':<16}{'size':>9}{'deque µs':>12}{'indexed µs':>12}{'speedup':>10}")
+    for name, (deque_op, indexed_op) in OPERATIONS.items():
+        for size in args.sizes:
+            deque_time = time_operation(deque, name, deque_op, size, args.ops)
+            indexed_time = time_operation(IndexedQueue, name, indexed_op, size, args.ops)
+            print(f"{name:<16}{size:>9}{deque_time:>12.2f}{indexed_time:>12.2f}{deque_time / indexed_time:>9.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Measure the memory held by a queue of songs, comparing the old dict-based
+Song layout with the current slotted one.
+
+Requesters are simulated with a plain object carrying a handful of attributes;
+with the old layout every queued song keeps its member object reachable, while
+the slotted Song keeps only the integer id.
+
+Usage: python benchmarks/bench_song_memory.py [count]
+"""
+
+import os
+import sys
+import gc
+import tracemalloc
+
+# Add the project directory to Python path (parent directory)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.indexed_queue import IndexedQueue
+from utils.streaming_spotify import Song, song_duration
+
+class LegacySong:
+    """The Song class before it used __slots__"""
+
+    def __init__(self, title, url, duration, thumbnail=None, requester=None):
+        self.title = title
+        self.url = url
+        self.duration = duration
+        self.thumbnail = thumbnail
+        self.requester = requester
+        self.stream_url = None
+        self.stream_expires = None
+
+class FakeMember:
+    """Rough stand-in for discord.Member (the real one also holds roles, activities, the user, ...)"""
+
+    def __init__(self, user_id):
+        self.id = user_id
+        self.name = f"user{user_id}"
+        self.display_name = self.name
+        self.joined_at = None
+        self._roles = [user_id, user_id + 1]
+        self.activities = ()
+
+def video_id(i):
+    return f"{i:011d}"[-11:]
+
+def measure(song_class, count, members):
+    """Bytes allocated for `count` queued songs (members are created up front and not counted)"""
+    gc.collect()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    queue = IndexedQueue(weight=song_duration)
+    for i in range(count):
+        queue.append(song_class(
+            title=f"Artist {i % 500} - Track title number {i}",
+            url=f"https://www.youtube.com/watch?v={video_id(i)}",
+            duration=180 + i % 120,
+            thumbnail=f"https://i.ytimg.com/vi/{video_id(i)}/hqdefault.jpg",
+            requester=members[i % len(members)]
+        ))
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return after - before, queue
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    # The same few members request everything in a typical guild
+    members = [FakeMember(100_000_000_000_000_000 + i) for i in range(20)]
+
+    legacy_bytes, legacy_queue = measure(LegacySong, count, members)
+    legacy_members = sys.getsizeof(members[0]) + sys.getsizeof(members[0].__dict__)
+    del legacy_queue
+    slotted_bytes, _ = measure(Song, count, members)
+
+    print(f"Memory for {count:,} queued songs:")
+    print(f"  dict-based Song: {legacy_bytes / 1024:10.1f} KB ({legacy_bytes / count:6.1f} B/song)"
+          f" + keeps {len(members)} member objects (~{legacy_members} B each, plus caches) alive")
+    print(f"  slotted Song:    {slotted_bytes / 1024:10.1f} KB ({slotted_bytes / count:6.1f} B/song), members not referenced")
+    print(f"  saved:           {(legacy_bytes - slotted_bytes) / 1024:10.1f} KB ({1 - slotted_bytes / legacy_bytes:.0%})")
+
+if __name__ == "__main__":
+    main()
@@ -3,7 +3,12 @@ import os
 import asyncio
 from discord.ext import commands
 from dotenv import load_dotenv
-from utils.streaming_spotify import MusicPlayer
+from utils.streaming_spotify import MusicPlayer, set_requester_resolver
+from utils.ffmpeg_supervisor import ffmpeg_supervisor
+from utils.persistence import StateStore, PERSISTENCE_ENABLED
+from utils.handoff import HandoffServer, request_handoff, HANDOFF_SOCKET
+from utils.stream_refresher import StreamRefresher, STREAM_REFRESH_ENABLED
+from utils.suggestions import suggestion_index
 from commands import setup_commands
 
 # Load environment variables
@@ -23,6 +28,11 @@ bot = commands.Bot(command_prefix='!', intents=intents)
 # Create the music player instance
 music_player = MusicPlayer()
 
+# Songs store only the requester's id, displayed through the bot's user cache
+set_requester_resolver(bot.get_user)
+
+state_restored = False
+
 # Setup all commands from the commands folder BEFORE bot starts
 command_count = setup_commands(bot, music_player)
 
@@ -42,6 +52,14 @@ async def leave_check_loop():
             print(f"Error in leave check loop: {e}")
             await asyncio.sleep(5)  # Wait a bit before retrying
 
+@bot.event
+async def setup_hook():
+    """Called once before the bot connects to Discord"""
+    # Persist queues and playback positions so a restart resumes where it stopped
+    # (opened here rather than at import, so importing bot never creates the database)
+    if PERSISTENCE_ENABLED:
+        music_player.attach_state_store(StateStore().start())
+
 @bot.event
 async def on_ready():
     """Called when the bot is ready and connected to Discord"""
@@ -58,6 +76,37 @@ async def on_ready():
     # Start the leave check loop
     bot.loop.create_task(leave_check_loop())
 
+    # Start the FFmpeg supervisor (resource sampling and orphan reaping)
+    bot.loop.create_task(ffmpeg_supervisor.monitor_loop())
+
+    # Keep stream URLs of upcoming songs resolved so they don't expire in long queues
+    if STREAM_REFRESH_ENABLED:
+        bot.loop.create_task(StreamRefresher(music_player).run())
+
+    # Take over from a running process or restore saved state (only once, on_ready also fires on reconnects)
+    global state_restored
+    if not state_restored:
+        state_restored = True
+        # Play history behind /play autocomplete
+        await suggestion_index.load()
+
+        handed_over = None
+        if HANDOFF_SOCKET:
+            try:
+                handed_over = await request_handoff(music_player, bot)
+            except Exception as e:
+                print(f"Failed to take over from the previous process: {e}")
+            # Be ready to hand over to the next deploy in turn
+            await HandoffServer(music_player, on_complete=bot.close).start()
+
+        if music_player.state_store:
+            bot.loop.create_task(music_player.state_save_loop())
+            if handed_over is None:
+                try:
+                    await music_player.restore_state(bot)
+                except Exception as e:
+                    print(f"Failed to restore saved player state: {e}")
+
 @bot.event
 async def on_voice_state_update(member, before, after):
     """Called when a user's voice state changes (join/leave/mute/etc.)"""
@@ -27,12 +27,16 @@ class MusicControlView(ui.View):
             await interaction.followup.send("❌ No song is currently playing!", ephemeral=True)
             return
 
+        # In repeat-queue mode a skipped song stays in the rotation
+        if self.music_player.loop_mode == 'queue' and self.music_player.current_song:
+            self.music_player.enqueue(self.music_player.current_song)
+
         # Check if there's a next song in queue
         if self.music_player.queue:
             next_song = self.music_player.queue.popleft()
 
             # Stop current song
-            self.music_player.voice_client.stop()
+            self.music_player.stop_playback()
             self.music_player.is_playing = False
             self.music_player.current_song = None
 
@@ -41,7 +45,7 @@ class MusicControlView(ui.View):
             await interaction.followup.send(f"⏭️ Skipped! Now playing: **{next_song.title}**", ephemeral=True)
         else:
             # No next song, just stop
-            self.music_player.voice_client.stop()
+            self.music_player.stop_playback()
             self.music_player.is_playing = False
             self.music_player.current_song = None
             await interaction.followup.send("⏭️ Skipped! No more songs in queue.", ephemeral=True)
@@ -158,7 +162,7 @@ async def control_command(interaction: discord.Interaction, music_player):
     # Add queue info
     queue_info = music_player.get_queue_info()
     if queue_info['queue']:
-        queue_text = f"📋 **{len(queue_info['queue'])}** song(s) in queue"
+        queue_text = f"📋 **{len(queue_info['queue'])}** song(s) in queue ({music_player.format_time(queue_info['total_duration'])} total)"
         if len(queue_info['queue']) <= 3:
             queue_text += "\n" + "\n".join([f"• {song.title}" for song in queue_info['queue'][:3]])
         embed.add_field(
@@ -0,0 +1,31 @@
+import discord
+from discord import app_commands
+
+async def dedupe_command(interaction: discord.Interaction, enabled: bool, music_player):
+    """Turn duplicate skipping on or off"""
+    enabled = music_player.set_dedupe(enabled)
+
+    if enabled:
+        description = "🧹 Songs that are already in the queue will be skipped"
+    else:
+        description = "➡️ The same song can be queued more than once"
+
+    embed = discord.Embed(
+        title="🧹 Dedupe " + ("On" if enabled else "Off"),
+        description=description,
+        color=discord.Color.blue()
+    )
+
+    await interaction.response.send_message(embed=embed)
+
+def setup_command(bot, music_player):
+    """Setup the dedupe command"""
+
+    @bot.tree.command(name="dedupe", description="Skip songs that are already in the queue")
+    @app_commands.describe(mode="on skips songs that are already queued, off allows duplicates")
+    @app_commands.choices(mode=[
+        app_commands.Choice(name="On", value="on"),
+        app_commands.Choice(name="Off", value="off")
+    ])
+    async def dedupe(interaction: discord.Interaction, mode: app_commands.Choice[str]):
+        await dedupe_command(interaction, mode.value == "on", music_player)
@@ -0,0 +1,38 @@
+import discord
+from discord import app_commands
+
+async def fairshare_command(interaction: discord.Interaction, enabled: bool, music_player):
+    """Turn fair-share queueing on or off"""
+    enabled = music_player.set_fair_share(enabled)
+
+    if enabled:
+        description = "⚖️ Requesters now take turns: new songs are queued round-robin by who requested them"
+    else:
+        description = "➡️ Songs are queued in the order they are added"
+
+    embed = discord.Embed(
+        title="⚖️ Fair Share " + ("On" if enabled else "Off"),
+        description=description,
+        color=discord.Color.blue()
+    )
+
+    if enabled and music_player.queue:
+        embed.add_field(
+            name="Up Next",
+            value=f"**{music_player.queue[0].title}**",
+            inline=False
+        )
+
+    await interaction.response.send_message(embed=embed)
+
+def setup_command(bot, music_player):
+    """Setup the fairshare command"""
+
+    @bot.tree.command(name="fairshare", description="Let requesters take turns instead of first come, first served")
+    @app_commands.describe(mode="on interleaves the queue by requester, off is first come, first served")
+    @app_commands.choices(mode=[
+        app_commands.Choice(name="On", value="on"),
+        app_commands.Choice(name="Off", value="off")
+    ])
+    async def fairshare(interaction: discord.Interaction, mode: app_commands.Choice[str]):
+        await fairshare_command(interaction, mode.value == "on", music_player)
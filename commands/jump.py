@@ -0,0 +1,42 @@
+import discord
+
+async def jump_command(interaction: discord.Interaction, position: int, music_player):
+    """Skip ahead to a position in the queue"""
+    queue_length = len(music_player.queue)
+
+    if not 1 <= position <= queue_length:
+        await interaction.response.send_message(f"❌ Position must be between 1 and {queue_length}!" if queue_length else "📋 Queue is empty!")
+        return
+
+    # In repeat-queue mode the current song stays in the rotation
+    if music_player.loop_mode == 'queue' and music_player.current_song:
+        target = music_player.queue[position - 1]
+        music_player.enqueue(music_player.current_song)
+        # In fair-share mode it may have been queued ahead of the target
+        position = music_player.queue.index(target) + 1
+
+    passed = music_player.jump_in_queue(position)
+    next_song = music_player.queue.popleft()
+
+    # Stop current song
+    music_player.stop_playback()
+    music_player.is_playing = False
+    music_player.current_song = None
+
+    # Play the song we jumped to
+    await music_player.stream_and_play(interaction, next_song)
+
+    embed = discord.Embed(
+        title="⏩ Jumped in Queue",
+        description=f"Now playing: **{next_song.title}**\nSkipped {len(passed)} song(s)",
+        color=discord.Color.blue()
+    )
+
+    await interaction.response.send_message(embed=embed)
+
+def setup_command(bot, music_player):
+    """Setup the jump command"""
+
+    @bot.tree.command(name="jump", description="Skip ahead to a position in the queue")
+    async def jump(interaction: discord.Interaction, position: int):
+        await jump_command(interaction, position, music_player)
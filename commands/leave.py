@@ -1,4 +1,5 @@
 import discord
+from utils.ffmpeg_supervisor import ffmpeg_supervisor
 
 async def leave_command(interaction: discord.Interaction, music_player):
     """Make the bot leave the voice channel"""
@@ -6,10 +7,12 @@ async def leave_command(interaction: discord.Interaction, music_player):
         await interaction.response.send_message("❌ I'm not connected to any voice channel!")
         return
 
+    ffmpeg_supervisor.clear_active_source(music_player.voice_client.guild.id)
     await music_player.voice_client.disconnect()
     music_player.voice_client = None
     music_player.is_playing = False
     music_player.current_song = None
+    music_player.save_state()
 
     await interaction.response.send_message("👋 Left the voice channel")
 
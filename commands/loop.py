@@ -0,0 +1,47 @@
+import discord
+from discord import app_commands
+
+LOOP_DESCRIPTIONS = {
+    'off': "➡️ Repeat is off",
+    'one': "🔂 Repeating the current song",
+    'queue': "🔁 Repeating the whole queue"
+}
+
+async def loop_command(interaction: discord.Interaction, mode: str, music_player):
+    """Set the repeat mode"""
+    old_mode = music_player.loop_mode
+    new_mode = music_player.set_loop_mode(mode)
+
+    embed = discord.Embed(
+        title="🔁 Repeat Mode Changed",
+        description=LOOP_DESCRIPTIONS[new_mode],
+        color=discord.Color.blue()
+    )
+
+    embed.add_field(
+        name="Mode",
+        value=f"{old_mode} → {new_mode}",
+        inline=False
+    )
+
+    if new_mode == 'one' and music_player.current_song:
+        embed.add_field(
+            name="Now Repeating",
+            value=f"**{music_player.current_song.title}**",
+            inline=False
+        )
+
+    await interaction.response.send_message(embed=embed)
+
+def setup_command(bot, music_player):
+    """Setup the loop command"""
+
+    @bot.tree.command(name="loop", description="Repeat the current song or the whole queue")
+    @app_commands.describe(mode="off, one (current song) or queue")
+    @app_commands.choices(mode=[
+        app_commands.Choice(name="Off", value="off"),
+        app_commands.Choice(name="Current song", value="one"),
+        app_commands.Choice(name="Whole queue", value="queue")
+    ])
+    async def loop(interaction: discord.Interaction, mode: app_commands.Choice[str]):
+        await loop_command(interaction, mode.value, music_player)
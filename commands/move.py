@@ -0,0 +1,26 @@
+import discord
+
+async def move_command(interaction: discord.Interaction, source: int, destination: int, music_player):
+    """Move a song to another position in the queue"""
+    queue_length = len(music_player.queue)
+
+    if not (1 <= source <= queue_length and 1 <= destination <= queue_length):
+        await interaction.response.send_message(f"❌ Positions must be between 1 and {queue_length}!" if queue_length else "📋 Queue is empty!")
+        return
+
+    song = music_player.move_in_queue(source, destination)
+
+    embed = discord.Embed(
+        title="↕️ Moved in Queue",
+        description=f"**{song.title}**\nPosition: {source} → {destination}",
+        color=discord.Color.blue()
+    )
+
+    await interaction.response.send_message(embed=embed)
+
+def setup_command(bot, music_player):
+    """Setup the move command"""
+
+    @bot.tree.command(name="move", description="Move a song to another position in the queue")
+    async def move(interaction: discord.Interaction, source: int, destination: int):
+        await move_command(interaction, source, destination, music_player)
@@ -1,5 +1,11 @@
+import asyncio
 import discord
+from discord import app_commands
 from utils.streaming_spotify import Song
+from utils.streaming_youtube import youtube_streamer, extract_playlist_id
+from utils.spotify_client import SpotifyError, parse_spotify_url, track_info
+from utils.bulk_import import BulkImport
+from utils.suggestions import suggestion_index
 
 async def play_command(interaction: discord.Interaction, query: str, music_player):
     """Play music from Spotify URL, YouTube URL, or search query"""
@@ -8,51 +14,164 @@ async def play_command(interaction: discord.Interaction, query: str, music_playe
     # Store the text channel for future notifications
     music_player.last_text_channel = interaction.channel
 
+    # Playlists and albums are imported track by track
+    spotify_link = parse_spotify_url(query)
+    if spotify_link and spotify_link[0] != 'track':
+        await import_spotify_collection(interaction, music_player, *spotify_link)
+        return
+
+    # YouTube playlists are listed in one go and queued without resolving each video
+    playlist_id = extract_playlist_id(query)
+    if playlist_id:
+        await import_youtube_playlist(interaction, music_player, playlist_id)
+        return
+
     # Check if it's a Spotify URL
-    if 'spotify.com' in query:
+    if spotify_link or 'spotify.com' in query:
         spotify_info = await music_player.extract_spotify_info(query)
         if spotify_info:
-            search_query = spotify_info['query']
             await interaction.followup.send(f"🔍 Searching YouTube for: **{spotify_info['title']}**")
+            # Tracks matched before are played without searching again
+            video_info = await music_player.resolve_spotify_track(spotify_info)
         else:
             await interaction.followup.send("❌ Invalid Spotify URL or failed to extract track information")
             return
     else:
-        search_query = query
-
-    # Search YouTube
-    video_info = await music_player.search_youtube(search_query)
+        # Search YouTube
+        video_info = await music_player.search_youtube(query)
 
     if not video_info:
         await interaction.followup.send("❌ No results found for your search")
         return
 
-    # Create song object
-    song = Song(
-        title=video_info['title'],
-        url=video_info['url'],
-        duration=video_info['duration'],
-        thumbnail=video_info.get('thumbnail'),
-        requester=interaction.user
-    )
+    await play_or_queue(interaction, Song.from_video_info(video_info, interaction.user), music_player)
+
+async def resolve_query(music_player, query):
+    """Find the video for a Spotify track link, YouTube URL or search query, without sending any messages"""
+    if parse_spotify_url(query) or 'spotify.com' in query:
+        spotify_info = await music_player.extract_spotify_info(query)
+        return await music_player.resolve_spotify_track(spotify_info) if spotify_info else None
+    return await music_player.search_youtube(query)
 
-    # If not playing anything, play immediately. Otherwise add to queue
+async def play_or_queue(interaction: discord.Interaction, song, music_player):
+    """Play a song right away if nothing is playing, otherwise add it to the queue.
+    Returns whether the song actually started or was queued."""
     if not music_player.is_playing:
-        # Play the song
+        # Play the song (stream_and_play reports its own failures)
         await music_player.stream_and_play(interaction, song)
+        return music_player.current_song is song
     else:
-        # Add to queue
-        music_player.queue.append(song)
+        # Add to queue (at the requester's turn in fair-share mode)
+        position = music_player.enqueue(song)
+        if position is None:
+            embed = discord.Embed(
+                title="⏭️ Already in Queue",
+                description=f"**{song.title}** is already queued, so it was skipped (dedupe is on)",
+                color=discord.Color.orange()
+            )
+            await interaction.followup.send(embed=embed)
+            return False
         embed = discord.Embed(
             title="➕ Added to Queue",
-            description=f"**{song.title}**\nPosition: {len(music_player.queue)}",
+            description=f"**{song.title}**\nPosition: {position}",
             color=discord.Color.green()
         )
         await interaction.followup.send(embed=embed)
+        return True
+
+async def import_spotify_collection(interaction: discord.Interaction, music_player, kind, collection_id):
+    """Play the first track of a Spotify playlist or album now and queue the rest in the background"""
+    if not music_player.spotify:
+        await interaction.followup.send("❌ Importing Spotify playlists and albums needs Spotify API credentials")
+        return
+
+    tracks = music_player.spotify.collection_tracks(kind, collection_id)
+
+    async def resolve(track):
+        # Playlist pages carry full track objects, so later lookups of these tracks are cache hits
+        music_player.spotify_metadata.remember(track)
+        return await music_player.resolve_spotify_track(track_info(track))
+
+    def make_song(video_info):
+        return Song.from_video_info(video_info, interaction.user)
+
+    # Start playing as soon as one track is found instead of waiting for the whole list
+    first = None
+    not_found = []
+    try:
+        async for track in tracks:
+            first = await resolve(track)
+            if first:
+                break
+            not_found.append(track)
+    except SpotifyError as e:
+        print(f"Failed to load Spotify {kind}: {e}")
+        await interaction.followup.send(f"❌ Couldn't load that Spotify {kind}")
+        return
+
+    if not first:
+        await interaction.followup.send(f"❌ No tracks of that Spotify {kind} were found on YouTube")
+        return
+
+    await play_or_queue(interaction, make_song(first), music_player)
+    await interaction.followup.send(f"📥 Importing the rest of the {kind} in the background...")
+
+    bulk_import = BulkImport(music_player, resolve, make_song)
+    bulk_import.failed.extend(not_found)
+    task = asyncio.create_task(_finish_import(bulk_import, tracks, interaction.channel, kind))
+    _running_imports.add(task)
+    task.add_done_callback(_running_imports.discard)
+
+async def import_youtube_playlist(interaction: discord.Interaction, music_player, playlist_id):
+    """Queue every video of a YouTube playlist; stream URLs are resolved when each one comes up"""
+    playlist = await youtube_streamer.extract_playlist(playlist_id)
+    if not playlist or not playlist['entries']:
+        await interaction.followup.send("❌ Couldn't load that YouTube playlist, or it has no playable videos")
+        return
+
+    songs = [Song.from_video_info(entry, interaction.user) for entry in playlist['entries']]
+    await play_or_queue(interaction, songs[0], music_player)
+
+    queued, duplicates = music_player.enqueue_many(songs[1:])
+
+    description = f"**{playlist['title']}**\n{queued} more song(s) queued"
+    if duplicates:
+        description += f", {duplicates} already in the queue"
+    embed = discord.Embed(
+        title="📥 Playlist Added",
+        description=description,
+        color=discord.Color.green()
+    )
+    await interaction.followup.send(embed=embed)
+
+# Background imports, referenced until they finish
+_running_imports = set()
+
+async def _finish_import(bulk_import, tracks, channel, kind):
+    """Resolve the remaining tracks and report the outcome"""
+    try:
+        await bulk_import.run(tracks)
+        message = f"✅ Finished importing the {kind}: {bulk_import.summary()}"
+    except Exception as e:
+        print(f"Error importing Spotify {kind}: {e}")
+        message = f"⚠️ Importing the {kind} stopped early: {bulk_import.summary()}"
+    if channel:
+        try:
+            await channel.send(message)
+        except Exception as e:
+            print(f"Failed to report import result: {e}")
 
 def setup_command(bot, music_player):
     """Setup the play command"""
 
-    @bot.tree.command(name="play", description="Play music from Spotify URL, YouTube URL, or search query")
+    @bot.tree.command(name="play", description="Play a Spotify track, playlist or album, a YouTube video or playlist, or a search query")
     async def play(interaction: discord.Interaction, query: str):
-        await play_command(interaction, query, music_player)
\ No newline at end of file
+        await play_command(interaction, query, music_player)
+
+    @play.autocomplete('query')
+    async def play_autocomplete(interaction: discord.Interaction, current: str):
+        # Answered from the local index: a live search can't finish within Discord's deadline
+        return [
+            app_commands.Choice(name=suggestion['title'][:100], value=suggestion['value'])
+            for suggestion in suggestion_index.suggest(current, interaction.guild_id)
+        ]
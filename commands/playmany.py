@@ -0,0 +1,149 @@
+import os
+import csv
+import time
+import discord
+from discord import app_commands
+from utils.streaming_spotify import Song
+from utils.bulk_import import BulkImport, BULK_IMPORT_CONCURRENCY
+from commands.play import resolve_query, play_or_queue
+
+PLAYMANY_MAX_SONGS = int(os.getenv('PLAYMANY_MAX_SONGS', '200'))
+PLAYMANY_MAX_FILE_BYTES = 256 * 1024
+PLAYMANY_EXTENSIONS = ('.txt', '.m3u', '.m3u8', '.csv')
+PROGRESS_INTERVAL = 2  # Seconds between progress message edits
+
+def _parse_m3u(text):
+    """Stream URLs as they are, local files by their #EXTINF title (or file name)"""
+    queries = []
+    title = None
+    for line in text.splitlines():
+        line = line.strip()
+        if line.startswith('#EXTINF'):
+            title = line.split(',', 1)[1].strip() if ',' in line else None
+        elif line and not line.startswith('#'):
+            if line.startswith(('http://', 'https://')):
+                queries.append(line)
+            else:
+                queries.append(title or os.path.splitext(os.path.basename(line.replace('\\', '/')))[0])
+            title = None
+    return queries
+
+def _parse_csv(text):
+    """Title and artist columns when there is a header naming them, otherwise the first column"""
+    rows = [row for row in csv.reader(text.splitlines()) if any(cell.strip() for cell in row)]
+    if not rows:
+        return []
+
+    header = [cell.strip().lower() for cell in rows[0]]
+    title_column = next((header.index(name) for name in ('title', 'track', 'track name', 'song', 'name') if name in header), None)
+    if title_column is None:
+        return [row[0].strip() for row in rows if row[0].strip()]
+
+    artist_column = next((header.index(name) for name in ('artist', 'artist name', 'artists') if name in header), None)
+    queries = []
+    for row in rows[1:]:
+        title = row[title_column].strip() if title_column < len(row) else ''
+        artist = row[artist_column].strip() if artist_column is not None and artist_column < len(row) else ''
+        if title:
+            queries.append(f"{title} {artist}".strip())
+    return queries
+
+def parse_song_list(text, filename=''):
+    """Split a song list into queries: one per line, or per entry of an .m3u or .csv file"""
+    extension = os.path.splitext(filename.lower())[1]
+    if extension in ('.m3u', '.m3u8'):
+        return _parse_m3u(text)
+    if extension == '.csv':
+        return _parse_csv(text)
+    return [line.strip() for line in text.splitlines() if line.strip() and not line.strip().startswith('#')]
+
+class ProgressMessage:
+    """Edits one message with import progress, at most every PROGRESS_INTERVAL seconds"""
+
+    def __init__(self, message, total):
+        self.message = message
+        self.total = total
+        self.last_edit = 0
+
+    async def update(self, bulk_import, final=False):
+        if not final and time.monotonic() - self.last_edit < PROGRESS_INTERVAL:
+            return
+        self.last_edit = time.monotonic()
+        if final:
+            content = f"✅ Added {bulk_import.done}/{self.total} songs: {bulk_import.summary()}"
+        else:
+            content = f"📥 Resolving songs... {bulk_import.done}/{self.total} ({bulk_import.summary()})"
+        try:
+            await self.message.edit(content=content)
+        except discord.HTTPException as e:
+            print(f"Failed to update progress message: {e}")
+
+async def playmany_command(interaction: discord.Interaction, music_player, queries: str = None, file: discord.Attachment = None):
+    """Queue many songs at once from a list of queries or a text file"""
+    await interaction.response.defer()
+
+    # Store the text channel for future notifications
+    music_player.last_text_channel = interaction.channel
+
+    idle = not music_player.is_playing and music_player.current_song is None
+    if idle and not interaction.user.voice:
+        await interaction.followup.send("❌ You must be in a voice channel to play music!")
+        return
+
+    entries = parse_song_list(queries.replace(';', '\n')) if queries else []
+    if file is not None:
+        if not file.filename.lower().endswith(PLAYMANY_EXTENSIONS):
+            await interaction.followup.send("❌ Please attach a .txt, .m3u or .csv file")
+            return
+        if file.size > PLAYMANY_MAX_FILE_BYTES:
+            await interaction.followup.send("❌ That file is too large")
+            return
+        entries += parse_song_list((await file.read()).decode('utf-8', errors='replace'), file.filename)
+
+    if not entries:
+        await interaction.followup.send("❌ No songs given! Separate queries with `;` or attach a .txt, .m3u or .csv file")
+        return
+
+    truncated = len(entries) > PLAYMANY_MAX_SONGS
+    entries = entries[:PLAYMANY_MAX_SONGS]
+    total = len(entries)
+    message = await interaction.followup.send(f"📥 Resolving songs... 0/{total}", wait=True)
+    progress = ProgressMessage(message, total)
+
+    async def resolve(query):
+        return await resolve_query(music_player, query)
+
+    def make_song(video_info):
+        return Song.from_video_info(video_info, interaction.user)
+
+    bulk_import = BulkImport(music_player, resolve, make_song, BULK_IMPORT_CONCURRENCY)
+    remaining = iter(entries)
+
+    # With nothing playing, start with the first song that resolves instead of waiting for the whole list
+    if idle:
+        for query in remaining:
+            video_info = await resolve(query)
+            bulk_import.done += 1
+            if video_info:
+                if await play_or_queue(interaction, make_song(video_info), music_player):
+                    bulk_import.queued += 1
+                else:
+                    bulk_import.skipped.append(query)
+                break
+            bulk_import.failed.append(query)
+
+    await bulk_import.run(remaining, progress.update)
+    await progress.update(bulk_import, final=True)
+    if truncated:
+        await interaction.followup.send(f"⚠️ Only the first {PLAYMANY_MAX_SONGS} songs were added")
+
+def setup_command(bot, music_player):
+    """Setup the playmany command"""
+
+    @bot.tree.command(name="playmany", description="Queue many songs at once from a list or a .txt/.m3u/.csv file")
+    @app_commands.describe(
+        queries="Songs separated by ; (search queries, YouTube or Spotify track links)",
+        file="A .txt (one song per line), .m3u or .csv song list"
+    )
+    async def playmany(interaction: discord.Interaction, queries: str = None, file: discord.Attachment = None):
+        await playmany_command(interaction, music_player, queries, file)
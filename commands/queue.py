@@ -1,12 +1,38 @@
 import discord
+from discord import ui
 
-async def queue_command(interaction: discord.Interaction, music_player):
-    """Show the current music queue"""
-    queue_info = music_player.get_queue_info()
+PAGE_SIZE = 10
 
-    if not queue_info['current'] and not queue_info['queue']:
-        await interaction.response.send_message("📋 Queue is empty! Add some songs with `/play`")
-        return
+class QueuePageCache:
+    """Rendered queue pages, reused until the queue changes (keyed by the queue's version)"""
+
+    def __init__(self, music_player):
+        self.music_player = music_player
+        self.version = None
+        self.pages = {}  # page number -> list of (line, duration)
+
+    def page_count(self):
+        return max(1, -(-len(self.music_player.queue) // PAGE_SIZE))
+
+    def get_page(self, page):
+        """Get the entry lines of one page, rendering only that page from a slice view"""
+        queue = self.music_player.queue
+        if self.version != queue.version:
+            self.pages.clear()
+            self.version = queue.version
+
+        if page not in self.pages:
+            start = page * PAGE_SIZE
+            entries = []
+            for i, song in enumerate(queue[start:start + PAGE_SIZE], start + 1):
+                duration = f"{song.duration // 60}:{song.duration % 60:02d}"
+                entries.append((f"{i}. **{song.title}** - {duration} - {song.requester.mention}", song.duration))
+            self.pages[page] = entries
+        return self.pages[page]
+
+def build_queue_embed(music_player, page_cache, page):
+    """Build the /queue embed for one page"""
+    queue_info = music_player.get_queue_info()
 
     embed = discord.Embed(
         title="🎵 Music Queue",
@@ -25,19 +51,19 @@ async def queue_command(interaction: discord.Interaction, music_player):
 
     # Queue
     if queue_info['queue']:
+        # ETAs depend on the playback position, so they are added to the cached lines at render time
+        starts_in = music_player.time_until(page * PAGE_SIZE + 1)
         queue_text = ""
-        for i, song in enumerate(queue_info['queue'][:10], 1):  # Show first 10 songs
-            duration = f"{song.duration // 60}:{song.duration % 60:02d}"
-            queue_text += f"{i}. **{song.title}** - {duration} - {song.requester.mention}\n"
-
-        if len(queue_info['queue']) > 10:
-            queue_text += f"... and {len(queue_info['queue']) - 10} more songs"
+        for line, duration in page_cache.get_page(page):
+            queue_text += f"{line} - in {music_player.format_time(starts_in)}\n"
+            starts_in += duration
 
         embed.add_field(
-            name=f"📋 Up Next ({len(queue_info['queue'])} songs)",
+            name=f"📋 Up Next ({len(queue_info['queue'])} songs, {music_player.format_time(queue_info['total_duration'])} total)",
             value=queue_text,
             inline=False
         )
+        embed.set_footer(text=f"Page {page + 1}/{page_cache.page_count()}")
     else:
         embed.add_field(
             name="📋 Up Next",
@@ -45,11 +71,85 @@ async def queue_command(interaction: discord.Interaction, music_player):
             inline=False
         )
 
-    await interaction.response.send_message(embed=embed)
+    return embed
+
+class JumpToPageModal(ui.Modal, title="Jump to Page"):
+    """Asks for a page number"""
+
+    page = ui.TextInput(label="Page", placeholder="Page number", max_length=6)
+
+    def __init__(self, paginator):
+        super().__init__()
+        self.paginator = paginator
+
+    async def on_submit(self, interaction: discord.Interaction):
+        try:
+            page = int(self.page.value) - 1
+        except ValueError:
+            await interaction.response.send_message("❌ Please enter a page number!", ephemeral=True)
+            return
+        await self.paginator.show_page(interaction, page)
+
+class QueuePaginator(ui.View):
+    """Previous/next/jump buttons for browsing long queues"""
+
+    def __init__(self, music_player, page_cache, timeout=300):  # 5 minute timeout
+        super().__init__(timeout=timeout)
+        self.music_player = music_player
+        self.page_cache = page_cache
+        self.page = 0
+
+    def _update_buttons(self):
+        page_count = self.page_cache.page_count()
+        self.previous.disabled = self.page <= 0
+        self.next.disabled = self.page >= page_count - 1
+        self.jump.disabled = page_count <= 1
+
+    async def show_page(self, interaction, page):
+        """Switch to a page (clamped to the queue's current length) and edit the message"""
+        self.page = max(0, min(page, self.page_cache.page_count() - 1))
+        self._update_buttons()
+        embed = build_queue_embed(self.music_player, self.page_cache, self.page)
+        await interaction.response.edit_message(embed=embed, view=self)
+
+    @ui.button(label="Previous", style=discord.ButtonStyle.secondary, emoji="◀️")
+    async def previous(self, interaction: discord.Interaction, button: ui.Button):
+        """Show the previous page"""
+        await self.show_page(interaction, self.page - 1)
+
+    @ui.button(label="Jump", style=discord.ButtonStyle.primary, emoji="🔢")
+    async def jump(self, interaction: discord.Interaction, button: ui.Button):
+        """Ask for a page to jump to"""
+        await interaction.response.send_modal(JumpToPageModal(self))
+
+    @ui.button(label="Next", style=discord.ButtonStyle.secondary, emoji="▶️")
+    async def next(self, interaction: discord.Interaction, button: ui.Button):
+        """Show the next page"""
+        await self.show_page(interaction, self.page + 1)
+
+async def queue_command(interaction: discord.Interaction, music_player, page_cache=None):
+    """Show the current music queue"""
+    queue_info = music_player.get_queue_info()
+
+    if not queue_info['current'] and not queue_info['queue']:
+        await interaction.response.send_message("📋 Queue is empty! Add some songs with `/play`")
+        return
+
+    page_cache = page_cache or QueuePageCache(music_player)
+    embed = build_queue_embed(music_player, page_cache, 0)
+
+    if page_cache.page_count() > 1:
+        view = QueuePaginator(music_player, page_cache)
+        view._update_buttons()
+        await interaction.response.send_message(embed=embed, view=view)
+    else:
+        await interaction.response.send_message(embed=embed)
 
 def setup_command(bot, music_player):
     """Setup the queue command"""
+    # Shared by every /queue message, so pages are rendered once per queue change
+    page_cache = QueuePageCache(music_player)
 
     @bot.tree.command(name="queue", description="Show the current music queue")
     async def queue(interaction: discord.Interaction):
-        await queue_command(interaction, music_player)
\ No newline at end of file
+        await queue_command(interaction, music_player, page_cache)
@@ -0,0 +1,26 @@
+import discord
+
+async def remove_command(interaction: discord.Interaction, position: int, music_player):
+    """Remove a song from the queue"""
+    queue_length = len(music_player.queue)
+
+    if not 1 <= position <= queue_length:
+        await interaction.response.send_message(f"❌ Position must be between 1 and {queue_length}!" if queue_length else "📋 Queue is empty!")
+        return
+
+    song = music_player.remove_from_queue(position)
+
+    embed = discord.Embed(
+        title="🗑️ Removed from Queue",
+        description=f"**{song.title}** (was #{position})",
+        color=discord.Color.red()
+    )
+
+    await interaction.response.send_message(embed=embed)
+
+def setup_command(bot, music_player):
+    """Setup the remove command"""
+
+    @bot.tree.command(name="remove", description="Remove a song from the queue by position")
+    async def remove(interaction: discord.Interaction, position: int):
+        await remove_command(interaction, position, music_player)
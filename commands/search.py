@@ -0,0 +1,123 @@
+import os
+import time
+import discord
+from discord import ui
+from utils.streaming_spotify import Song
+from utils.streaming_youtube import youtube_streamer
+from utils.suggestions import suggestion_index
+from commands.play import play_or_queue
+
+SEARCH_RESULTS = 5
+SEARCH_CACHE_TTL = int(os.getenv('SEARCH_CACHE_TTL', '300'))  # Seconds search results are reused
+
+class SearchCache:
+    """Flat search results by normalized query, kept for SEARCH_CACHE_TTL seconds"""
+
+    def __init__(self, ttl=SEARCH_CACHE_TTL, max_entries=256):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.entries = {}  # query -> (expires_at, results)
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(query):
+        return ' '.join(query.lower().split())
+
+    def get(self, query):
+        entry = self.entries.get(self.key(query))
+        if entry and entry[0] > time.monotonic():
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        return None
+
+    def put(self, query, results):
+        now = time.monotonic()
+        if len(self.entries) >= self.max_entries:
+            # Drop expired entries, then the oldest ones if still full
+            self.entries = {key: entry for key, entry in self.entries.items() if entry[0] > now}
+            while len(self.entries) >= self.max_entries:
+                del self.entries[next(iter(self.entries))]
+        self.entries[self.key(query)] = (now + self.ttl, results)
+
+async def search_results(query, cache):
+    """Top search results for a query, from the cache or one flat search"""
+    results = cache.get(query)
+    if results is None:
+        results = await youtube_streamer.search_candidates(query, SEARCH_RESULTS)
+        if results:
+            cache.put(query, results)
+            suggestion_index.add_results(results)  # Offered by /play autocomplete from now on
+    return results or []
+
+def format_duration(seconds):
+    seconds = int(seconds or 0)
+    return f"{seconds // 60}:{seconds % 60:02d}" if seconds else "live"
+
+class SearchResultSelect(ui.Select):
+    """One option per search result"""
+
+    def __init__(self, results):
+        options = [
+            discord.SelectOption(
+                label=(result.get('title') or result['id'])[:100],
+                description=f"{result.get('channel') or result.get('uploader') or 'YouTube'} · {format_duration(result.get('duration'))}"[:100],
+                value=str(i)
+            )
+            for i, result in enumerate(results)
+        ]
+        super().__init__(placeholder="Choose a result to play", options=options)
+
+    async def callback(self, interaction: discord.Interaction):
+        await self.view.choose(interaction, int(self.values[0]))
+
+class SearchResultsView(ui.View):
+    """Select menu over the results of one search"""
+
+    def __init__(self, music_player, results, timeout=120):
+        super().__init__(timeout=timeout)
+        self.music_player = music_player
+        self.results = results
+        self.add_item(SearchResultSelect(results))
+
+    async def choose(self, interaction: discord.Interaction, index):
+        """Fully extract only the chosen result, then play or queue it"""
+        await interaction.response.defer()
+        self.music_player.last_text_channel = interaction.channel
+        result = self.results[index]
+
+        video_info = await youtube_streamer.extract_video(f"https://www.youtube.com/watch?v={result['id']}")
+        if not video_info:
+            await interaction.followup.send("❌ That video can't be played, please choose another one", ephemeral=True)
+            return
+
+        await play_or_queue(interaction, Song.from_video_info(video_info, interaction.user), self.music_player)
+
+async def search_command(interaction: discord.Interaction, query: str, music_player, cache):
+    """Show the top search results to choose from"""
+    await interaction.response.defer()
+
+    results = await search_results(query, cache)
+    if not results:
+        await interaction.followup.send("❌ No results found for your search")
+        return
+
+    embed = discord.Embed(
+        title=f"🔍 Results for: {query}"[:256],
+        description="\n".join(
+            f"{i}. **{result.get('title') or result['id']}** - {format_duration(result.get('duration'))}"
+            for i, result in enumerate(results, 1)
+        ),
+        color=discord.Color.blue()
+    )
+    await interaction.followup.send(embed=embed, view=SearchResultsView(music_player, results))
+
+def setup_command(bot, music_player):
+    """Setup the search command"""
+    # Shared by every /search, so repeating a search within the TTL costs nothing
+    cache = SearchCache()
+
+    @bot.tree.command(name="search", description="Search YouTube and choose which result to play")
+    async def search(interaction: discord.Interaction, query: str):
+        await search_command(interaction, query, music_player, cache)
@@ -0,0 +1,26 @@
+import discord
+
+async def shuffle_command(interaction: discord.Interaction, music_player):
+    """Shuffle the music queue"""
+    queue_length = len(music_player.queue)
+
+    if queue_length < 2:
+        await interaction.response.send_message("🔀 Not enough songs in the queue to shuffle!")
+        return
+
+    music_player.shuffle_queue()
+
+    embed = discord.Embed(
+        title="🔀 Queue Shuffled",
+        description=f"Shuffled {queue_length} song(s)\nUp next: **{music_player.queue[0].title}**",
+        color=discord.Color.blue()
+    )
+
+    await interaction.response.send_message(embed=embed)
+
+def setup_command(bot, music_player):
+    """Setup the shuffle command"""
+
+    @bot.tree.command(name="shuffle", description="Shuffle the music queue")
+    async def shuffle(interaction: discord.Interaction):
+        await shuffle_command(interaction, music_player)
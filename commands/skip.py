@@ -6,12 +6,16 @@ async def skip_command(interaction: discord.Interaction, music_player):
         await interaction.response.send_message("❌ No song is currently playing!")
         return
 
+    # In repeat-queue mode a skipped song stays in the rotation
+    if music_player.loop_mode == 'queue' and music_player.current_song:
+        music_player.enqueue(music_player.current_song)
+
     # Check if there's a next song in queue
     if music_player.queue:
         next_song = music_player.queue.popleft()
 
         # Stop current song
-        music_player.voice_client.stop()
+        music_player.stop_playback()
         music_player.is_playing = False
         music_player.current_song = None
 
@@ -25,7 +29,7 @@ async def skip_command(interaction: discord.Interaction, music_player):
         )
     else:
         # No next song, just stop
-        music_player.voice_client.stop()
+        music_player.stop_playback()
         music_player.is_playing = False
         music_player.current_song = None
 
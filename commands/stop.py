@@ -6,7 +6,7 @@ async def stop_command(interaction: discord.Interaction, music_player):
         await interaction.response.send_message("❌ Not connected to a voice channel!")
         return
 
-    music_player.voice_client.stop()
+    music_player.stop_playback()
     music_player.is_playing = False
     music_player.current_song = None
     music_player.queue.clear()
@@ -35,6 +35,25 @@ def main():
         ("test_streaming.py", "Streaming Functionality Tests"),
         ("test_audio.py", "Audio Pipeline Tests"),
         ("test_discord_bot.py", "Discord Bot Functionality Tests"),
+        ("test_ffmpeg_supervisor.py", "FFmpeg Supervisor Tests"),
+        ("test_audio_scheduler.py", "Audio Scheduler Tests"),
+        ("test_broadcast.py", "Shared Decode Broadcast Tests"),
+        ("test_audio_cache.py", "Audio Cache Tests"),
+        ("test_indexed_queue.py", "Indexed Queue Tests"),
+        ("test_persistence.py", "Persistence Tests"),
+        ("test_handoff.py", "Process Handoff Tests"),
+        ("test_fair_queue.py", "Fair-Share Queue Tests"),
+        ("test_stream_refresher.py", "Stream Refresh Tests"),
+        ("test_http_client.py", "HTTP Client Tests"),
+        ("test_spotify_client.py", "Spotify Client Tests"),
+        ("test_spotify_metadata.py", "Spotify Metadata Tests"),
+        ("test_track_mapping.py", "Track Mapping Tests"),
+        ("test_track_matching.py", "Track Matching Tests"),
+        ("test_bulk_import.py", "Bulk Import Tests"),
+        ("test_youtube_playlist.py", "YouTube Playlist Tests"),
+        ("test_playmany.py", "Playmany Command Tests"),
+        ("test_search.py", "Search Command Tests"),
+        ("test_suggestions.py", "Play Suggestion Tests"),
     ]
 
     results = []
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Test the on-disk Opus cache (Ogg packet reading, seeking, eviction and population).
+Builds small Ogg files by hand, so FFmpeg and network access are not needed.
+"""
+
+import os
+import sys
+import json
+import asyncio
+import threading
+import struct
+import tempfile
+import unittest
+
+# Add the project directory to Python path (parent directory)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import utils.audio_cache as audio_cache_module
+from utils.audio_cache import AudioCache, CachedOpusSource
+
+def ogg_page(packets, granule, flags=0):
+    """Build one Ogg page holding complete packets (CRC is left as zero)"""
+    table = b''
+    for packet in packets:
+        table += b'\xff' * (len(packet) // 255) + bytes([len(packet) % 255])
+    header = struct.pack('<4sBBqIIIB', b'OggS', 0, flags, granule, 1, 0, 0, len(table))
+    return header + table + b''.join(packets)
+
+def write_opus_file(path, seconds):
+    """Write an Ogg/Opus-like file with one page per second of 20 ms packets"""
+    with open(path, 'wb') as f:
+        f.write(ogg_page([b'OpusHead' + b'\x00' * 11], 0, flags=0x02))
+        f.write(ogg_page([b'OpusTags' + b'\x00' * 8], 0))
+        frame = 0
+        for second in range(seconds):
+            packets = []
+            for _ in range(50):
+                packets.append(struct.pack('>I', frame) + b'\x00' * 300)  # Spans two lacing values
+                frame += 1
+            f.write(ogg_page(packets, frame * 960))
+
+class TestAudioCache(unittest.TestCase):
+    """Test cases for the on-disk Opus cache"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.directory = self.temp_dir.name
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_cached_source_reads_and_seeks(self):
+        """Packets come out in order without headers, and seeking lands on the right frame"""
+        print("🧪 Testing cached Opus source...")
+
+        path = os.path.join(self.directory, 'track.opus')
+        write_opus_file(path, seconds=5)
+
+        source = CachedOpusSource(path)
+        frames = []
+        while True:
+            packet = source.read()
+            if not packet:
+                break
+            frames.append(struct.unpack('>I', packet[:4])[0])
+        source.cleanup()
+        self.assertEqual(frames, list(range(250)))
+
+        source = CachedOpusSource(path, start_time=2.5)
+        self.assertEqual(struct.unpack('>I', source.read()[:4])[0], 125)
+        source.cleanup()
+
+        source = CachedOpusSource(path, start_time=60)
+        self.assertEqual(source.read(), b'')
+        source.cleanup()
+        print("✅ Cached Opus source works")
+
+    def test_eviction_policies(self):
+        """LRU evicts the oldest play, LFU the least played"""
+        print("🧪 Testing cache eviction...")
+
+        for policy, expected in (('lru', 'aaaaaaaaaaa'), ('lfu', 'bbbbbbbbbbb')):
+            cache = AudioCache(directory=self.directory, max_bytes=250, policy=policy)
+            for video_id, plays, last_played in (('aaaaaaaaaaa', 9, 1), ('bbbbbbbbbbb', 1, 2), ('ccccccccccc', 5, 3)):
+                with open(cache.path_for(video_id), 'wb') as f:
+                    f.write(b'\x00' * 100)
+                cache.entries[video_id] = {'size': 100, 'plays': plays, 'last_played': last_played}
+
+            self.assertEqual(cache.evict(), [expected])
+            self.assertFalse(os.path.exists(cache.path_for(expected)))
+            self.assertLessEqual(cache.total_bytes, 250)
+            for video_id in list(cache.entries):
+                os.remove(cache.path_for(video_id))
+        print("✅ Cache eviction works")
+
+    def test_population_after_min_plays(self):
+        """A track is downloaded in the background once it reaches the play threshold"""
+        print("🧪 Testing background population...")
+
+        cache = AudioCache(directory=self.directory, min_plays=3)
+        downloads = []
+
+        def fake_download(video_id, url):
+            downloads.append(url)
+            write_opus_file(cache.path_for(video_id), seconds=1)
+            return os.path.getsize(cache.path_for(video_id))
+
+        cache._download = fake_download
+
+        async def run():
+            for _ in range(2):
+                cache.record_play('dQw4w9WgXcQ')
+            await asyncio.sleep(0.05)
+            self.assertFalse(cache.is_cached('dQw4w9WgXcQ'))
+
+            cache.record_play('dQw4w9WgXcQ')
+            cache.record_play('dQw4w9WgXcQ')  # Already pending, no second download
+            for _ in range(20):
+                await asyncio.sleep(0.05)
+                if cache.is_cached('dQw4w9WgXcQ'):
+                    break
+
+        asyncio.run(run())
+        self.assertTrue(cache.is_cached('dQw4w9WgXcQ'))
+        self.assertEqual(downloads, ['https://www.youtube.com/watch?v=dQw4w9WgXcQ'])
+
+        # The index survives a restart
+        reloaded = AudioCache(directory=self.directory)
+        self.assertTrue(reloaded.is_cached('dQw4w9WgXcQ'))
+        source = reloaded.open_source('dQw4w9WgXcQ')
+        self.assertTrue(source.read())
+        source.cleanup()
+        self.assertEqual(reloaded.get_stats()['hit_rate'], 1.0)
+        print("✅ Background population works")
+
+    def test_play_counts_are_bounded(self):
+        """Only the most recently played videos keep a count, and saving happens off the event loop"""
+        print("🧪 Testing play count bounds...")
+
+        cache = AudioCache(directory=self.directory, min_plays=100, max_tracked=3)
+        cache.entries['aaaaaaaaaaa'] = {'size': 100, 'plays': 7, 'last_played': 1}
+        saved_in = []
+        save_index = cache._save_index
+
+        def recording_save():
+            saved_in.append(threading.current_thread())
+            save_index()
+        cache._save_index = recording_save
+
+        async def run():
+            for video_id in ('aaaaaaaaaaa', 'bbbbbbbbbbb', 'ccccccccccc', 'bbbbbbbbbbb', 'ddddddddddd', 'eeeeeeeeeee'):
+                cache.record_play(video_id)
+            for i in range(15):
+                cache.record_play(f'{i:011d}')
+
+        asyncio.run(run())
+        self.assertEqual(len(cache.plays), 3)
+        self.assertEqual(list(cache.plays), ['00000000012', '00000000013', '00000000014'])
+        self.assertEqual(cache.entries['aaaaaaaaaaa']['plays'], 8)  # Cached videos keep their count
+
+        self.assertEqual(len(saved_in), 1)
+        self.assertIsNot(saved_in[0], threading.main_thread())
+        with open(cache._index_path, encoding='utf-8') as f:
+            self.assertEqual(len(json.load(f)['plays']), 3)
+        print("✅ Play counts are bounded")
+
+    def test_failed_download_leaves_no_partial_files(self):
+        """Partial files of a download that fails midway are removed"""
+        print("🧪 Testing failed download cleanup...")
+
+        cache = AudioCache(directory=self.directory)
+
+        class FailingYoutubeDL:
+            def __init__(self, options):
+                self.outtmpl = options['outtmpl']
+
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc):
+                return False
+
+            def download(self, urls):
+                with open(self.outtmpl % {'ext': 'webm'}, 'wb') as f:
+                    f.write(b'\x00' * 1024)
+                raise Exception("Connection reset")
+
+        original = audio_cache_module.yt_dlp.YoutubeDL
+        audio_cache_module.yt_dlp.YoutubeDL = FailingYoutubeDL
+        try:
+            with self.assertRaises(Exception):
+                cache._download('dQw4w9WgXcQ', 'https://www.youtube.com/watch?v=dQw4w9WgXcQ')
+        finally:
+            audio_cache_module.yt_dlp.YoutubeDL = original
+
+        self.assertEqual(os.listdir(self.directory), [])
+        print("✅ Failed download cleanup works")
+
+def main():
+    """Run audio cache tests"""
+    print("🎵 Audio Cache Test Suite")
+    print("=" * 50)
+
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestAudioCache)
+    result = unittest.TextTestRunner(verbosity=2).run(suite)
+
+    if result.wasSuccessful():
+        print("🎉 All audio cache tests passed!")
+    else:
+        print("⚠️  Some audio cache tests failed.")
+    return result.wasSuccessful()
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
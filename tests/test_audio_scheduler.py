@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Test the multiplexed audio scheduler with simulated voice clients.
+"""
+
+import os
+import sys
+import threading
+import unittest
+
+# Add the project directory to Python path (parent directory)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import discord
+from utils.audio_scheduler import AudioScheduler
+
+class FiniteOpusSource(discord.AudioSource):
+    """Source that yields a fixed number of frames"""
+
+    def __init__(self, frames):
+        self.remaining = frames
+        self.cleaned_up = False
+
+    def read(self):
+        if self.remaining <= 0:
+            return b''
+        self.remaining -= 1
+        return b'\xfc\x00'
+
+    def is_opus(self):
+        return True
+
+    def cleanup(self):
+        self.cleaned_up = True
+
+class FakeVoiceClient:
+    """Voice client stand-in that counts packets"""
+
+    timeout = 1
+
+    def __init__(self):
+        self._player = None
+        self.packets = 0
+        self.ws = None
+        self.client = None
+
+    def is_connected(self):
+        return True
+
+    def is_playing(self):
+        return self._player is not None and self._player.is_playing()
+
+    def is_paused(self):
+        return self._player is not None and self._player.is_paused()
+
+    def send_audio_packet(self, data, *, encode=True):
+        self.packets += 1
+
+class TestAudioScheduler(unittest.TestCase):
+    """Test cases for the shared-tick audio scheduler"""
+
+    def test_players_finish_and_call_after(self):
+        """Every player runs to completion on the shared threads and gets its after callback"""
+        print("🧪 Testing multiplexed playback...")
+
+        scheduler = AudioScheduler(threads=2)
+        done = threading.Event()
+        errors = []
+
+        def after(error):
+            errors.append(error)
+            if len(errors) == 10:
+                done.set()
+
+        clients = [FakeVoiceClient() for _ in range(10)]
+        sources = [FiniteOpusSource(5) for _ in clients]
+        for client, source in zip(clients, sources):
+            scheduler.play(client, source, after=after)
+            self.assertTrue(client.is_playing())
+
+        self.assertTrue(done.wait(timeout=5))
+        self.assertEqual(errors, [None] * 10)
+        self.assertEqual(scheduler.get_stats()['threads'], 2)
+        for client, source in zip(clients, sources):
+            # 5 audio frames followed by 5 frames of trailing silence
+            self.assertEqual(client.packets, 10)
+            self.assertFalse(client.is_playing())
+
+        print("✅ Multiplexed playback works")
+
+    def test_pause_resume_stop(self):
+        """Pausing keeps the player alive and stop ends it"""
+        print("🧪 Testing pause, resume and stop...")
+
+        scheduler = AudioScheduler(threads=1)
+        finished = threading.Event()
+        client = FakeVoiceClient()
+        source = FiniteOpusSource(10 ** 6)
+
+        scheduler.play(client, source, after=lambda error: finished.set())
+        with self.assertRaises(discord.ClientException):
+            scheduler.play(client, FiniteOpusSource(1))
+
+        client._player.pause(update_speaking=False)
+        self.assertTrue(client.is_paused())
+        client._player.resume(update_speaking=False)
+        self.assertTrue(client.is_playing())
+
+        client._player.stop()
+        self.assertTrue(finished.wait(timeout=5))
+        self.assertTrue(source.cleaned_up)
+
+        print("✅ Pause, resume and stop work")
+
+def main():
+    """Run audio scheduler tests"""
+    print("🎵 Audio Scheduler Test Suite")
+    print("=" * 50)
+
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestAudioScheduler)
+    result = unittest.TextTestRunner(verbosity=2).run(suite)
+
+    if result.wasSuccessful():
+        print("🎉 All audio scheduler tests passed!")
+    else:
+        print("⚠️  Some audio scheduler tests failed.")
+    return result.wasSuccessful()
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Test the shared decode broadcast (fan-out, bounded buffering, underruns and reference counting).
+"""
+
+import os
+import sys
+import time
+import threading
+import unittest
+
+# Add the project directory to Python path (parent directory)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.broadcast import BroadcastHub, BroadcastRegistry
+
+class CountingUpstream:
+    """Upstream stand-in that yields numbered frames and counts reads"""
+
+    def __init__(self, frames):
+        self.total = frames
+        self.reads = 0
+        self.cleaned_up = False
+
+    def read(self):
+        if self.reads >= self.total:
+            return b''
+        self.reads += 1
+        return self.reads.to_bytes(4, 'big')
+
+    def cleanup(self):
+        self.cleaned_up = True
+
+def frame_number(data):
+    return int.from_bytes(data, 'big')
+
+class GatedUpstream:
+    """Upstream stand-in whose first read blocks until released, like a stalled FFmpeg pipe"""
+
+    def __init__(self):
+        self.release = threading.Event()
+
+    def read(self):
+        return b'\x01' if self.release.wait(5) else b''
+
+    def cleanup(self):
+        self.release.set()
+
+def make_hub(registry, frames, subscribers, **options):
+    """Register a hub directly, bypassing FFmpeg"""
+    upstream = CountingUpstream(frames)
+    hub = BroadcastHub('dQw4w9WgXcQ', 'https://stream.example', upstream, registry, **options)
+    hub.subscribers = subscribers
+    registry._hubs[hub.video_id] = hub
+    return hub, upstream
+
+class TestBroadcast(unittest.TestCase):
+    """Test cases for the shared decode broadcast"""
+
+    def test_fan_out_decodes_once(self):
+        """Two subscribers receive every frame while upstream is read once per frame"""
+        print("🧪 Testing broadcast fan-out...")
+
+        registry = BroadcastRegistry()
+        hub, upstream = make_hub(registry, frames=50, subscribers=2)
+        first, second = hub.attach(), hub.attach()
+
+        first_frames = [first.read() for _ in range(50)]
+        # Late joiner starts at frame 0
+        second_frames = [second.read() for _ in range(50)]
+
+        self.assertEqual(first_frames, second_frames)
+        self.assertEqual(upstream.reads, 50)
+        self.assertEqual(first.read(), b'')
+        self.assertEqual(second.read(), b'')
+        print("✅ Broadcast fan-out works")
+
+    def test_late_joiner_starts_at_first_frame(self):
+        """A guild joining after others started reading still gets the track from frame 0 off the same decode"""
+        print("🧪 Testing late joiners...")
+
+        registry = BroadcastRegistry()
+        hub, upstream = make_hub(registry, frames=500, subscribers=1, lookahead=20)
+        first = hub.attach()
+        first_frames = [first.read() for _ in range(200)]
+        time.sleep(0.02)
+
+        late = registry.subscribe_nowait(hub.video_id)
+        self.assertIsNotNone(late)
+        self.assertEqual(hub.subscribers, 2)
+        self.assertEqual([late.read() for _ in range(200)], first_frames)
+        self.assertEqual(frame_number(first_frames[0]), 1)
+
+        rest = [first.read() for _ in range(300)]
+        self.assertEqual([late.read() for _ in range(300)], rest)
+        self.assertEqual(upstream.reads, 500)
+        hub.close()
+        print("✅ Late joiners work")
+
+    def test_buffer_is_bounded(self):
+        """Past the history, frames every subscriber has read are dropped and decoding stays close to the furthest one"""
+        print("🧪 Testing broadcast buffering...")
+
+        registry = BroadcastRegistry()
+        hub, upstream = make_hub(registry, frames=1000, subscribers=2, lookahead=20, window=50, history=100)
+        leader, lagging = hub.attach(), hub.attach()
+
+        for _ in range(30):
+            leader.read()
+        lagging.read()
+        self.assertEqual(hub.base, 0)  # Still within the history: nothing is dropped
+        self.assertLessEqual(upstream.reads, 30 + 20 + 1)
+
+        # The lagging subscriber skips to what is still buffered once the history is exceeded
+        for _ in range(100):
+            leader.read()
+        self.assertLessEqual(len(hub.frames), 50)
+        self.assertIsNone(hub.attach())  # The first frame is gone: no more late joiners
+        self.assertGreater(frame_number(lagging.read()), 2)
+
+        for _ in range(100):
+            leader.read()
+            lagging.read()
+        self.assertEqual(hub.base, lagging.position)  # Everything the slowest subscriber read is gone
+        self.assertLessEqual(len(hub.frames), 50)
+        hub.close()
+        print("✅ Broadcast buffering works")
+
+    def test_underrun_does_not_block(self):
+        """Non-blocking subscribers get None until the reader thread has a frame"""
+        print("🧪 Testing broadcast underrun...")
+
+        upstream = GatedUpstream()
+        hub = BroadcastHub('dQw4w9WgXcQ', 'https://stream.example', upstream, BroadcastRegistry())
+        subscriber = hub.attach()
+        subscriber.blocking = False
+
+        self.assertIsNone(subscriber.read())
+        upstream.release.set()
+        deadline = time.time() + 2
+        data = None
+        while data is None and time.time() < deadline:
+            data = subscriber.read()
+            time.sleep(0.001)
+        self.assertEqual(data, b'\x01')
+        hub.close()
+        print("✅ Broadcast underrun works")
+
+    def test_reference_counting(self):
+        """The upstream is closed only when the last subscriber leaves"""
+        print("🧪 Testing broadcast reference counting...")
+
+        registry = BroadcastRegistry()
+        hub, upstream = make_hub(registry, frames=10, subscribers=2)
+        first, second = hub.attach(), hub.attach()
+
+        self.assertEqual(registry.get_stream_url(hub.video_id), 'https://stream.example')
+
+        first.cleanup()
+        first.cleanup()  # Cleanup is idempotent
+        self.assertFalse(upstream.cleaned_up)
+        self.assertEqual(registry.get_stats()['subscribers'], 1)
+
+        second.cleanup()
+        self.assertTrue(upstream.cleaned_up)
+        self.assertEqual(registry.get_stats()['hubs'], 0)
+        self.assertIsNone(registry.get_stream_url(hub.video_id))
+        print("✅ Broadcast reference counting works")
+
+def main():
+    """Run broadcast tests"""
+    print("🎵 Shared Decode Broadcast Test Suite")
+    print("=" * 50)
+
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestBroadcast)
+    result = unittest.TextTestRunner(verbosity=2).run(suite)
+
+    if result.wasSuccessful():
+        print("🎉 All broadcast tests passed!")
+    else:
+        print("⚠️  Some broadcast tests failed.")
+    return result.wasSuccessful()
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
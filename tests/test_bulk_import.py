@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Test bulk imports (bounded concurrent resolution, queueing in the original order).
+"""
+
+import os
+import sys
+import random
+import asyncio
+import unittest
+
+# Add the project directory to Python path (parent directory)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.bulk_import import BulkImport, resolve_in_order
+from utils.streaming_spotify import MusicPlayer, Song
+
+class TestBulkImport(unittest.TestCase):
+    """Test cases for bulk imports"""
+
+    def test_resolve_in_order(self):
+        """Results come back in source order while at most `concurrency` resolutions run"""
+        print("🧪 Testing ordered concurrent resolution...")
+
+        rng = random.Random(7)
+        running = 0
+        peak = 0
+
+        async def resolve(item):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(rng.random() * 0.01)
+            running -= 1
+            if item % 5 == 0:
+                raise RuntimeError("lookup failed")
+            return item * 10
+
+        async def source():
+            for i in range(1, 31):
+                yield i
+
+        async def run():
+            return [pair async for pair in resolve_in_order(source(), resolve, concurrency=4)]
+
+        results = asyncio.run(run())
+        self.assertEqual([item for item, _ in results], list(range(1, 31)))
+        self.assertEqual([result for _, result in results], [None if i % 5 == 0 else i * 10 for i in range(1, 31)])
+        self.assertLessEqual(peak, 4)
+        self.assertGreater(peak, 1)
+        print("✅ Ordered concurrent resolution works")
+
+    def test_bulk_import_queues_in_order(self):
+        """Found songs are queued in order, duplicates and misses are counted"""
+        print("🧪 Testing bulk import...")
+
+        player = MusicPlayer()
+        player.set_dedupe(True)
+        player.queue.append(Song("Already here", "https://www.youtube.com/watch?v=query000003", 60))
+
+        async def resolve(query):
+            await asyncio.sleep(0.001)
+            if query.endswith('7'):
+                return None
+            return {'title': query, 'url': f"https://www.youtube.com/watch?v={query}", 'duration': 60}
+
+        progress = []
+
+        async def on_progress(bulk):
+            progress.append(bulk.done)
+
+        bulk = BulkImport(player, resolve, Song.from_video_info, concurrency=3)
+        asyncio.run(bulk.run([f"query{i:06d}" for i in range(10)], on_progress))
+
+        self.assertEqual([song.title for song in player.queue][1:],
+                         [f"query{i:06d}" for i in range(10) if i not in (3, 7)])
+        self.assertEqual((bulk.queued, bulk.duplicates, bulk.failed), (8, 1, ["query000007"]))
+        self.assertEqual(progress, list(range(1, 11)))
+        self.assertEqual(bulk.summary(), "8 song(s) queued, 1 already in the queue, 1 not found")
+        print("✅ Bulk import queues songs in order")
+
+def main():
+    """Run bulk import tests"""
+    print("🎵 Bulk Import Test Suite")
+    print("=" * 50)
+
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestBulkImport)
+    result = unittest.TextTestRunner(verbosity=2).run(suite)
+
+    if result.wasSuccessful():
+        print("🎉 All bulk import tests passed!")
+    else:
+        print("⚠️  Some bulk import tests failed.")
+    return result.wasSuccessful()
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
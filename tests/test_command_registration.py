@@ -40,12 +40,12 @@ class TestCommandRegistration(unittest.TestCase):
         
         # Verify commands were loaded
         self.assertGreater(command_count, 0, "No commands were loaded")
-        self.assertEqual(command_count, 12, f"Expected 12 commands, got {command_count}")
+        self.assertEqual(command_count, 23, f"Expected 23 commands, got {command_count}")
         
         # Verify commands are in the tree
         tree_commands = self.bot.tree.get_commands()
-        self.assertEqual(len(tree_commands), 12, 
-                        f"Expected 12 commands in tree, got {len(tree_commands)}")
+        self.assertEqual(len(tree_commands), 23, 
+                        f"Expected 23 commands in tree, got {len(tree_commands)}")
         
         print(f"✅ All {command_count} commands successfully loaded into bot.tree")
 
@@ -59,7 +59,8 @@ class TestCommandRegistration(unittest.TestCase):
         # Expected command names
         expected_commands = {
             'play', 'pause', 'resume', 'skip', 'stop', 'backward',
-            'join', 'leave', 'volume', 'nowplaying', 'queue', 'clear'
+            'join', 'leave', 'volume', 'nowplaying', 'queue', 'clear',
+            'forward', 'control', 'loop', 'shuffle', 'remove', 'move', 'jump', 'fairshare', 'dedupe', 'playmany', 'search'
         }
         
         # Get actual command names
@@ -148,7 +149,7 @@ def main():
         print("🎉 All command registration tests passed!")
         print("\n✅ The fix is working correctly:")
         print("   - Commands are loaded into bot.tree before bot starts")
-        print("   - bot.tree.sync() will now register all 12 commands with Discord")
+        print("   - bot.tree.sync() will now register all 23 commands with Discord")
         print("   - Users will see slash commands when typing / in Discord")
         return True
     else:
@@ -257,6 +257,9 @@ class TestDiscordBot(unittest.TestCase):
             # Test that we can import bot.py functions
             import bot
 
+            # Importing must not open the player state database (that happens in setup_hook)
+            self.assertIsNone(bot.music_player.state_store)
+
             print("✅ All bot imports successful")
         except ImportError as e:
             self.fail(f"Import failed: {e}")
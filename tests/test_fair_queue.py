@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Test fair-share queue scheduling (round-robin placement, popping and rebuilding after edits).
+"""
+
+import os
+import sys
+import random
+import unittest
+
+# Add the project directory to Python path (parent directory)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.streaming_spotify import MusicPlayer, Song
+
+def song(requester, number):
+    return Song(f"{requester}{number}", f"url-{requester}{number}", 100, requester=requester)
+
+def titles(queue):
+    return [item.title for item in queue]
+
+class TestFairQueue(unittest.TestCase):
+    """Test cases for fair-share scheduling"""
+
+    def test_round_robin_placement(self):
+        """A big playlist from one requester does not block the others"""
+        print("🧪 Testing round-robin placement...")
+
+        player = MusicPlayer()
+        player.set_fair_share(True)
+        for i in range(5):
+            player.enqueue(song('A', i))
+        self.assertEqual(player.enqueue(song('B', 0)), 2)
+        self.assertEqual(player.enqueue(song('C', 0)), 3)
+        player.enqueue(song('B', 1))
+
+        self.assertEqual(titles(player.queue), ['A0', 'B0', 'C0', 'A1', 'B1', 'A2', 'A3', 'A4'])
+
+        # B played and comes back: their new song waits for A and C's turns
+        player.queue.popleft()
+        player.queue.popleft()
+        player.enqueue(song('B', 2))
+        self.assertEqual(titles(player.queue), ['C0', 'A1', 'B1', 'A2', 'B2', 'A3', 'A4'])
+        # ETAs follow the real play order
+        self.assertEqual(player.queue.weight_before(4), 400)
+        print("✅ Round-robin placement works")
+
+    def test_matches_naive_model(self):
+        """Incremental placement matches a naive list of (requester, round) entries"""
+        print("🧪 Testing fair-share bookkeeping against a naive model...")
+
+        rng = random.Random(3)
+        player = MusicPlayer()
+        player.set_fair_share(True)
+        model = []  # (requester, round) in play order
+        base = 0  # Round of the song at the head of the queue
+
+        for step in range(1000):
+            if rng.random() < 0.6:
+                requester = rng.choice('ABCDE')
+                rounds = [r for who, r in model if who == requester]
+                target = rounds[-1] + 1 if rounds else base
+                index = sum(1 for _, r in model if r <= target)
+                model.insert(index, (requester, target))
+                self.assertEqual(player.enqueue(song(requester, step)), index + 1)
+            elif model:
+                player.queue.popleft()
+                model.pop(0)
+                base = model[0][1] if model else base + 1
+            self.assertEqual([item.requester for item in player.queue], [who for who, _ in model])
+
+        self.assertEqual(player.fair_share.rebuilds, 1)  # Only the initial one
+        print("✅ Fair-share bookkeeping matches the naive model")
+
+    def test_manual_edits_rebuild(self):
+        """After a manual move the rounds are rebuilt from the queue order"""
+        print("🧪 Testing rebuild after manual edits...")
+
+        player = MusicPlayer()
+        player.set_fair_share(True)
+        for item in [song('A', 0), song('B', 0), song('A', 1), song('B', 1)]:
+            player.enqueue(item)
+        player.move_in_queue(4, 1)  # B1 jumps the line
+        self.assertEqual(titles(player.queue), ['B1', 'A0', 'B0', 'A1'])
+
+        player.enqueue(song('B', 2))
+        player.enqueue(song('C', 0))
+        self.assertEqual(player.fair_share.rebuilds, 2)
+        self.assertEqual(titles(player.queue), ['B1', 'A0', 'C0', 'B0', 'A1', 'B2'])
+        print("✅ Rebuild after manual edits works")
+
+    def test_enable_interleaves_existing_queue(self):
+        """Turning fair share on reorders the queue by turns, keeping each requester's order"""
+        print("🧪 Testing interleaving on enable...")
+
+        player = MusicPlayer()
+        for item in [song('A', 0), song('A', 1), song('A', 2), song('B', 0), song('B', 1), song('C', 0)]:
+            player.enqueue(item)
+        player.set_fair_share(True)
+        self.assertEqual(titles(player.queue), ['A0', 'B0', 'C0', 'A1', 'B1', 'A2'])
+
+        player.set_fair_share(False)
+        self.assertEqual(player.enqueue(song('C', 1)), 7)
+        print("✅ Interleaving on enable works")
+
+def main():
+    """Run fair queue tests"""
+    print("🎵 Fair-Share Queue Test Suite")
+    print("=" * 50)
+
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestFairQueue)
+    result = unittest.TextTestRunner(verbosity=2).run(suite)
+
+    if result.wasSuccessful():
+        print("🎉 All fair queue tests passed!")
+    else:
+        print("⚠️  Some fair queue tests failed.")
+    return result.wasSuccessful()
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Test the FFmpeg process supervisor (slot cap, queuing and orphan reaping).
+Uses `sleep` child processes in place of FFmpeg.
+"""
+
+import os
+import sys
+import asyncio
+import time
+import threading
+import subprocess
+import unittest
+
+# Add the project directory to Python path (parent directory)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.ffmpeg_supervisor import FFmpegSupervisor
+
+def spawn_dummy():
+    """Spawn a long-running child process standing in for FFmpeg"""
+    return subprocess.Popen(['sleep', '30'])
+
+class TestFFmpegSupervisor(unittest.TestCase):
+    """Test cases for the FFmpeg supervisor"""
+
+    def test_slot_cap_and_fifo_queue(self):
+        """Streams beyond the cap wait in order for a slot"""
+        print("🧪 Testing slot cap and queuing...")
+
+        async def run():
+            supervisor = FFmpegSupervisor(max_processes=2)
+            self.assertTrue(await supervisor.acquire_slot())
+            self.assertTrue(await supervisor.acquire_slot())
+
+            order = []
+
+            async def waiter(name):
+                await supervisor.acquire_slot()
+                order.append(name)
+
+            tasks = [asyncio.create_task(waiter('a')), asyncio.create_task(waiter('b'))]
+            await asyncio.sleep(0.01)
+            self.assertEqual(order, [])
+            self.assertEqual(supervisor.get_stats()['waiting'], 2)
+
+            supervisor.release_slot()
+            await asyncio.sleep(0.01)
+            self.assertEqual(order, ['a'])
+
+            supervisor.release_slot()
+            await asyncio.gather(*tasks)
+            self.assertEqual(order, ['a', 'b'])
+            self.assertEqual(supervisor.get_stats()['slots_in_use'], 2)
+
+            # A timed-out waiter must not consume a slot
+            self.assertFalse(await supervisor.acquire_slot(timeout=0.01))
+            supervisor.release_slot()
+            supervisor.release_slot()
+            self.assertEqual(supervisor.get_stats()['slots_in_use'], 0)
+
+        asyncio.run(run())
+        print("✅ Slot cap and queuing work")
+
+    def test_reap_guild_keeps_active_source(self):
+        """Reaping a guild kills everything except the active stream"""
+        print("🧪 Testing guild reaping...")
+
+        supervisor = FFmpegSupervisor()
+        active, stale, other_guild = spawn_dummy(), spawn_dummy(), spawn_dummy()
+        active_source, stale_source = object(), object()
+
+        try:
+            supervisor.register(active, 1, active_source)
+            supervisor.register(stale, 1, stale_source)
+            supervisor.register(other_guild, 2, object())
+
+            self.assertEqual(supervisor.reap_guild(1, keep=active_source), 1)
+            self.assertIsNotNone(stale.poll())
+            self.assertIsNone(active.poll())
+            self.assertIsNone(other_guild.poll())
+            self.assertEqual(supervisor.get_stats()['processes'], 2)
+        finally:
+            for process in (active, stale, other_guild):
+                process.kill()
+                process.wait()
+
+        print("✅ Guild reaping works")
+
+    def test_reap_guild_does_not_block_event_loop(self):
+        """Inside the event loop, waiting for killed processes happens in an executor"""
+        print("🧪 Testing non-blocking reaping...")
+
+        supervisor = FFmpegSupervisor()
+        stale = spawn_dummy()
+        waited = threading.Event()
+        wait = stale.wait
+
+        def slow_wait(timeout=None):
+            time.sleep(0.3)  # A process that takes a while to die
+            result = wait(timeout)
+            waited.set()
+            return result
+        stale.wait = slow_wait
+
+        async def run():
+            supervisor.register(stale, 1, object())
+            started = time.perf_counter()
+            self.assertEqual(supervisor.reap_guild(1), 1)
+            self.assertLess(time.perf_counter() - started, 0.2)
+            await asyncio.get_running_loop().run_in_executor(None, waited.wait, 5)
+
+        try:
+            asyncio.run(run())
+            self.assertTrue(waited.is_set())
+            self.assertIsNotNone(stale.poll())
+        finally:
+            stale.kill()
+            wait()
+
+        print("✅ Reaping does not block the event loop")
+
+    def test_reap_orphans_and_sampling(self):
+        """Processes that are not the active stream are reaped after the grace period"""
+        print("🧪 Testing orphan reaping and sampling...")
+
+        supervisor = FFmpegSupervisor()
+        orphan, active = spawn_dummy(), spawn_dummy()
+        active_source = object()
+
+        try:
+            supervisor.register(orphan, 1, object())
+            supervisor.register(active, 1, active_source)
+            supervisor.set_active_source(1, active_source)
+
+            infos = supervisor.sample()
+            if sys.platform.startswith('linux'):
+                self.assertTrue(all(info.rss_bytes for info in infos))
+
+            self.assertEqual(supervisor.reap_orphans(grace=0), 1)
+            self.assertIsNotNone(orphan.poll())
+            self.assertIsNone(active.poll())
+        finally:
+            for process in (orphan, active):
+                process.kill()
+                process.wait()
+
+        # The active process has exited now, so it is dropped without being counted as killed
+        self.assertEqual(supervisor.reap_orphans(grace=0), 0)
+        self.assertEqual(supervisor.get_stats()['processes'], 0)
+        print("✅ Orphan reaping and sampling work")
+
+def main():
+    """Run FFmpeg supervisor tests"""
+    print("🎵 FFmpeg Supervisor Test Suite")
+    print("=" * 50)
+
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestFFmpegSupervisor)
+    result = unittest.TextTestRunner(verbosity=2).run(suite)
+
+    if result.wasSuccessful():
+        print("🎉 All FFmpeg supervisor tests passed!")
+    else:
+        print("⚠️  Some FFmpeg supervisor tests failed.")
+    return result.wasSuccessful()
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Test the process handoff over a Unix socket, with both sides in one event loop.
+"""
+
+import os
+import sys
+import asyncio
+import tempfile
+import time
+import unittest
+
+# Add the project directory to Python path (parent directory)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.handoff import HandoffServer, request_handoff
+from utils.streaming_spotify import MusicPlayer, Song
+
+class FakeMember:
+    bot = False
+
+class FakeGuild:
+    def __init__(self, guild_id, channels=()):
+        self.id = guild_id
+        self.name = f"guild{guild_id}"
+        self._channels = {channel.id: channel for channel in channels}
+
+    def get_channel(self, channel_id):
+        return self._channels.get(channel_id)
+
+class FakeVoiceClient:
+    def __init__(self, channel, guild):
+        self.channel = channel
+        self.guild = guild
+        self.connected = True
+        self.stopped_at = None
+
+    def is_connected(self):
+        return self.connected
+
+    def is_paused(self):
+        return False
+
+    def is_playing(self):
+        return self.connected and self.stopped_at is None
+
+    def stop(self):
+        self.stopped_at = time.time()
+
+    async def disconnect(self):
+        self.connected = False
+
+class FakeVoiceChannel:
+    def __init__(self, channel_id):
+        self.id = channel_id
+        self.name = "General"
+        self.members = [FakeMember()]
+        self.guild = None
+
+    async def connect(self):
+        return FakeVoiceClient(self, self.guild)
+
+class FakeTextChannel:
+    def __init__(self, channel_id):
+        self.id = channel_id
+        self.guild = None
+
+class FakeBot:
+    def __init__(self, guild):
+        self.guild = guild
+
+    def get_guild(self, guild_id):
+        return self.guild if guild_id == self.guild.id else None
+
+def make_guild():
+    voice_channel, text_channel = FakeVoiceChannel(10), FakeTextChannel(20)
+    guild = FakeGuild(1, [voice_channel, text_channel])
+    voice_channel.guild = text_channel.guild = guild
+    return guild, voice_channel, text_channel
+
+class TestHandoff(unittest.TestCase):
+    """Test cases for the process handoff"""
+
+    def test_handoff_transfers_playback(self):
+        """The new process gets the queue, song, stream URL and position, and the old one lets go"""
+        print("🧪 Testing process handoff...")
+
+        with tempfile.TemporaryDirectory() as directory:
+            socket_path = os.path.join(directory, 'handoff.sock')
+            asyncio.run(self._run_handoff(socket_path))
+        print("✅ Process handoff works")
+
+    async def _run_handoff(self, socket_path):
+        # Outgoing process, 30 seconds into a song
+        old_guild, old_voice_channel, old_text_channel = make_guild()
+        old = MusicPlayer()
+        old.voice_client = FakeVoiceClient(old_voice_channel, old_guild)
+        old.last_text_channel = old_text_channel
+        old.current_song = Song("Playing", "https://www.youtube.com/watch?v=dQw4w9WgXcQ", 200)
+        old.current_song.stream_url = "https://rr1.googlevideo.com/videoplayback?expire=9999999999"
+        old.is_playing = True
+        old.current_position = 0
+        old.playback_start_time = time.time() - 30
+        old.loop_mode = 'queue'
+        old.queue.extend(Song(f"Song {i}", f"url{i}", 100) for i in range(3))
+
+        completed = []
+
+        async def on_complete():
+            completed.append(True)
+
+        server = await HandoffServer(old, path=socket_path, on_complete=on_complete).start()
+
+        # Incoming process; starting a stream is stubbed out
+        new_guild, _, _ = make_guild()
+        new = MusicPlayer()
+        started = []
+
+        async def start_stream(song, start_time):
+            started.append((song, start_time))
+            new.current_song = song
+            new.is_playing = True
+
+        new._start_stream_from_position = start_stream
+
+        silences = await request_handoff(new, FakeBot(new_guild), path=socket_path)
+        await asyncio.sleep(0)
+        await server.close()
+
+        # Old process stopped and left without dropping its state
+        self.assertTrue(old.handing_off)
+        self.assertFalse(old.voice_client.is_connected())
+        self.assertEqual(completed, [True])
+
+        # New process picked up exactly where the old one stopped
+        song, start_time = started[0]
+        self.assertEqual(song.title, "Playing")
+        self.assertEqual(song.stream_url, "https://rr1.googlevideo.com/videoplayback?expire=9999999999")
+        self.assertAlmostEqual(start_time, 30, delta=1)
+        self.assertEqual([song.title for song in new.queue], ["Song 0", "Song 1", "Song 2"])
+        self.assertEqual(new.loop_mode, 'queue')
+        self.assertIn(1, silences)
+        self.assertLess(silences[1], 1.0)
+
+    def test_no_running_process(self):
+        """Without a socket there is nothing to take over"""
+        print("🧪 Testing handoff without a running process...")
+
+        with tempfile.TemporaryDirectory() as directory:
+            result = asyncio.run(request_handoff(MusicPlayer(), None, path=os.path.join(directory, 'missing.sock')))
+        self.assertIsNone(result)
+        print("✅ Missing process is handled")
+
+def main():
+    """Run handoff tests"""
+    print("🎵 Process Handoff Test Suite")
+    print("=" * 50)
+
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestHandoff)
+    result = unittest.TextTestRunner(verbosity=2).run(suite)
+
+    if result.wasSuccessful():
+        print("🎉 All handoff tests passed!")
+    else:
+        print("⚠️  Some handoff tests failed.")
+    return result.wasSuccessful()
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
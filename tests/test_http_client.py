@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Test the shared HTTP client (connection reuse across requests).
+"""
+
+import os
+import sys
+import asyncio
+import unittest
+
+# Add the project directory to Python path (parent directory)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aiohttp import web
+from utils.http_client import HttpClient
+
+class TestHttpClient(unittest.TestCase):
+    """Test cases for the shared HTTP client"""
+
+    def test_connections_are_reused(self):
+        """Sequential requests to one host share a single keep-alive connection"""
+        print("🧪 Testing connection reuse...")
+
+        async def run():
+            peers = set()
+
+            async def handler(request):
+                peers.add(request.transport.get_extra_info('peername'))
+                return web.json_response({'ok': True})
+
+            app = web.Application()
+            app.router.add_get('/oembed', handler)
+            runner = web.AppRunner(app)
+            await runner.setup()
+            site = web.TCPSite(runner, '127.0.0.1', 0)
+            await site.start()
+            port = site._server.sockets[0].getsockname()[1]
+
+            client = HttpClient()
+            try:
+                for _ in range(20):
+                    async with client.get(f"http://127.0.0.1:{port}/oembed") as response:
+                        self.assertEqual(await response.json(), {'ok': True})
+                self.assertEqual(len(peers), 1)
+                self.assertIs(client.session(), client.session())
+                self.assertEqual(client.get_stats()['sessions_created'], 1)
+            finally:
+                await client.close()
+                await runner.cleanup()
+
+        asyncio.run(run())
+        print("✅ Connections are reused")
+
+def main():
+    """Run HTTP client tests"""
+    print("🎵 HTTP Client Test Suite")
+    print("=" * 50)
+
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestHttpClient)
+    result = unittest.TextTestRunner(verbosity=2).run(suite)
+
+    if result.wasSuccessful():
+        print("🎉 All HTTP client tests passed!")
+    else:
+        print("⚠️  Some HTTP client tests failed.")
+    return result.wasSuccessful()
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Test the indexed queue against a plain list as the reference model.
+"""
+
+import os
+import sys
+import random
+import unittest
+from collections import Counter
+
+# Add the project directory to Python path (parent directory)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.indexed_queue import IndexedQueue, QueueKeyIndex
+
+class SmallChunkQueue(IndexedQueue):
+    """Tiny chunks so splits and chunk removal happen with few items"""
+    CHUNK_SIZE = 4
+
+class TestIndexedQueue(unittest.TestCase):
+    """Test cases for the indexed queue"""
+
+    def assertMatches(self, queue, model):
+        self.assertEqual(list(queue), model)
+        self.assertEqual(len(queue), len(model))
+        for i in range(len(model)):
+            self.assertEqual(queue[i], model[i])
+
+    def test_deque_operations(self):
+        """append/appendleft/popleft/pop/clear behave like a deque"""
+        print("🧪 Testing deque-compatible operations...")
+
+        queue = SmallChunkQueue()
+        self.assertFalse(queue)
+        with self.assertRaises(IndexError):
+            queue.popleft()
+
+        for i in range(20):
+            queue.append(i)
+        queue.appendleft(-1)
+        self.assertMatches(queue, [-1] + list(range(20)))
+        self.assertEqual(queue.popleft(), -1)
+        self.assertEqual(queue.pop(), 19)
+        self.assertEqual(queue[-1], 18)
+        self.assertIn(5, queue)
+
+        queue.clear()
+        self.assertMatches(queue, [])
+        print("✅ Deque-compatible operations work")
+
+    def test_random_operations_match_list(self):
+        """Random insert/pop/move/jump sequences give the same result as a list"""
+        print("🧪 Testing random operations against a list...")
+
+        rng = random.Random(1234)
+        queue = SmallChunkQueue(range(50))
+        model = list(range(50))
+        next_value = 50
+
+        for _ in range(2000):
+            op = rng.randrange(5)
+            if op == 0 or not model:
+                index = rng.randint(0, len(model))
+                queue.insert(index, next_value)
+                model.insert(index, next_value)
+                next_value += 1
+            elif op == 1:
+                index = rng.randrange(len(model))
+                self.assertEqual(queue.pop(index), model.pop(index))
+            elif op == 2:
+                source, destination = rng.randrange(len(model)), rng.randrange(len(model))
+                queue.move(source, destination)
+                model.insert(destination, model.pop(source))
+            elif op == 3 and rng.random() < 0.05:
+                index = rng.randint(0, len(model))
+                self.assertEqual(list(queue.jump(index)), model[:index])
+                del model[:index]
+            else:
+                queue.extend([next_value, next_value + 1])
+                model.extend([next_value, next_value + 1])
+                next_value += 2
+            self.assertEqual(len(queue), len(model))
+
+        self.assertMatches(queue, model)
+        print("✅ Random operations match a list")
+
+    def test_weight_totals(self):
+        """Running totals and prefix sums stay correct through every kind of mutation"""
+        print("🧪 Testing weight prefix sums...")
+
+        rng = random.Random(99)
+        queue = SmallChunkQueue(range(30), weight=lambda value: value % 7)
+        model = list(range(30))
+
+        def check():
+            self.assertEqual(queue.total_weight(), sum(value % 7 for value in model))
+            for index in range(0, len(model) + 1, 3):
+                self.assertEqual(queue.weight_before(index), sum(value % 7 for value in model[:index]))
+
+        for step in range(500):
+            op = rng.randrange(6)
+            if op == 0 or len(model) < 2:
+                index = rng.randint(0, len(model))
+                queue.insert(index, step)
+                model.insert(index, step)
+            elif op == 1:
+                index = rng.randrange(len(model))
+                queue.pop(index)
+                model.pop(index)
+            elif op == 2:
+                source, destination = rng.randrange(len(model)), rng.randrange(len(model))
+                queue.move(source, destination)
+                model.insert(destination, model.pop(source))
+            elif op == 3:
+                queue.extend([step] * 20)
+                model.extend([step] * 20)
+            elif op == 4 and rng.random() < 0.1:
+                index = rng.randint(0, len(model))
+                queue.jump(index)
+                del model[:index]
+            elif op == 5 and rng.random() < 0.1:
+                queue.shuffle(rng)
+                model = list(queue)
+            check()
+
+        queue.clear()
+        self.assertEqual(queue.total_weight(), 0)
+        print("✅ Weight prefix sums work")
+
+    def test_jump_and_popleft_from_the_front(self):
+        """Front drops skip chunks lazily; positions, weights and the dropped items stay right through compaction"""
+        print("🧪 Testing lazy front drops...")
+
+        rng = random.Random(5)
+        queue = SmallChunkQueue(range(400), weight=lambda value: value % 5)
+        model = list(range(400))
+        next_value = 400
+
+        for _ in range(300):
+            op = rng.randrange(3)
+            if op == 0 and len(model) > 1:
+                index = rng.randint(1, min(len(model), 30))
+                dropped = queue.jump(index)
+                self.assertEqual(list(dropped), model[:index])
+                self.assertEqual(dropped.total_weight(), sum(value % 5 for value in model[:index]))
+                self.assertEqual(dropped[-1], model[index - 1])
+                del model[:index]
+            elif op == 1 and model:
+                self.assertEqual(queue.popleft(), model.pop(0))
+            else:
+                queue.extend(range(next_value, next_value + 10))
+                model.extend(range(next_value, next_value + 10))
+                next_value += 10
+            self.assertEqual(queue[0] if model else None, model[0] if model else None)
+            self.assertEqual(queue.total_weight(), sum(value % 5 for value in model))
+            middle = len(model) // 2
+            self.assertEqual(queue.weight_before(middle), sum(value % 5 for value in model[:middle]))
+            # Dead chunks are compacted away instead of piling up at the front
+            self.assertLessEqual(queue._head, max(8, len(queue._chunks) // 2))
+
+        self.assertMatches(queue, model)
+        self.assertEqual(list(queue.jump(len(model))), model)
+        self.assertMatches(queue, [])
+        print("✅ Lazy front drops work")
+
+    def test_shuffle_and_views(self):
+        """Shuffle keeps every item; views are live and slice without copying"""
+        print("🧪 Testing shuffle and slice views...")
+
+        queue = SmallChunkQueue(range(100))
+        version = queue.version
+        queue.shuffle(random.Random(7))
+        self.assertGreater(queue.version, version)
+        self.assertEqual(sorted(queue), list(range(100)))
+        self.assertNotEqual(list(queue), list(range(100)))
+
+        model = list(queue)
+        view = queue[10:20]
+        self.assertEqual(list(view), model[10:20])
+        self.assertEqual(len(view), 10)
+        self.assertEqual(view[-1], model[19])
+        self.assertEqual(list(view[2:5]), model[12:15])
+        self.assertEqual(list(queue.view()[:3]), model[:3])
+
+        queue.popleft()
+        self.assertEqual(list(view), model[11:21])
+        print("✅ Shuffle and slice views work")
+
+    def test_key_index(self):
+        """The key index matches a Counter of the queue after random mutations"""
+        print("🧪 Testing the key index...")
+
+        rng = random.Random(99)
+        queue = SmallChunkQueue(rng.randrange(10) for _ in range(30))
+        index = QueueKeyIndex(queue, lambda item: item)
+
+        for _ in range(1000):
+            op = rng.randrange(6)
+            if op == 0 or not queue:
+                queue.append(rng.randrange(10))
+            elif op == 1:
+                queue.popleft()
+            elif op == 2:
+                del queue[rng.randrange(len(queue))]
+            elif op == 3:
+                queue.jump(rng.randrange(len(queue)))
+            elif op == 4:
+                queue.extend(rng.randrange(10) for _ in range(3))
+            else:
+                queue.move(rng.randrange(len(queue)), rng.randrange(len(queue)))
+            self.assertEqual(index.counts, dict(Counter(queue)))
+
+        queue.clear()
+        self.assertEqual(len(index), 0)
+        index.close()
+        queue.append(1)
+        self.assertNotIn(1, index)
+        print("✅ Key index stays in sync")
+
+def main():
+    """Run indexed queue tests"""
+    print("🎵 Indexed Queue Test Suite")
+    print("=" * 50)
+
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestIndexedQueue)
+    result = unittest.TextTestRunner(verbosity=2).run(suite)
+
+    if result.wasSuccessful():
+        print("🎉 All indexed queue tests passed!")
+    else:
+        print("⚠️  Some indexed queue tests failed.")
+    return result.wasSuccessful()
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Test the persisted player state (queue journal, snapshots, batching and warm restart).
+"""
+
+import os
+import sys
+import asyncio
+import random
+import tempfile
+import time
+import unittest
+
+# Add the project directory to Python path (parent directory)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.persistence import StateStore
+from utils.streaming_spotify import MusicPlayer, Song
+
+class FakeGuild:
+    def __init__(self, guild_id, channels=()):
+        self.id = guild_id
+        self.name = f"guild{guild_id}"
+        self._channels = {channel.id: channel for channel in channels}
+
+    def get_channel(self, channel_id):
+        return self._channels.get(channel_id)
+
+class FakeTextChannel:
+    def __init__(self, channel_id, guild=None):
+        self.id = channel_id
+        self.guild = guild
+        self.sent = []
+
+    async def send(self, message):
+        self.sent.append(message)
+
+class FakeVoiceChannel:
+    """Voice channel with nobody in it, so restore does not try to connect"""
+
+    def __init__(self, channel_id):
+        self.id = channel_id
+        self.name = "General"
+        self.members = []
+
+class FakeBot:
+    def __init__(self, guilds):
+        self._guilds = {guild.id: guild for guild in guilds}
+
+    def get_guild(self, guild_id):
+        return self._guilds.get(guild_id)
+
+def make_song(i):
+    return Song(f"Song {i}", f"https://www.youtube.com/watch?v={i:011d}", 100 + i)
+
+class TestPersistence(unittest.TestCase):
+    """Test cases for the persisted player state"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, 'state.db')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def make_player(self, **store_options):
+        store = StateStore(self.path, flush_interval=0.01, **store_options).start()
+        player = MusicPlayer()
+        player.last_text_channel = FakeTextChannel(20, FakeGuild(1))
+        player.attach_state_store(store)
+        return player, store
+
+    def test_journal_replay(self):
+        """Replaying snapshot + journal rebuilds exactly the live queue"""
+        print("🧪 Testing queue journal replay...")
+
+        for snapshot_every in (1000, 7):  # Without and with compaction
+            if os.path.exists(self.path):
+                os.remove(self.path)
+            player, store = self.make_player(snapshot_every=snapshot_every)
+            rng = random.Random(snapshot_every)
+
+            player.queue.extend(make_song(i) for i in range(30))
+            for i in range(30, 200):
+                op = rng.randrange(5)
+                if op == 0:
+                    player.queue.append(make_song(i))
+                elif op == 1 and player.queue:
+                    player.queue.popleft()
+                elif op == 2 and len(player.queue) > 1:
+                    player.move_in_queue(rng.randint(1, len(player.queue)), rng.randint(1, len(player.queue)))
+                elif op == 3 and len(player.queue) > 3:
+                    player.jump_in_queue(3)
+                elif op == 4 and rng.random() < 0.1:
+                    player.shuffle_queue()
+
+            store.close()
+            saved = StateStore(self.path).load()
+            self.assertEqual([song['title'] for song in saved[1]['queue']], [song.title for song in player.queue])
+        print("✅ Queue journal replay works")
+
+    def test_writes_are_batched(self):
+        """Recording is a cheap enqueue and many records share one transaction"""
+        print("🧪 Testing batched writes...")
+
+        player, store = self.make_player()
+        songs = [make_song(i) for i in range(2000)]
+
+        start = time.perf_counter()
+        for song in songs:
+            player.queue.append(song)
+        per_append = (time.perf_counter() - start) / len(songs)
+
+        store.flush()
+        stats = store.get_stats()
+        self.assertGreater(stats['writes_per_batch'], 10)
+        self.assertLess(per_append, 0.001)  # Far below a disk write
+        store.close()
+        print(f"✅ Batched writes work ({per_append * 1e6:.1f} µs per journaled append, "
+              f"{stats['writes_per_batch']:.0f} writes per transaction)")
+
+    def test_restore_state(self):
+        """The saved queue, repeat mode and interrupted song come back after a restart"""
+        print("🧪 Testing warm restart...")
+
+        player, store = self.make_player()
+        player.queue.extend(make_song(i) for i in range(3))
+        player.current_song = make_song(99)
+        player.current_position = 42
+        player.loop_mode = 'queue'
+        player.save_state()
+        store.close()
+
+        voice_channel = FakeVoiceChannel(10)
+        text_channel = FakeTextChannel(20)
+        guild = FakeGuild(1, [voice_channel, text_channel])
+        text_channel.guild = guild
+        bot = FakeBot([guild])
+
+        restored = MusicPlayer()
+        restored.attach_state_store(StateStore(self.path, flush_interval=0.01).start())
+        self.assertTrue(asyncio.run(restored.restore_state(bot)))
+
+        # Nobody is listening, so the interrupted song waits at the front of the queue
+        self.assertEqual([song.title for song in restored.queue], ["Song 99", "Song 0", "Song 1", "Song 2"])
+        self.assertEqual(restored.queue[1].video_id, "00000000000")
+        self.assertEqual(restored.loop_mode, 'queue')
+        self.assertIs(restored.last_text_channel, text_channel)
+        restored.state_store.close()
+
+        # The restored queue was written back as a snapshot
+        saved = StateStore(self.path).load()
+        self.assertEqual(len(saved[1]['queue']), 4)
+        print("✅ Warm restart works")
+
+def main():
+    """Run persistence tests"""
+    print("🎵 Persistence Test Suite")
+    print("=" * 50)
+
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestPersistence)
+    result = unittest.TextTestRunner(verbosity=2).run(suite)
+
+    if result.wasSuccessful():
+        print("🎉 All persistence tests passed!")
+    else:
+        print("⚠️  Some persistence tests failed.")
+    return result.wasSuccessful()
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
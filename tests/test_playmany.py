@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Test /playmany (song list parsing, ordered concurrent resolution, one progress message).
+"""
+
+import os
+import sys
+import asyncio
+import unittest
+from unittest.mock import Mock, AsyncMock
+
+# Add the project directory to Python path (parent directory)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from commands.playmany import parse_song_list, playmany_command
+from utils.streaming_spotify import MusicPlayer
+
+class TestPlaymany(unittest.TestCase):
+    """Test cases for /playmany"""
+
+    def test_parse_song_lists(self):
+        """Text, m3u and csv lists are split into queries"""
+        print("🧪 Testing song list parsing...")
+
+        self.assertEqual(parse_song_list("song one\n\n# comment\n  song two  \n"), ["song one", "song two"])
+
+        m3u = "#EXTM3U\n#EXTINF:213,Rick Astley - Never Gonna Give You Up\nC:\\Music\\rick.mp3\n" \
+              "https://www.youtube.com/watch?v=dQw4w9WgXcQ\n/music/Artist - Song.flac\n"
+        self.assertEqual(parse_song_list(m3u, "list.m3u"), [
+            "Rick Astley - Never Gonna Give You Up",
+            "https://www.youtube.com/watch?v=dQw4w9WgXcQ",
+            "Artist - Song"
+        ])
+
+        exported = 'Track Name,Artist Name,Album\n"Song, With Comma",Artist A,Album\nOther Song,Artist B,Album\n'
+        self.assertEqual(parse_song_list(exported, "export.CSV"), ["Song, With Comma Artist A", "Other Song Artist B"])
+        self.assertEqual(parse_song_list("first song,x\nsecond song,y\n", "plain.csv"), ["first song", "second song"])
+        print("✅ Song lists are parsed")
+
+    def test_playmany_keeps_order(self):
+        """Queries resolve concurrently, are queued in order and report progress in one message"""
+        print("🧪 Testing /playmany...")
+
+        player = MusicPlayer()
+        player.is_playing = True
+        player.current_song = Mock()
+
+        async def search_youtube(query):
+            await asyncio.sleep(0.05 if query.endswith('0') else 0.001)  # Early queries finish last
+            if query == "missing":
+                return None
+            return {'title': query, 'url': f"https://www.youtube.com/watch?v={query:0>11}", 'duration': 100}
+
+        player.search_youtube = search_youtube
+        progress_message = AsyncMock()
+        interaction = Mock()
+        interaction.response = AsyncMock()
+        interaction.followup = AsyncMock()
+        interaction.followup.send.return_value = progress_message
+        interaction.user = Mock(id=42)
+
+        queries = [f"song{i}" for i in range(12)]
+        queries.insert(5, "missing")
+        asyncio.run(playmany_command(interaction, player, "; ".join(queries)))
+
+        self.assertEqual([song.title for song in player.queue], [q for q in queries if q != "missing"])
+        self.assertEqual(interaction.followup.send.call_count, 1)
+        final = progress_message.edit.call_args.kwargs['content']
+        self.assertEqual(final, "✅ Added 13/13 songs: 12 song(s) queued, 1 not found")
+        print("✅ /playmany keeps the original order")
+
+    def test_failed_start_is_not_counted(self):
+        """When the first song can't start playing it is reported as skipped, not queued"""
+        print("🧪 Testing /playmany with a failed start...")
+
+        player = MusicPlayer()
+
+        async def search_youtube(query):
+            return {'title': query, 'url': f"https://www.youtube.com/watch?v={query:0>11}", 'duration': 100}
+
+        async def stream_and_play(interaction, song):
+            pass  # Failed: nothing started
+
+        player.search_youtube = search_youtube
+        player.stream_and_play = stream_and_play
+        progress_message = AsyncMock()
+        interaction = Mock()
+        interaction.response = AsyncMock()
+        interaction.followup = AsyncMock()
+        interaction.followup.send.return_value = progress_message
+        interaction.user = Mock(id=42)
+
+        asyncio.run(playmany_command(interaction, player, "song0; song1; song2"))
+
+        self.assertEqual([song.title for song in player.queue], ["song1", "song2"])
+        final = progress_message.edit.call_args.kwargs['content']
+        self.assertEqual(final, "✅ Added 3/3 songs: 2 song(s) queued, 1 skipped")
+        print("✅ A failed start is reported as skipped")
+
+def main():
+    """Run /playmany tests"""
+    print("🎵 Playmany Test Suite")
+    print("=" * 50)
+
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestPlaymany)
+    result = unittest.TextTestRunner(verbosity=2).run(suite)
+
+    if result.wasSuccessful():
+        print("🎉 All playmany tests passed!")
+    else:
+        print("⚠️  Some playmany tests failed.")
+    return result.wasSuccessful()
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
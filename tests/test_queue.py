@@ -5,6 +5,7 @@ Test the music queue functionality without external dependencies.
 
 import sys
 import os
+import asyncio
 from collections import deque
 
 # Add the project directory to Python path (parent directory)
@@ -33,6 +34,37 @@ def test_song_class():
     print("✅ Song class works correctly")
     return True
 
+def test_compact_song():
+    """Test that songs store YouTube ids and requester ids instead of full objects"""
+    print("\n🧪 Testing compact Song storage...")
+
+    class Member:
+        id = 123456789012345678
+        mention = "<@123456789012345678>"
+
+    song = Song(
+        title="Test Song",
+        url="https://www.youtube.com/watch?v=dQw4w9WgXcQ",
+        duration="212",
+        thumbnail="https://i.ytimg.com/vi/dQw4w9WgXcQ/hqdefault.jpg",
+        requester=Member()
+    )
+
+    assert not hasattr(song, '__dict__')
+    assert song.video_id == "dQw4w9WgXcQ"
+    assert song.url == "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+    assert song.thumbnail == "https://i.ytimg.com/vi/dQw4w9WgXcQ/hqdefault.jpg"
+    assert song.duration == 212
+    # Only the id is kept; without a resolver the requester can still be mentioned
+    assert song.requester_id == Member.id
+    assert not isinstance(song.requester, Member)
+    assert song.requester.mention == Member.mention
+
+    assert Song("Unknown length", "https://youtu.be/dQw4w9WgXcQ", None).duration == 0
+
+    print("✅ Compact Song storage works correctly")
+    return True
+
 def test_queue_operations():
     """Test queue operations"""
     print("\n🧪 Testing queue operations...")
@@ -102,6 +134,169 @@ def test_after_playing_callback():
 
     return True
 
+def test_repeat_modes():
+    """Test repeat-one and repeat-queue handling when a song ends"""
+    print("\n🧪 Testing repeat modes...")
+
+    class FakeVoiceClient:
+        """Voice client whose stop() runs the after callback before returning, as the player thread may"""
+        def __init__(self, player):
+            self.player = player
+
+        def is_connected(self):
+            return False
+
+        def is_playing(self):
+            return True
+
+        def is_paused(self):
+            return False
+
+        def stop(self):
+            self.player._after_playing()
+
+    # Repeat-queue: the finished song goes back to the end with its resolved URL
+    music_player = MusicPlayer()
+    music_player.voice_client = FakeVoiceClient(music_player)
+    song1 = Song("Song 1", "https://www.youtube.com/watch?v=aaaaaaaaaaa", 100)
+    song1.stream_url = "https://rr1.googlevideo.com/videoplayback?expire=9999999999"
+    song2 = Song("Song 2", "https://www.youtube.com/watch?v=bbbbbbbbbbb", 200)
+    music_player.current_song = song1
+    music_player.queue.append(song2)
+    music_player.set_loop_mode('queue')
+
+    music_player._after_playing()
+    assert list(music_player.queue) == [song2, song1]
+    assert music_player.queue[-1].stream_url == song1.stream_url
+    print("✅ Repeat-queue re-adds finished songs")
+
+    # A manual stop doesn't re-add the song, even when the callback runs inside stop()
+    music_player.current_song = song2
+    music_player.queue.clear()
+    music_player.stop_playback()
+    assert len(music_player.queue) == 0
+    assert not music_player.stop_requested
+    print("✅ Repeat is skipped after a manual stop")
+
+    # Invalid modes are rejected
+    try:
+        music_player.set_loop_mode('forever')
+        assert False, "Invalid loop mode was accepted"
+    except ValueError:
+        pass
+    print("✅ Loop mode validation works")
+
+    return True
+
+def test_queue_pages():
+    """Test that /queue pages are rendered from slices and cached until the queue changes"""
+    print("\n🧪 Testing queue pagination...")
+
+    from commands.queue import QueuePageCache, build_queue_embed
+
+    class Member:
+        id = 123456789012345678
+
+    music_player = MusicPlayer()
+    music_player.queue.extend(Song(f"Song {i}", f"url{i}", 60, requester=Member()) for i in range(10_500))
+    page_cache = QueuePageCache(music_player)
+
+    assert page_cache.page_count() == 1050
+    lines = page_cache.get_page(1049)
+    assert len(lines) == 10
+    assert lines[0][0].startswith("10491. **Song 10490**")
+    assert page_cache.get_page(1049) is lines  # Cached
+
+    embed = build_queue_embed(music_player, page_cache, 1049)
+    assert "in 174:50:00" in embed.fields[0].value  # 10,490 one-minute songs ahead
+    assert embed.footer.text == "Page 1050/1050"
+
+    music_player.remove_from_queue(1)
+    assert page_cache.get_page(1049) is not lines  # Queue changed, page re-rendered
+    assert page_cache.get_page(1049)[0][0].startswith("10491. **Song 10491**")
+
+    print("✅ Queue pagination works correctly")
+    return True
+
+def test_dedupe():
+    """Test that dedupe mode skips queued songs and stays in sync with removals and plays"""
+    print("\n🧪 Testing dedupe mode...")
+
+    music_player = MusicPlayer()
+    music_player.queue.extend([
+        Song("Song A", "https://www.youtube.com/watch?v=aaaaaaaaaaa", 60),
+        Song("Song B", "https://www.youtube.com/watch?v=bbbbbbbbbbb", 60),
+    ])
+    assert music_player.set_dedupe(True)
+
+    # Same video id through a different URL form is a duplicate
+    assert music_player.enqueue(Song("Song A again", "https://youtu.be/aaaaaaaaaaa", 60)) is None
+    assert music_player.enqueue(Song("Song C", "https://www.youtube.com/watch?v=ccccccccccc", 60)) == 3
+    assert len(music_player.queue) == 3
+
+    music_player.remove_from_queue(1)  # Song A
+    assert music_player.enqueue(Song("Song A", "https://www.youtube.com/watch?v=aaaaaaaaaaa", 60)) == 3
+
+    music_player.queue.popleft()  # Song B starts playing
+    assert music_player.enqueue(Song("Song B", "https://www.youtube.com/watch?v=bbbbbbbbbbb", 60)) == 3
+
+    # Batches skip queued songs and repeats within the batch
+    batch = [Song("Song C again", "https://youtu.be/ccccccccccc", 60),
+             Song("Song D", "https://www.youtube.com/watch?v=ddddddddddd", 60),
+             Song("Song D again", "https://youtu.be/ddddddddddd", 60)]
+    assert music_player.enqueue_many(batch) == (1, 2)
+    assert len(music_player.queue) == 4
+
+    assert not music_player.set_dedupe(False)
+    assert music_player.enqueue(Song("Song C", "https://www.youtube.com/watch?v=ccccccccccc", 60)) == 5
+
+    print("✅ Dedupe mode works correctly")
+    return True
+
+def test_skip_unplayable():
+    """Test that queue advancement skips a run of unplayable songs concurrently and reports them once"""
+    print("\n🧪 Testing skipping unplayable songs...")
+    return asyncio.run(_skip_unplayable())
+
+async def _skip_unplayable():
+
+    import time
+    from unittest.mock import Mock, AsyncMock, patch
+    from utils import streaming_spotify
+
+    music_player = MusicPlayer()
+    music_player.voice_client = Mock()
+    music_player.voice_client.is_connected.return_value = True
+    music_player.last_text_channel = AsyncMock()
+    music_player.queue.extend(Song(f"Dead {i}", f"dead{i}", 100) for i in range(5))
+    music_player.queue.extend([Song("Good", "good", 100), Song("Later", "later", 100)])
+
+    async def get_stream_url(song):
+        await asyncio.sleep(0.1)  # Extraction time
+        return None if song.url.startswith("dead") else f"stream-{song.url}"
+
+    music_player._get_stream_url = get_stream_url
+    with patch.object(streaming_spotify, 'SKIP_AHEAD_CANDIDATES', 3), \
+         patch.object(streaming_spotify.youtube_streamer, 'stream_audio', AsyncMock(return_value=True)), \
+         patch.object(music_player, '_send_control_panel', AsyncMock()), \
+         patch.object(streaming_spotify, 'suggestion_index', Mock()) as suggestions:
+        started = time.monotonic()
+        assert await music_player._play_next_in_queue()
+        elapsed = time.monotonic() - started
+
+    assert music_player.current_song.title == "Good"
+    assert [song.title for song in music_player.queue] == ["Later"]
+    assert elapsed < 0.35, elapsed  # Two rounds of three concurrent extractions, not six in a row
+    messages = [call.args[0] for call in music_player.last_text_channel.send.call_args_list]
+    assert len(messages) == 2
+    assert messages[0].startswith("⚠️ Skipped 5 unplayable song(s)")
+    assert messages[1] == "🎵 Now playing: **Good**"
+    # Only the song that actually started counts as a play
+    assert [call.args[0].title for call in suggestions.record_play.call_args_list] == ["Good"]
+    print("✅ Unplayable songs are skipped concurrently")
+
+    return True
+
 async def test_async_queue_methods():
     """Test async queue methods"""
     print("\n🧪 Testing async queue methods...")
@@ -125,6 +320,7 @@ def main():
 
     # Test 1: Song class
     results.append(test_song_class())
+    results.append(test_compact_song())
 
     # Test 2: Queue operations
     results.append(test_queue_operations())
@@ -132,8 +328,17 @@ def main():
     # Test 3: After playing callback
     results.append(test_after_playing_callback())
 
-    # Test 4: Async methods
-    import asyncio
+    # Test 4: Repeat modes
+    results.append(test_repeat_modes())
+
+    # Test 5: Queue pagination
+    results.append(test_queue_pages())
+
+    # Test 6: Dedupe mode
+    results.append(test_dedupe())
+
+    # Test 7: Async methods
+    results.append(test_skip_unplayable())
     results.append(asyncio.run(test_async_queue_methods()))
 
     # Summary
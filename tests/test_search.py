@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Test /search (one flat search, cached results, only the chosen result extracted).
+"""
+
+import os
+import sys
+import asyncio
+import unittest
+from unittest.mock import Mock, AsyncMock, patch
+
+# Add the project directory to Python path (parent directory)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from commands.search import SearchCache, SearchResultsView, search_command
+from utils.streaming_youtube import youtube_streamer
+from utils.streaming_spotify import MusicPlayer
+
+RESULTS = [{'id': f"result{i:05d}", 'title': f"Result {i}", 'duration': 200 + i, 'channel': "Channel"} for i in range(5)]
+
+def make_interaction():
+    interaction = Mock()
+    interaction.response = AsyncMock()
+    interaction.followup = AsyncMock()
+    interaction.user = Mock(id=7)
+    return interaction
+
+class TestSearch(unittest.TestCase):
+    """Test cases for /search"""
+
+    def test_cache_expiry(self):
+        """Entries are reused until they expire, keys ignore case and spacing"""
+        cache = SearchCache(ttl=60)
+        cache.put("Never  Gonna", RESULTS)
+        self.assertIs(cache.get("never gonna"), RESULTS)
+        self.assertIsNone(SearchCache(ttl=0).get("never gonna"))
+
+    def test_search_and_choose(self):
+        """Repeating a search is free, and choosing extracts just that result"""
+        print("🧪 Testing /search...")
+
+        player = MusicPlayer()
+        player.is_playing = True  # Chosen results go to the queue
+        cache = SearchCache()
+        search = AsyncMock(return_value=RESULTS)
+        extract = AsyncMock(return_value={'title': "Result 3", 'url': "https://www.youtube.com/watch?v=result00003",
+                                          'duration': 203, 'direct_url': "https://rr1.googlevideo.com/videoplayback?expire=1"})
+
+        async def run():
+            with patch.object(youtube_streamer, 'search_candidates', search), \
+                 patch.object(youtube_streamer, 'extract_video', extract):
+                first = make_interaction()
+                await search_command(first, "never gonna", player, cache)
+                await search_command(make_interaction(), "Never Gonna", player, cache)
+
+                view = first.followup.send.call_args.kwargs['view']
+                self.assertIsInstance(view, SearchResultsView)
+                self.assertEqual([option.label for option in view.children[0].options], [r['title'] for r in RESULTS])
+                await view.choose(make_interaction(), 3)
+
+        asyncio.run(run())
+        self.assertEqual(search.await_count, 1)
+        extract.assert_awaited_once_with("https://www.youtube.com/watch?v=result00003")
+        self.assertEqual([song.title for song in player.queue], ["Result 3"])
+        self.assertIsNotNone(player.queue[0].stream_url)  # No second extraction when it plays
+        print("✅ /search works")
+
+def main():
+    """Run /search tests"""
+    print("🎵 Search Command Test Suite")
+    print("=" * 50)
+
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestSearch)
+    result = unittest.TextTestRunner(verbosity=2).run(suite)
+
+    if result.wasSuccessful():
+        print("🎉 All search tests passed!")
+    else:
+        print("⚠️  Some search tests failed.")
+    return result.wasSuccessful()
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
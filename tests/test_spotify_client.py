@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Test the async Spotify client against a local fake of the Web API (token refresh and rate limiting).
+"""
+
+import os
+import sys
+import asyncio
+import unittest
+
+# Add the project directory to Python path (parent directory)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aiohttp import web
+from utils.spotify_client import SpotifyClient, SpotifyError, parse_spotify_url
+from utils.http_client import HttpClient
+
+class FakeSpotify:
+    """Serves /api/token and /v1/tracks/{id}, rate limiting the first `limited` track requests"""
+
+    def __init__(self, limited=0, retry_after='0'):
+        self.limited = limited
+        self.retry_after = retry_after
+        self.token_requests = 0
+        self.track_requests = 0
+        self.valid_token = None
+
+    async def token(self, request):
+        self.token_requests += 1
+        await asyncio.sleep(0.05)  # Slow enough for concurrent callers to pile up
+        self.valid_token = f"token-{self.token_requests}"
+        return web.json_response({'access_token': self.valid_token, 'expires_in': 3600})
+
+    async def track(self, request):
+        self.track_requests += 1
+        if request.headers.get('Authorization') != f"Bearer {self.valid_token}":
+            return web.json_response({'error': 'expired'}, status=401)
+        if self.limited:
+            self.limited -= 1
+            return web.Response(status=429, headers={'Retry-After': self.retry_after})
+        return web.json_response({'id': request.match_info['id'], 'name': 'Song', 'artists': [{'name': 'Artist'}]})
+
+    async def playlist_tracks(self, request):
+        """A 250 track playlist with a removed track and a podcast episode in it"""
+        offset, limit = int(request.query['offset']), int(request.query['limit'])
+        self.pages.append(offset)
+        items = []
+        for i in range(offset, min(offset + limit, 250)):
+            if i == 10:
+                items.append({'track': None})
+            elif i == 20:
+                items.append({'track': {'type': 'episode', 'name': 'Podcast'}})
+            else:
+                items.append({'track': {'type': 'track', 'name': f"Track {i}", 'artists': [{'name': 'Artist'}]}})
+        has_next = offset + limit < 250
+        return web.json_response({'items': items, 'total': 250, 'next': 'more' if has_next else None})
+
+    async def start(self):
+        self.pages = []
+        app = web.Application()
+        app.router.add_post('/api/token', self.token)
+        app.router.add_get('/v1/tracks/{id}', self.track)
+        app.router.add_get('/v1/playlists/{id}/tracks', self.playlist_tracks)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, '127.0.0.1', 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.base = f"http://127.0.0.1:{port}"
+        return self
+
+    def client(self, **kwargs):
+        # A session of its own, since each test runs in its own event loop
+        return SpotifyClient(client_id='id', client_secret='secret', api_base=f"{self.base}/v1",
+                             token_url=f"{self.base}/api/token", client=HttpClient(), **kwargs)
+
+class TestSpotifyClient(unittest.TestCase):
+    """Test cases for the async Spotify client"""
+
+    def test_token_refreshed_once(self):
+        """Concurrent first requests share one token fetch, and a revoked token is refreshed"""
+        print("🧪 Testing token refresh...")
+
+        async def run():
+            server = await FakeSpotify().start()
+            client = server.client()
+            try:
+                tracks = await asyncio.gather(*(client.track(f"id{i}") for i in range(10)))
+                self.assertEqual([track['id'] for track in tracks], [f"id{i}" for i in range(10)])
+                self.assertEqual(server.token_requests, 1)
+
+                server.valid_token = "rotated"  # The server no longer accepts our token
+                self.assertEqual((await client.track("again"))['id'], "again")
+                self.assertEqual(server.token_requests, 2)
+            finally:
+                await client.http.close()
+                await server.runner.cleanup()
+
+        asyncio.run(run())
+        print("✅ Tokens are refreshed once")
+
+    def test_rate_limit_retry(self):
+        """429 responses are retried after Retry-After, and give up when the wait is too long"""
+        print("🧪 Testing rate limit handling...")
+
+        async def run():
+            server = await FakeSpotify(limited=2).start()
+            client = server.client(max_retries=3)
+            try:
+                self.assertEqual((await client.track("x"))['id'], "x")
+                self.assertEqual(client.get_stats()['rate_limited'], 2)
+
+                server.limited, server.retry_after = 1, '120'
+                with self.assertRaises(SpotifyError) as raised:
+                    await client.track("y")
+                self.assertEqual(raised.exception.status, 429)
+            finally:
+                await client.http.close()
+                await server.runner.cleanup()
+
+        asyncio.run(run())
+        print("✅ Rate limits are handled")
+
+    def test_playlist_pagination(self):
+        """Every page of a playlist is fetched, lazily, and non-tracks are skipped"""
+        print("🧪 Testing playlist pagination...")
+
+        async def run():
+            server = await FakeSpotify().start()
+            client = server.client()
+            try:
+                tracks = client.collection_tracks('playlist', 'abc')
+                first = await tracks.__anext__()
+                self.assertEqual(first['name'], "Track 0")
+                self.assertEqual(server.pages, [0])  # Only the first page so far
+
+                names = [first['name']] + [track['name'] async for track in tracks]
+                self.assertEqual(server.pages, [0, 100, 200])
+                self.assertEqual(len(names), 248)
+                self.assertNotIn("Track 10", names)
+                self.assertEqual(names[-1], "Track 249")
+            finally:
+                await client.http.close()
+                await server.runner.cleanup()
+
+        asyncio.run(run())
+        print("✅ Playlists are paginated")
+
+    def test_parse_spotify_url(self):
+        """Links, intl links and URIs are recognised"""
+        self.assertEqual(parse_spotify_url("https://open.spotify.com/playlist/37i9dQZF1DX?si=x"), ('playlist', '37i9dQZF1DX'))
+        self.assertEqual(parse_spotify_url("https://open.spotify.com/intl-de/album/1A2b3C"), ('album', '1A2b3C'))
+        self.assertEqual(parse_spotify_url("spotify:track:4uLU6hMCjMI75M1A2tKUQC"), ('track', '4uLU6hMCjMI75M1A2tKUQC'))
+        self.assertIsNone(parse_spotify_url("never gonna give you up"))
+
+def main():
+    """Run Spotify client tests"""
+    print("🎵 Spotify Client Test Suite")
+    print("=" * 50)
+
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestSpotifyClient)
+    result = unittest.TextTestRunner(verbosity=2).run(suite)
+
+    if result.wasSuccessful():
+        print("🎉 All Spotify client tests passed!")
+    else:
+        print("⚠️  Some Spotify client tests failed.")
+    return result.wasSuccessful()
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Test batched, cached Spotify metadata lookups.
+"""
+
+import os
+import sys
+import asyncio
+import tempfile
+import unittest
+
+# Add the project directory to Python path (parent directory)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.spotify_metadata import SpotifyMetadata
+
+class FakeClient:
+    """Answers /tracks?ids= like the Web API; ids starting with 'x' are unknown"""
+
+    def __init__(self):
+        self.calls = []
+
+    async def get(self, path, params=None):
+        ids = params['ids'].split(',')
+        self.calls.append(ids)
+        await asyncio.sleep(0.01)
+        return {'tracks': [
+            None if track_id.startswith('x') else
+            {'id': track_id, 'name': f"Name {track_id}", 'artists': [{'name': 'Artist', 'id': 'a'}],
+             'duration_ms': 200000, 'external_ids': {'isrc': f"ISRC{track_id}"}, 'popularity': 50}
+            for track_id in ids
+        ]}
+
+class TestSpotifyMetadata(unittest.TestCase):
+    """Test cases for Spotify metadata batching and caching"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'spotify.db')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_lookups_are_batched(self):
+        """121 concurrent lookups of 120 ids take three API calls, unknown ids give None"""
+        print("🧪 Testing batched lookups...")
+
+        client = FakeClient()
+        metadata = SpotifyMetadata(client, path=self.path)
+
+        async def run():
+            ids = [f"t{i}" for i in range(119)] + ["x1"]
+            return await metadata.tracks_for(ids + ["t0"])
+
+        tracks = asyncio.run(run())
+        self.assertEqual([len(call) for call in client.calls], [50, 50, 20])
+        self.assertEqual(tracks[5]['name'], "Name t5")
+        self.assertEqual(tracks[5]['external_ids']['isrc'], "ISRCt5")
+        self.assertNotIn('popularity', tracks[5])
+        self.assertIsNone(tracks[119])
+        self.assertIs(tracks[120], tracks[0])
+        metadata.close()
+        print("✅ Lookups are batched")
+
+    def test_cache_survives_restart(self):
+        """A second instance reads earlier results from SQLite instead of the API"""
+        print("🧪 Testing the persistent cache...")
+
+        async def lookup(metadata, ids):
+            return await metadata.tracks_for(ids)
+
+        first = SpotifyMetadata(FakeClient(), path=self.path)
+        asyncio.run(lookup(first, ["a", "b", "c"]))
+        asyncio.run(lookup(first, ["a", "b"]))
+        self.assertEqual(first.get_stats()['hits'], 2)
+        first.close()
+
+        client = FakeClient()
+        second = SpotifyMetadata(client, path=self.path)
+        tracks = asyncio.run(lookup(second, ["a", "b", "c", "d"]))
+        self.assertEqual(client.calls, [["d"]])
+        self.assertEqual([track['name'] for track in tracks], ["Name a", "Name b", "Name c", "Name d"])
+        stats = second.get_stats()
+        self.assertEqual((stats['db_hits'], stats['misses'], stats['hit_rate']), (3, 1, 0.75))
+        second.close()
+        print("✅ Cached tracks survive a restart")
+
+def main():
+    """Run Spotify metadata tests"""
+    print("🎵 Spotify Metadata Test Suite")
+    print("=" * 50)
+
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestSpotifyMetadata)
+    result = unittest.TextTestRunner(verbosity=2).run(suite)
+
+    if result.wasSuccessful():
+        print("🎉 All Spotify metadata tests passed!")
+    else:
+        print("⚠️  Some Spotify metadata tests failed.")
+    return result.wasSuccessful()
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Test proactive stream URL refresh (due songs, priority order, the per-minute budget and failure backoff).
+"""
+
+import os
+import sys
+import time
+import asyncio
+import unittest
+
+# Add the project directory to Python path (parent directory)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.streaming_spotify import MusicPlayer, Song
+from utils.stream_refresher import StreamRefresher
+
+def song(number):
+    return Song(f"Song {number}", f"https://www.youtube.com/watch?v=video{number:06d}", 200)
+
+class FakeResolver:
+    """Returns googlevideo-style URLs expiring in six hours"""
+
+    def __init__(self):
+        self.calls = []
+
+    async def __call__(self, url):
+        self.calls.append(url)
+        return f"https://rr1.googlevideo.com/videoplayback?expire={int(time.time()) + 6 * 3600}&id={len(self.calls)}"
+
+class TestStreamRefresher(unittest.TestCase):
+    """Test cases for the stream refresher"""
+
+    def test_refreshes_front_of_queue_first(self):
+        """Unresolved and nearly expired songs are resolved front first, fresh ones are left alone"""
+        print("🧪 Testing due songs and priority...")
+
+        player = MusicPlayer()
+        player.queue.extend(song(i) for i in range(8))
+        player.queue[1].stream_url = f"https://rr1.googlevideo.com/videoplayback?expire={int(time.time()) + 5 * 3600}"
+        player.queue[1].stream_expires = int(time.time()) + 5 * 3600
+        player.queue[2].stream_url = f"https://rr1.googlevideo.com/videoplayback?expire={int(time.time()) + 600}"
+        player.queue[2].stream_expires = int(time.time()) + 600  # Within the margin
+
+        resolver = FakeResolver()
+        refresher = StreamRefresher(player, lookahead=5, margin=1800, budget=100, batch_size=3, resolver=resolver)
+        self.assertEqual([item.title for item in refresher.due()], ['Song 0', 'Song 2', 'Song 3', 'Song 4'])
+
+        self.assertEqual(asyncio.run(refresher.refresh()), 3)
+        self.assertEqual(resolver.calls, [player.queue[i].url for i in (0, 2, 3)])
+        self.assertGreater(player.queue[2].stream_expires, time.time() + 3600)
+        self.assertEqual([item.title for item in refresher.due()], ['Song 4'])
+        print("✅ Upcoming songs are refreshed front first")
+
+    def test_budget(self):
+        """No more than the budget is resolved per minute"""
+        print("🧪 Testing the refresh budget...")
+
+        player = MusicPlayer()
+        player.queue.extend(song(i) for i in range(20))
+        resolver = FakeResolver()
+        refresher = StreamRefresher(player, lookahead=20, budget=4, batch_size=3, resolver=resolver)
+
+        asyncio.run(refresher.refresh())
+        asyncio.run(refresher.refresh())
+        asyncio.run(refresher.refresh())
+        self.assertEqual(len(resolver.calls), 4)
+        self.assertEqual(refresher.get_stats()['budget_left'], 0)
+
+        # A minute later the budget is available again
+        refresher._recent = type(refresher._recent)(t - 60 for t in refresher._recent)
+        asyncio.run(refresher.refresh())
+        self.assertEqual(len(resolver.calls), 7)
+        print("✅ Refresh budget is respected")
+
+    def test_failed_songs_back_off(self):
+        """A song that fails to resolve doesn't keep using the budget of the songs behind it"""
+        print("🧪 Testing failure backoff...")
+
+        player = MusicPlayer()
+        player.queue.extend(song(i) for i in range(4))
+        dead = player.queue[0].url
+        resolver = FakeResolver()
+
+        async def resolve(url):
+            if url == dead:
+                resolver.calls.append(url)
+                return None
+            return await resolver(url)
+
+        refresher = StreamRefresher(player, lookahead=4, budget=100, batch_size=1, resolver=resolve, backoff=60)
+        for _ in range(4):
+            asyncio.run(refresher.refresh())
+        self.assertEqual(resolver.calls.count(dead), 1)
+        self.assertEqual([item.title for item in refresher.due()], [])
+        self.assertEqual(refresher.get_stats()['backing_off'], 1)
+
+        # Once the backoff has passed it is tried again, and then waits twice as long
+        failures, _ = refresher._failures[dead]
+        refresher._failures[dead] = (failures, time.monotonic() - 1)
+        asyncio.run(refresher.refresh())
+        self.assertEqual(resolver.calls.count(dead), 2)
+        self.assertGreater(refresher._failures[dead][1], time.monotonic() + 110)
+        print("✅ Failed songs back off")
+
+def main():
+    """Run stream refresher tests"""
+    print("🎵 Stream Refresher Test Suite")
+    print("=" * 50)
+
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestStreamRefresher)
+    result = unittest.TextTestRunner(verbosity=2).run(suite)
+
+    if result.wasSuccessful():
+        print("🎉 All stream refresher tests passed!")
+    else:
+        print("⚠️  Some stream refresher tests failed.")
+    return result.wasSuccessful()
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
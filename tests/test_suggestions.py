@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Test the play suggestion index behind /play autocomplete.
+"""
+
+import os
+import sys
+import time
+import asyncio
+import tempfile
+import unittest
+
+# Add the project directory to Python path (parent directory)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.suggestions import SuggestionIndex
+from utils.streaming_spotify import Song
+
+def make_song(title, video_id):
+    return Song(title, f"https://www.youtube.com/watch?v={video_id}", 200)
+
+class TestSuggestionIndex(unittest.TestCase):
+    """Test cases for the suggestion index"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'plays.db')
+        self.index = SuggestionIndex(self.path)
+
+    def tearDown(self):
+        self.index.close()
+        self.directory.cleanup()
+
+    def titles(self, text, guild_id=None):
+        return [suggestion['title'] for suggestion in self.index.suggest(text, guild_id)]
+
+    def test_prefix_matches_ranked_by_plays(self):
+        """Every typed word prefixes a title word; the guild's plays rank first, then global plays"""
+        print("🧪 Testing prefix matches...")
+
+        never = make_song("Rick Astley - Never Gonna Give You Up", "dQw4w9WgXcQ")
+        nevermind = make_song("Nirvana - Nevermind (Full Album)", "aaaaaaaaaaa")
+        for _ in range(3):
+            self.index.record_play(nevermind, guild_id=2)
+        self.index.record_play(never, guild_id=1)
+
+        self.assertEqual(self.titles("neve"), [nevermind.title, never.title])
+        self.assertEqual(self.titles("neve", guild_id=1), [never.title, nevermind.title])
+        self.assertEqual(self.titles("never gon"), [never.title])
+        self.assertEqual(self.titles("ASTLEY never"), [never.title])
+        self.assertEqual(self.index.suggest("rick")[0]['value'], "https://www.youtube.com/watch?v=dQw4w9WgXcQ")
+        print("✅ Prefix matches work")
+
+    def test_fuzzy_fallback_and_search_results(self):
+        """Typos fall back to trigrams; search results are suggested after played songs"""
+        print("🧪 Testing fuzzy matches...")
+
+        self.index.record_play(make_song("Daft Punk - Harder Better Faster Stronger", "bbbbbbbbbbb"))
+        self.index.add_results([{'id': 'ccccccccccc', 'title': 'Daft Punk - Around the World'}])
+
+        self.assertEqual(self.titles("harder bettr"), ["Daft Punk - Harder Better Faster Stronger"])
+        self.assertEqual(self.titles("daft"), ["Daft Punk - Harder Better Faster Stronger", "Daft Punk - Around the World"])
+        # Nothing typed: only songs that were actually played
+        self.assertEqual(self.titles(""), ["Daft Punk - Harder Better Faster Stronger"])
+        print("✅ Fuzzy matches work")
+
+    def test_unplayed_results_evicted_first(self):
+        """Over the size limit, the oldest search results go and played songs stay"""
+        print("🧪 Testing eviction...")
+
+        index = SuggestionIndex(self.path, max_entries=3)
+        index.record_play(make_song("Played Song", "ddddddddddd"))
+        for i in range(5):
+            index.add_result(f"Result {i}", f"https://www.youtube.com/watch?v=result{i:05d}", f"result{i:05d}")
+
+        self.assertEqual(len(index.entries), 3)
+        self.assertCountEqual([s["title"] for s in index.suggest("result")], ["Result 3", "Result 4"])
+        self.assertEqual([s['title'] for s in index.suggest("played")], ["Played Song"])
+        self.assertEqual(len(index._words), 6)  # "played", "song", and "result" plus a number for each remaining result
+        index.close()
+        print("✅ Eviction works")
+
+    def test_played_songs_evicted_by_plays(self):
+        """Played songs count towards the size limit; the least played go, and rankings follow every play"""
+        print("🧪 Testing played song eviction...")
+
+        index = SuggestionIndex(self.path, max_entries=3)
+        songs = [make_song(f"Track {name}", name * 11) for name in "abcd"]
+        for song, plays in zip(songs, (3, 1, 2)):
+            for _ in range(plays):
+                index.record_play(song, guild_id=1)
+        index.record_play(songs[3], guild_id=2)  # Ties with Track b, but more recent: b goes
+
+        self.assertEqual(len(index.entries), 3)
+        self.assertEqual([s['title'] for s in index.suggest("track")], ["Track a", "Track c", "Track d"])
+        for _ in range(3):
+            index.record_play(songs[3], guild_id=1)
+        self.assertEqual([s['title'] for s in index.suggest("", guild_id=1)], ["Track d", "Track a", "Track c"])
+        self.assertEqual([s['title'] for s in index.suggest("", guild_id=2)], ["Track d", "Track a", "Track c"])
+        self.assertEqual(index._ranked, sorted(index._ranked))
+        self.assertEqual(len(index._words), 6)  # "track" and a letter for each remaining song
+        index.close()
+        print("✅ Played song eviction works")
+
+    def test_history_survives_restart(self):
+        """Play counts are reloaded from SQLite"""
+        print("🧪 Testing reload...")
+
+        async def scenario():
+            self.index.record_play(make_song("Song A", "eeeeeeeeeee"), guild_id=1)
+            self.index.record_play(make_song("Song B", "fffffffffff"), guild_id=1)
+            self.index.record_play(make_song("Song B", "fffffffffff"), guild_id=2)
+            await asyncio.sleep(0.1)  # Let the executor writes finish
+
+            reloaded = SuggestionIndex(self.path)
+            await reloaded.load()
+            try:
+                return reloaded.suggest("song"), reloaded.suggest("song", guild_id=1)
+            finally:
+                reloaded.close()
+
+        overall, _ = asyncio.run(scenario())
+        self.assertEqual([(s['title'], s['plays']) for s in overall], [("Song B", 2), ("Song A", 1)])
+        print("✅ Reload works")
+
+    def test_lookup_speed(self):
+        """Lookups on a large index stay far below Discord's autocomplete deadline"""
+        print("🧪 Testing lookup speed...")
+
+        for i in range(20_000):
+            self.index._count_play(f"{i:011d}", f"Artist {i % 700} - Track title number {i}",
+                                   f"https://www.youtube.com/watch?v={i:011d}", i % 5, plays=i % 13 + 1, keep_sorted=False)
+        self.index._words.sort()
+        self.index._rebuild_rankings()
+
+        started = time.perf_counter()
+        for text in ("", "a", "artist 12", "track title numbr 4", "zzzz"):
+            self.assertLessEqual(len(self.index.suggest(text, guild_id=1)), 25)
+        self.assertLess((time.perf_counter() - started) / 5, 0.05)
+        print(f"✅ Average lookup: {self.index.get_stats()['avg_ms']:.2f} ms")
+
+def main():
+    """Run suggestion tests"""
+    print("🎵 Play Suggestion Test Suite")
+    print("=" * 50)
+
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestSuggestionIndex)
+    result = unittest.TextTestRunner(verbosity=2).run(suite)
+
+    if result.wasSuccessful():
+        print("🎉 All suggestion tests passed!")
+    else:
+        print("⚠️  Some suggestion tests failed.")
+    return result.wasSuccessful()
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Test the persistent Spotify to YouTube track mapping.
+"""
+
+import os
+import sys
+import asyncio
+import tempfile
+import unittest
+
+# Add the project directory to Python path (parent directory)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.track_mapping import TrackMapping
+from utils.streaming_spotify import MusicPlayer
+
+class TestTrackMapping(unittest.TestCase):
+    """Test cases for the track mapping"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'mapping.db')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_lookup_by_id_and_isrc(self):
+        """Mappings are found by track id or ISRC, across instances, and keep their ISRC"""
+        print("🧪 Testing mapping lookups...")
+
+        mapping = TrackMapping(self.path)
+        self.assertIsNone(mapping.lookup('track1', 'USRC1'))
+        mapping.store('track1', 'dQw4w9WgXcQ', 'USRC1', 'Song', 213)
+        mapping.store('track1', 'dQw4w9WgXcQ', None, 'Song', 213)  # A later match without ISRC
+        mapping.close()
+
+        other = TrackMapping(self.path)  # e.g. the backend process
+        self.assertEqual(other.lookup('track1'), {'video_id': 'dQw4w9WgXcQ', 'title': 'Song', 'duration': 213})
+        self.assertEqual(other.lookup('single-version', 'USRC1')['video_id'], 'dQw4w9WgXcQ')
+        self.assertIsNone(other.lookup('unknown', 'OTHER'))
+        self.assertEqual(other.get_stats()['hits'], 2)
+        other.close()
+        print("✅ Mapping lookups work")
+
+    def test_unwritable_directory(self):
+        """A database directory that can't be created means no mapping, not an error"""
+        print("🧪 Testing an unwritable mapping directory...")
+
+        blocker = os.path.join(self.directory.name, 'file')
+        open(blocker, 'w').close()
+        mapping = TrackMapping(os.path.join(blocker, 'data', 'mapping.db'))  # A file where a directory should be
+        mapping.store('track1', 'dQw4w9WgXcQ')
+        self.assertIsNone(mapping.lookup('track1'))
+        print("✅ Unwritable directory falls back to no mapping")
+
+    def test_second_play_skips_search(self):
+        """Resolving a Spotify track searches YouTube only the first time"""
+        print("🧪 Testing search reuse...")
+
+        player = MusicPlayer()
+        player.track_mapping = TrackMapping(self.path)
+        searches = []
+
+        async def search_spotify_track(spotify_info):
+            searches.append(spotify_info['query'])
+            return {'title': 'Never Gonna Give You Up', 'url': 'https://www.youtube.com/watch?v=dQw4w9WgXcQ', 'duration': 213}
+
+        player.search_spotify_track = search_spotify_track
+        spotify_info = {'title': 'Never Gonna Give You Up', 'query': 'Never Gonna Give You Up Rick Astley',
+                        'spotify_id': '4uLU6hMCjMI75M1A2tKUQC', 'isrc': 'GBARL9300135'}
+
+        first = asyncio.run(player.resolve_spotify_track(spotify_info))
+        second = asyncio.run(player.resolve_spotify_track(spotify_info))
+        self.assertEqual(len(searches), 1)
+        self.assertEqual(second['url'], first['url'])
+        self.assertEqual(second['duration'], 213)
+        player.track_mapping.close()
+        print("✅ Second play needs no search")
+
+def main():
+    """Run track mapping tests"""
+    print("🎵 Track Mapping Test Suite")
+    print("=" * 50)
+
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestTrackMapping)
+    result = unittest.TextTestRunner(verbosity=2).run(suite)
+
+    if result.wasSuccessful():
+        print("🎉 All track mapping tests passed!")
+    else:
+        print("⚠️  Some track mapping tests failed.")
+    return result.wasSuccessful()
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
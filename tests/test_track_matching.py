@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Test scoring of YouTube search results against a known track.
+"""
+
+import os
+import sys
+import unittest
+
+# Add the project directory to Python path (parent directory)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.track_matching import best_match, normalize
+
+def candidate(video_id, title, duration, channel="Some Channel"):
+    return {'id': video_id, 'title': title, 'duration': duration, 'channel': channel}
+
+class TestTrackMatching(unittest.TestCase):
+    """Test cases for track matching"""
+
+    def test_normalize(self):
+        """Case, punctuation and bracketed suffixes are dropped"""
+        self.assertEqual(normalize("Rick Astley - Never Gonna Give You Up (Official Music Video) [4K]"),
+                         "rick astley never gonna give you up")
+
+    def test_prefers_original_version(self):
+        """Live versions, loops and lyric videos with long intros lose to the original"""
+        print("🧪 Testing candidate scoring...")
+
+        candidates = [
+            candidate('live0000000', "Rick Astley - Never Gonna Give You Up (Live at Glastonbury)", 260),
+            candidate('loop0000000', "Never Gonna Give You Up 1 Hour", 3600),
+            candidate('lyric000000', "Never Gonna Give You Up - Lyrics", 245),
+            candidate('origin00000', "Never Gonna Give You Up", 213, channel="Rick Astley - Topic"),
+            candidate('cover000000', "Never Gonna Give You Up (cover)", 214),
+        ]
+        winner = best_match(candidates, "Never Gonna Give You Up", "Rick Astley", 213)
+        self.assertEqual(winner['id'], 'origin00000')
+        print("✅ The original version wins")
+
+    def test_wanted_version_not_penalized(self):
+        """A remix is picked when the remix is what was asked for"""
+        candidates = [
+            candidate('original000', "Artist - Song", 200),
+            candidate('remix000000', "Artist - Song (Club Remix)", 320),
+        ]
+        self.assertEqual(best_match(candidates, "Song - Club Remix", "Artist", 320)['id'], 'remix000000')
+        self.assertIsNone(best_match([], "Song"))
+
+def main():
+    """Run track matching tests"""
+    print("🎵 Track Matching Test Suite")
+    print("=" * 50)
+
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestTrackMatching)
+    result = unittest.TextTestRunner(verbosity=2).run(suite)
+
+    if result.wasSuccessful():
+        print("🎉 All track matching tests passed!")
+    else:
+        print("⚠️  Some track matching tests failed.")
+    return result.wasSuccessful()
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Test YouTube playlist import (flat extraction, queueing without resolving each video).
+"""
+
+import os
+import sys
+import asyncio
+import unittest
+from unittest.mock import Mock, AsyncMock, patch
+
+# Add the project directory to Python path (parent directory)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import streaming_youtube
+from utils.streaming_youtube import extract_playlist_id
+from utils.streaming_spotify import MusicPlayer
+from commands.play import play_command
+
+class FakeYoutubeDL:
+    """Returns a flat playlist listing and records the options it was created with"""
+    created = []
+
+    def __init__(self, options):
+        self.options = options
+        FakeYoutubeDL.created.append(options)
+
+    def extract_info(self, url, download=False):
+        entries = [{'id': f"video{i:06d}", 'title': f"Video {i}", 'duration': 180,
+                    'thumbnails': [{'url': f"https://i.ytimg.com/vi/video{i:06d}/hqdefault.jpg"}]}
+                   for i in range(300)]
+        entries[3] = {'id': 'private0000', 'title': '[Private video]', 'duration': None}
+        return {'title': "Big Playlist", 'entries': entries}
+
+class TestYoutubePlaylist(unittest.TestCase):
+    """Test cases for YouTube playlist import"""
+
+    def test_playlist_ids(self):
+        """Playlist and watch-in-playlist links are recognised, mixes and plain videos are not"""
+        self.assertEqual(extract_playlist_id("https://www.youtube.com/playlist?list=PLabc_123"), "PLabc_123")
+        self.assertEqual(extract_playlist_id("https://www.youtube.com/watch?v=dQw4w9WgXcQ&list=PLabc"), "PLabc")
+        self.assertIsNone(extract_playlist_id("https://www.youtube.com/watch?v=dQw4w9WgXcQ&list=RDdQw4w9WgXcQ"))
+        self.assertIsNone(extract_playlist_id("https://www.youtube.com/watch?v=dQw4w9WgXcQ"))
+        self.assertIsNone(extract_playlist_id("songs with list=PL in the name"))
+
+    def test_playlist_is_queued_flat(self):
+        """One flat extraction queues the whole playlist, skipping private videos"""
+        print("🧪 Testing playlist import...")
+
+        FakeYoutubeDL.created = []
+        player = MusicPlayer()
+        player.is_playing = True  # Everything goes to the queue
+        interaction = Mock()
+        interaction.response = AsyncMock()
+        interaction.followup = AsyncMock()
+        interaction.user = Mock(id=1234)
+        operations = []
+        player.queue.subscribe(lambda op, *args: operations.append(op))
+
+        with patch.object(streaming_youtube.yt_dlp, 'YoutubeDL', FakeYoutubeDL):
+            asyncio.run(play_command(interaction, "https://www.youtube.com/playlist?list=PLbig", player))
+
+        self.assertEqual(len(FakeYoutubeDL.created), 1)
+        self.assertEqual(FakeYoutubeDL.created[0]['extract_flat'], 'in_playlist')
+        self.assertEqual(len(player.queue), 299)
+        self.assertEqual(operations, ['insert', 'extend'])  # The first song, then the rest in one batch
+        self.assertNotIn('private0000', [song.video_id for song in player.queue])
+        self.assertIsNone(player.queue[0].stream_url)  # Resolved when it comes up
+        self.assertEqual(player.queue[5].thumbnail, "https://i.ytimg.com/vi/video000006/hqdefault.jpg")
+        embed = interaction.followup.send.call_args.kwargs['embed']
+        self.assertIn("298 more song(s) queued", embed.description)
+        print("✅ Playlists are queued from one flat extraction")
+
+def main():
+    """Run YouTube playlist tests"""
+    print("🎵 YouTube Playlist Test Suite")
+    print("=" * 50)
+
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestYoutubePlaylist)
+    result = unittest.TextTestRunner(verbosity=2).run(suite)
+
+    if result.wasSuccessful():
+        print("🎉 All YouTube playlist tests passed!")
+    else:
+        print("⚠️  Some YouTube playlist tests failed.")
+    return result.wasSuccessful()
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,365 @@
+"""
+On-Disk Opus Cache
+
+A small number of hot tracks make up most plays. This module keeps fully
+downloaded Ogg/Opus files for them, keyed by YouTube video id:
+- plays are counted per video and a track is downloaded in the background
+  once it reaches AUDIO_CACHE_MIN_PLAYS; counts are kept for the
+  AUDIO_CACHE_MAX_TRACKED most recently played videos only
+- the cache stays under a byte budget with LRU or LFU eviction
+- cached plays skip yt-dlp and the network entirely, and are read through
+  memory-mapped I/O as ready-to-send Opus packets (no FFmpeg process either)
+- seeking uses the Ogg granule positions, so it is instant
+"""
+
+import os
+import asyncio
+import glob
+import json
+import mmap
+import struct
+import threading
+import time
+
+import discord
+import yt_dlp
+
+AUDIO_CACHE_DIR = os.getenv('AUDIO_CACHE_DIR', os.path.join('cache', 'audio'))
+AUDIO_CACHE_MAX_BYTES = int(os.getenv('AUDIO_CACHE_MAX_BYTES', str(2 * 1024 ** 3)))  # 2 GB
+AUDIO_CACHE_MIN_PLAYS = int(os.getenv('AUDIO_CACHE_MIN_PLAYS', '3'))
+AUDIO_CACHE_POLICY = os.getenv('AUDIO_CACHE_POLICY', 'lru').lower()  # 'lru' or 'lfu'
+AUDIO_CACHE_MAX_TRACKED = int(os.getenv('AUDIO_CACHE_MAX_TRACKED', '10000'))  # Videos whose plays are counted
+
+OPUS_SAMPLE_RATE = 48000
+OPUS_SAMPLES_PER_FRAME = 960  # 20 ms at 48 kHz
+
+# Ogg page header: capture pattern, version, flags, granule position, serial, page number, CRC, segment count
+_OGG_HEADER = struct.Struct('<4sBBqIIIB')
+
+class CachedOpusSource(discord.AudioSource):
+    """Plays an Ogg/Opus file by handing its packets straight to Discord, read through mmap"""
+
+    def __init__(self, path, start_time=0):
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self._file.close()
+            raise
+        self._packets = self._iter_packets(self._seek_offset(start_time))
+
+    def _pages(self, offset):
+        """Yield (offset, flags, granule, segment table, body offset) for every page from `offset`"""
+        data = self._map
+        size = len(data)
+        while offset + _OGG_HEADER.size <= size:
+            magic, _, flags, granule, _, _, _, segments = _OGG_HEADER.unpack_from(data, offset)
+            if magic != b'OggS':
+                return
+            table_start = offset + _OGG_HEADER.size
+            table = data[table_start:table_start + segments]
+            body = table_start + segments
+            yield offset, flags, granule, table, body
+            offset = body + sum(table)
+
+    def _seek_offset(self, start_time):
+        """Find where to start reading: a page offset plus the number of packets to skip in it"""
+        target = int(start_time * OPUS_SAMPLE_RATE)
+        if target <= 0:
+            return 0, 0
+
+        previous_granule = 0
+        for offset, _, granule, _, _ in self._pages(0):
+            # Granule is the end position of the last packet completed on the page (-1 = none)
+            if granule >= target:
+                return offset, max(0, (target - previous_granule) // OPUS_SAMPLES_PER_FRAME)
+            if granule > 0:
+                previous_granule = granule
+        return len(self._map), 0
+
+    def _iter_packets(self, start):
+        offset, skip = start
+        partial = b''
+        first_page = True
+        for _, flags, _, table, body in self._pages(offset):
+            # When starting mid-stream, drop the tail of a packet begun on an earlier page
+            continued = first_page and offset > 0 and flags & 0x01
+            first_page = False
+            position = body
+            for segment in table:
+                partial += self._map[position:position + segment]
+                position += segment
+                if segment < 255:
+                    packet, partial = partial, b''
+                    if continued:
+                        continued = False
+                        continue
+                    # Skip the OpusHead/OpusTags header packets
+                    if packet.startswith(b'OpusHead') or packet.startswith(b'OpusTags'):
+                        continue
+                    if skip:
+                        skip -= 1
+                        continue
+                    yield packet
+
+    def read(self):
+        return next(self._packets, b'')
+
+    def is_opus(self):
+        return True
+
+    def cleanup(self):
+        try:
+            self._packets.close()
+            self._map.close()
+        except Exception:
+            pass
+        self._file.close()
+
+class AudioCache:
+    """Byte-budgeted cache of pre-encoded Ogg/Opus files with background population"""
+
+    def __init__(self, directory=AUDIO_CACHE_DIR, max_bytes=AUDIO_CACHE_MAX_BYTES,
+                 min_plays=AUDIO_CACHE_MIN_PLAYS, policy=AUDIO_CACHE_POLICY, max_downloads=2,
+                 max_tracked=AUDIO_CACHE_MAX_TRACKED):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.min_plays = min_plays
+        self.policy = policy
+        self.max_tracked = max_tracked
+        self.entries = {}  # video_id -> {'size', 'cached_at', 'last_played', 'plays'}
+        self.plays = {}  # video_id -> play count (cached or not), least recently played first
+        self.hits = 0
+        self.misses = 0
+        self._pending = set()
+        self._download_semaphore = None
+        self._max_downloads = max_downloads
+        self._plays_since_save = 0
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()  # One index write at a time
+        self._load_index()
+
+    @property
+    def _index_path(self):
+        return os.path.join(self.directory, 'index.json')
+
+    def path_for(self, video_id):
+        """Get where a video's file lives in the cache (whether or not it exists)"""
+        return os.path.join(self.directory, f'{video_id}.opus')
+
+    def _load_index(self):
+        """Load the index, dropping entries whose files have gone missing"""
+        try:
+            with open(self._index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+
+        self.plays = data.get('plays', {})
+        self._forget_old_plays()
+        self.entries = {
+            video_id: entry for video_id, entry in data.get('entries', {}).items()
+            if os.path.exists(self.path_for(video_id))
+        }
+
+    def _save_index(self):
+        with self._save_lock:
+            with self._lock:
+                data = {'entries': dict(self.entries), 'plays': dict(self.plays)}
+            try:
+                os.makedirs(self.directory, exist_ok=True)
+                temp_path = self._index_path + '.tmp'
+                with open(temp_path, 'w', encoding='utf-8') as f:
+                    json.dump(data, f)
+                os.replace(temp_path, self._index_path)
+            except OSError as e:
+                print(f"Failed to save audio cache index: {e}")
+
+    def _save_index_soon(self):
+        """Save the index in a worker thread, so a large index never stalls the event loop"""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None  # Called outside the event loop
+        if loop:
+            loop.run_in_executor(None, self._save_index)
+        else:
+            self._save_index()
+
+    def _forget_old_plays(self):
+        """Drop the counts of the least recently played videos beyond max_tracked (lock held).
+        Cached videos keep their count in their entry."""
+        while len(self.plays) > self.max_tracked:
+            del self.plays[next(iter(self.plays))]
+
+    @property
+    def total_bytes(self):
+        return sum(entry['size'] for entry in self.entries.values())
+
+    def is_cached(self, video_id):
+        """Check whether a video is cached (without counting it as a lookup)"""
+        return bool(video_id) and video_id in self.entries
+
+    def get_path(self, video_id):
+        """Get the cached file for a video, or None if it is not cached"""
+        if not video_id:
+            return None
+        entry = self.entries.get(video_id)
+        if entry:
+            path = self.path_for(video_id)
+            if os.path.exists(path):
+                self.hits += 1
+                return path
+            # File was removed behind our back
+            with self._lock:
+                self.entries.pop(video_id, None)
+        self.misses += 1
+        return None
+
+    def open_source(self, video_id, start_time=0):
+        """Open a cached video as an audio source (None if it is not cached)"""
+        path = self.get_path(video_id)
+        if not path:
+            return None
+        return CachedOpusSource(path, start_time)
+
+    def record_play(self, video_id, url=None):
+        """Count a play and start a background download once the video is hot enough"""
+        if not video_id:
+            return
+        url = url or f"https://www.youtube.com/watch?v={video_id}"
+
+        with self._lock:
+            entry = self.entries.get(video_id)
+            # Re-inserted, so the dict stays ordered from least to most recently played
+            self.plays[video_id] = self.plays.pop(video_id, entry.get('plays', 0) if entry else 0) + 1
+            self._forget_old_plays()
+            if entry:
+                entry['plays'] = self.plays[video_id]
+                entry['last_played'] = time.time()
+            should_populate = (
+                entry is None
+                and video_id not in self._pending
+                and self.plays[video_id] >= self.min_plays
+            )
+            if should_populate:
+                self._pending.add(video_id)
+            self._plays_since_save += 1
+            save = self._plays_since_save >= 20
+
+        if should_populate:
+            asyncio.get_running_loop().create_task(self._populate(video_id, url))
+        if save:
+            self._plays_since_save = 0
+            self._save_index_soon()
+
+    async def _populate(self, video_id, url):
+        """Download and store a video as Ogg/Opus without blocking playback"""
+        if self._download_semaphore is None:
+            self._download_semaphore = asyncio.Semaphore(self._max_downloads)
+
+        try:
+            async with self._download_semaphore:
+                print(f"Caching hot track {video_id} ({self.plays.get(video_id, 0)} plays)")
+                loop = asyncio.get_running_loop()
+                size = await loop.run_in_executor(None, self._download, video_id, url)
+
+            if size:
+                with self._lock:
+                    self.entries[video_id] = {
+                        'size': size,
+                        'cached_at': time.time(),
+                        'last_played': time.time(),
+                        'plays': self.plays.get(video_id, 0)
+                    }
+                self.evict()
+                self._save_index_soon()
+                print(f"Cached {video_id} ({size // 1024} KB, cache now {self.total_bytes // (1024 * 1024)} MB)")
+        except Exception as e:
+            print(f"Error caching {video_id}: {e}")
+        finally:
+            self._pending.discard(video_id)
+
+    def _download(self, video_id, url):
+        """Blocking download + remux to Ogg/Opus (runs in a worker thread). Returns the file size."""
+        os.makedirs(self.directory, exist_ok=True)
+        temp_base = os.path.join(self.directory, f'{video_id}.part')
+        ydl_opts = {
+            'format': 'bestaudio[acodec=opus]/bestaudio',
+            'outtmpl': temp_base + '.%(ext)s',
+            'noplaylist': True,
+            'quiet': True,
+            'no_warnings': True,
+            'postprocessors': [{
+                'key': 'FFmpegExtractAudio',
+                'preferredcodec': 'opus',  # Copies YouTube's Opus stream into an Ogg container
+            }],
+            'extractor_args': {
+                'youtube': {
+                    'player_client': ['android', 'web'],
+                }
+            }
+        }
+
+        try:
+            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+                ydl.download([url])
+
+            temp_path = temp_base + '.opus'
+            if not os.path.exists(temp_path):
+                return None
+            final_path = self.path_for(video_id)
+            os.replace(temp_path, final_path)
+            return os.path.getsize(final_path)
+        finally:
+            # Partial downloads and intermediate files don't count toward the budget, so never leave them behind
+            for leftover in glob.glob(glob.escape(temp_base) + '.*'):
+                try:
+                    os.remove(leftover)
+                except OSError:
+                    pass
+
+    def _eviction_key(self, item):
+        _, entry = item
+        if self.policy == 'lfu':
+            return (entry.get('plays', 0), entry.get('last_played', 0))
+        return (entry.get('last_played', 0), entry.get('plays', 0))
+
+    def evict(self):
+        """Remove the least recently (or least frequently) used files until under budget"""
+        with self._lock:
+            total = self.total_bytes
+            if total <= self.max_bytes:
+                return []
+            victims = []
+            for video_id, entry in sorted(self.entries.items(), key=self._eviction_key):
+                if total <= self.max_bytes:
+                    break
+                victims.append(video_id)
+                total -= entry['size']
+            for video_id in victims:
+                del self.entries[video_id]
+
+        for video_id in victims:
+            try:
+                os.remove(self.path_for(video_id))
+            except OSError:
+                pass
+        if victims:
+            print(f"Evicted {len(victims)} track(s) from the audio cache")
+        return victims
+
+    def get_stats(self):
+        """Get cache size and hit rate"""
+        lookups = self.hits + self.misses
+        return {
+            'tracks': len(self.entries),
+            'bytes': self.total_bytes,
+            'max_bytes': self.max_bytes,
+            'pending': len(self._pending),
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
+
+# Create global audio cache instance
+audio_cache = AudioCache()
@@ -0,0 +1,330 @@
+"""
+Multiplexed Audio Scheduler
+
+discord.py starts one AudioPlayer thread per voice client, each waking every
+20 ms. This module provides an alternative playback engine where a small pool
+of scheduler threads drives frame reads and packet sends for every player on
+a shared 20 ms tick.
+
+Enable it by setting AUDIO_ENGINE=multiplexed. Players are duck-typed to
+discord.py's AudioPlayer so voice_client.is_playing()/pause()/resume()/stop()
+keep working unchanged.
+"""
+
+import os
+import asyncio
+import threading
+import time
+from collections import deque
+
+import discord
+from discord.opus import Encoder as OpusEncoder
+from discord.enums import SpeakingState
+
+# 'thread' = discord.py's default one-thread-per-player, 'multiplexed' = shared scheduler
+AUDIO_ENGINE = os.getenv('AUDIO_ENGINE', 'thread').lower()
+
+# Number of scheduler threads; each owns a shard of the players
+AUDIO_SCHEDULER_THREADS = int(os.getenv('AUDIO_SCHEDULER_THREADS', str(min(4, os.cpu_count() or 1))))
+
+FRAME_LENGTH = OpusEncoder.FRAME_LENGTH / 1000.0  # 20 ms
+PCM_FRAME_SIZE = OpusEncoder.FRAME_SIZE  # Bytes of 16-bit stereo 48 kHz PCM per frame
+OPUS_SILENCE = b'\xf8\xff\xfe'
+
+class MultiplexedPlayer:
+    """Per-voice-client playback state, driven by an AudioScheduler worker instead of its own thread"""
+
+    def __init__(self, source, client, after=None):
+        if after is not None and not callable(after):
+            raise TypeError('Expected a callable for the "after" parameter.')
+
+        self.source = source
+        self.client = client
+        self.after = after
+        self.frames_sent = 0
+
+        self._end = threading.Event()
+        self._paused = False
+        self._pending_silence = 0
+        self._current_error = None
+        self._disconnected_since = None
+        self._lock = threading.Lock()
+        self._pcm_fd = None
+        self._pcm_buffer = bytearray()
+        self._prepare_source(source)
+
+    def _prepare_source(self, source):
+        """Switch FFmpeg PCM pipes to non-blocking reads so a stalled stream never holds up the tick"""
+        self._pcm_fd = None
+        self._pcm_buffer = bytearray()
+        stdout = getattr(source, '_stdout', None)
+        if isinstance(source, discord.FFmpegPCMAudio) and stdout:
+            try:
+                fd = stdout.fileno()
+                os.set_blocking(fd, False)
+                self._pcm_fd = fd
+            except (OSError, ValueError, AttributeError):
+                self._pcm_fd = None
+
+    def _read_frame(self):
+        """Read one frame. Returns None if the source has no complete frame ready yet, b'' at the end."""
+        if self._pcm_fd is None:
+            return self.source.read()
+
+        while len(self._pcm_buffer) < PCM_FRAME_SIZE:
+            try:
+                chunk = os.read(self._pcm_fd, 65536)
+            except BlockingIOError:
+                return None
+            except OSError:
+                chunk = b''
+            if not chunk:
+                # End of stream: flush a final padded frame if anything is left
+                if self._pcm_buffer:
+                    frame = bytes(self._pcm_buffer).ljust(PCM_FRAME_SIZE, b'\x00')
+                    self._pcm_buffer.clear()
+                    return frame
+                return b''
+            self._pcm_buffer += chunk
+
+        frame = bytes(self._pcm_buffer[:PCM_FRAME_SIZE])
+        del self._pcm_buffer[:PCM_FRAME_SIZE]
+        return frame
+
+    def tick(self):
+        """Advance this player by one frame. Returns False once playback has finished."""
+        if self._end.is_set():
+            return False
+
+        client = self.client
+
+        if self._paused:
+            if self._pending_silence:
+                self._pending_silence -= 1
+                self._send(OPUS_SILENCE, False)
+            return True
+
+        if not client.is_connected():
+            # Wait for a reconnect, but not forever (mirrors AudioPlayer's behaviour)
+            if self._disconnected_since is None:
+                self._disconnected_since = time.perf_counter()
+            elif time.perf_counter() - self._disconnected_since > getattr(client, 'timeout', 60):
+                self._end.set()
+                return False
+            return True
+        if self._disconnected_since is not None:
+            self._disconnected_since = None
+            self._speak(SpeakingState.voice)
+
+        with self._lock:
+            try:
+                data = self._read_frame()
+            except Exception as e:
+                self._current_error = e
+                self._end.set()
+                return False
+
+            if data is None:
+                return True  # Underrun: skip this tick rather than block the whole shard
+
+            if not data:
+                if self._current_error is None:
+                    check = getattr(self.source, '_check_process_returncode', None)
+                    if check:
+                        check()
+                    self._current_error = getattr(self.source, '_current_error', None)
+                self._end.set()
+                return False
+
+            try:
+                self._send(data, not self.source.is_opus())
+            except Exception as e:
+                self._current_error = e
+                self._end.set()
+                return False
+
+        self.frames_sent += 1
+        return True
+
+    def _send(self, data, encode):
+        self.client.send_audio_packet(data, encode=encode)
+
+    def finish(self):
+        """Run the after callback and clean up the source (called once, from the scheduler thread)"""
+        try:
+            if self.client.is_connected():
+                for _ in range(5):
+                    self._send(OPUS_SILENCE, False)
+        except Exception:
+            pass
+
+        if self.after is not None:
+            try:
+                self.after(self._current_error)
+            except Exception as e:
+                print(f"Calling the after function failed: {e}")
+        elif self._current_error:
+            print(f"Exception in multiplexed audio player: {self._current_error}")
+
+        try:
+            self.source.cleanup()
+        except Exception as e:
+            print(f"Error cleaning up audio source: {e}")
+
+    def _speak(self, state):
+        try:
+            asyncio.run_coroutine_threadsafe(self.client.ws.speak(state), self.client.client.loop)
+        except Exception:
+            pass
+
+    # AudioPlayer-compatible interface used by discord.VoiceClient
+
+    def stop(self):
+        self._end.set()
+        self._speak(SpeakingState.none)
+
+    def pause(self, *, update_speaking=True):
+        self._paused = True
+        self._pending_silence = 5
+        if update_speaking:
+            self._speak(SpeakingState.none)
+
+    def resume(self, *, update_speaking=True):
+        self._paused = False
+        if update_speaking:
+            self._speak(SpeakingState.voice)
+
+    def is_playing(self):
+        return not self._paused and not self._end.is_set()
+
+    def is_paused(self):
+        return self._paused and not self._end.is_set()
+
+    def set_source(self, source):
+        with self._lock:
+            self.source = source
+            self._prepare_source(source)
+
+class _SchedulerWorker(threading.Thread):
+    """One scheduler thread: ticks its shard of players every 20 ms"""
+
+    def __init__(self, index, jitter_samples=2000):
+        super().__init__(daemon=True, name=f'audio-scheduler-{index}')
+        self.players = []
+        self._incoming = []
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self.ticks = 0
+        self.overruns = 0
+        self.jitter = deque(maxlen=jitter_samples)  # Lateness of each tick in seconds
+
+    def add(self, player):
+        with self._lock:
+            self._incoming.append(player)
+        self._wakeup.set()
+
+    @property
+    def load(self):
+        return len(self.players) + len(self._incoming)
+
+    def run(self):
+        next_tick = None
+        while True:
+            with self._lock:
+                if self._incoming:
+                    self.players.extend(self._incoming)
+                    self._incoming.clear()
+
+            if not self.players:
+                # Nothing to play: sleep until a player is added instead of ticking idle
+                self._wakeup.wait()
+                self._wakeup.clear()
+                next_tick = None
+                continue
+
+            now = time.perf_counter()
+            if next_tick is None:
+                next_tick = now
+            else:
+                self.jitter.append(max(0.0, now - next_tick))
+
+            finished = [player for player in self.players if not player.tick()]
+            if finished:
+                self.players = [player for player in self.players if player not in finished]
+                # After callbacks may start new players, so they run outside the tick
+                for player in finished:
+                    player.finish()
+
+            self.ticks += 1
+            next_tick += FRAME_LENGTH
+            delay = next_tick - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            elif -delay > FRAME_LENGTH:
+                # Fell more than a frame behind: drop the missed ticks instead of bursting packets
+                self.overruns += 1
+                next_tick = time.perf_counter()
+
+class AudioScheduler:
+    """Pool of scheduler threads that drives every MultiplexedPlayer on the node"""
+
+    def __init__(self, threads=AUDIO_SCHEDULER_THREADS):
+        self.thread_count = max(1, threads)
+        self._workers = []
+        self._lock = threading.Lock()
+
+    def _start_workers(self):
+        with self._lock:
+            if not self._workers:
+                for index in range(self.thread_count):
+                    worker = _SchedulerWorker(index)
+                    worker.start()
+                    self._workers.append(worker)
+        return self._workers
+
+    def play(self, voice_client, source, after=None):
+        """Play a source on a voice client using the shared scheduler (same contract as VoiceClient.play)"""
+        if not voice_client.is_connected():
+            raise discord.ClientException('Not connected to voice.')
+
+        if voice_client.is_playing():
+            raise discord.ClientException('Already playing audio.')
+
+        if not isinstance(source, discord.AudioSource):
+            raise TypeError(f'source must be an AudioSource not {source.__class__.__name__}')
+
+        if not source.is_opus():
+            voice_client.encoder = OpusEncoder()
+
+        player = MultiplexedPlayer(source, voice_client, after=after)
+        voice_client._player = player
+        self.add_player(player)
+        player._speak(SpeakingState.voice)
+        return player
+
+    def add_player(self, player):
+        """Assign a player to the least loaded worker"""
+        workers = self._start_workers()
+        min(workers, key=lambda worker: worker.load).add(player)
+
+    def get_stats(self):
+        """Get player counts, tick jitter and overruns across all workers"""
+        jitter = sorted(sample for worker in self._workers for sample in worker.jitter)
+        return {
+            'threads': len(self._workers),
+            'players': sum(worker.load for worker in self._workers),
+            'ticks': sum(worker.ticks for worker in self._workers),
+            'overruns': sum(worker.overruns for worker in self._workers),
+            'jitter_mean_ms': (sum(jitter) / len(jitter) * 1000) if jitter else 0.0,
+            'jitter_p99_ms': (jitter[int(len(jitter) * 0.99) - 1] * 1000) if jitter else 0.0
+        }
+
+def play_audio(voice_client, source, after=None):
+    """Start playback with the configured audio engine"""
+    if AUDIO_ENGINE == 'multiplexed':
+        audio_scheduler.play(voice_client, source, after=after)
+    else:
+        voice_client.play(source, after=after)
+
+# Create global audio scheduler instance
+audio_scheduler = AudioScheduler()
@@ -0,0 +1,257 @@
+"""
+Shared Decode Broadcast
+
+When the same video plays in many guilds at once, each guild would normally
+run its own FFmpeg decode and Opus encode. A BroadcastHub decodes and encodes
+a video once and fans the Opus frames out to every subscribed guild.
+
+- A reader thread per hub feeds frames from the upstream FFmpeg process,
+  staying at most SHARED_DECODE_LOOKAHEAD frames ahead of the furthest
+  subscriber, so subscribers never block on the pipe themselves.
+- Every frame is kept from the start of the track, up to
+  SHARED_DECODE_HISTORY frames, so a guild starting the same video later
+  joins the running hub at frame 0 with its own offset.
+- Past that, the track start is given up: frames every subscriber has read
+  are dropped, at most SHARED_DECODE_WINDOW frames are kept for lagging
+  subscribers (one that falls further behind skips ahead), and new guilds
+  get a decode of their own.
+- Hubs are reference counted and shut down when the last subscriber leaves.
+"""
+
+import os
+import threading
+from collections import deque
+
+import discord
+
+from .ffmpeg_supervisor import ffmpeg_supervisor, SupervisedFFmpegOpusAudio
+from .audio_scheduler import AUDIO_ENGINE
+
+# Set SHARED_DECODE=false to give every guild its own FFmpeg process
+SHARED_DECODE = os.getenv('SHARED_DECODE', 'true').lower() in ('1', 'true', 'yes')
+SHARED_DECODE_LOOKAHEAD = int(os.getenv('SHARED_DECODE_LOOKAHEAD', '250'))  # Frames decoded ahead (5 s)
+# Frames kept from the start for late joiners (10 min, about 10 MB of Opus at 128 kbps)
+SHARED_DECODE_HISTORY = int(os.getenv('SHARED_DECODE_HISTORY', '30000'))
+SHARED_DECODE_WINDOW = int(os.getenv('SHARED_DECODE_WINDOW', '1500'))  # Frames kept for lagging subscribers (30 s)
+
+class BroadcastHub:
+    """One upstream Opus encode of a video, shared by any number of subscribers"""
+
+    def __init__(self, video_id, stream_url, upstream, registry,
+                 lookahead=SHARED_DECODE_LOOKAHEAD, window=SHARED_DECODE_WINDOW, history=SHARED_DECODE_HISTORY):
+        self.video_id = video_id
+        self.stream_url = stream_url
+        self.upstream = upstream
+        self.lookahead = lookahead
+        self.window = window
+        self.history = history
+        self.frames = deque()
+        self.base = 0  # Track index of frames[0]
+        self.finished = False
+        self.error = None
+        self.subscribers = 0
+        self._readers = set()  # Attached BroadcastSubscribers
+        self._registry = registry
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._decode, name=f"broadcast-{video_id}", daemon=True)
+        self._thread.start()
+
+    @property
+    def end(self):
+        """Track index of the next frame to be decoded"""
+        return self.base + len(self.frames)
+
+    def _decode(self):
+        """Reader thread: keep the buffer filled ahead of the furthest subscriber"""
+        while True:
+            with self._condition:
+                while not self.finished and self.end - max((r.position for r in self._readers), default=self.base) >= self.lookahead:
+                    self._condition.wait()
+                if self.finished:
+                    return
+
+            # Blocking pipe read, outside the lock so subscribers keep reading what is buffered
+            try:
+                data, error = self.upstream.read(), None
+            except Exception as e:
+                data, error = b'', e
+
+            with self._condition:
+                if self.finished:
+                    return
+                if data:
+                    self.frames.append(data)
+                    self._trim()
+                else:
+                    self.finished = True
+                    self.error = error or getattr(self.upstream, '_current_error', None)
+                self._condition.notify_all()
+
+    def _trim(self):
+        """Once the track outgrows the history, drop frames every subscriber has read,
+        and anything beyond the window (lock held)"""
+        if self.end <= self.history:
+            return  # Late joiners can still start at frame 0
+        slowest = min((r.position for r in self._readers), default=self.base)
+        while self.frames and (self.base < slowest or len(self.frames) > self.window):
+            self.frames.popleft()
+            self.base += 1
+
+    def attach(self):
+        """Get a subscriber starting at the first frame, or None if that frame is gone already"""
+        with self._condition:
+            if self.error or self.base > 0:
+                return None
+            subscriber = BroadcastSubscriber(self)
+            self._readers.add(subscriber)
+            self._condition.notify_all()
+            return subscriber
+
+    def detach(self, subscriber):
+        with self._condition:
+            self._readers.discard(subscriber)
+            self._trim()
+            self._condition.notify_all()
+
+    def read(self, subscriber, block=True):
+        """Get the subscriber's next frame. Returns b'' at the end and, when not blocking, None on underrun."""
+        with self._condition:
+            while True:
+                if subscriber.position < self.base:
+                    subscriber.position = self.base  # Fell out of the window: skip ahead
+                if subscriber.position < self.end:
+                    data = self.frames[subscriber.position - self.base]
+                    subscriber.position += 1
+                    self._trim()
+                    self._condition.notify_all()
+                    return data
+                if self.finished:
+                    return b''
+                if not block:
+                    return None
+                self._condition.wait()
+
+    def close(self):
+        """Stop the reader thread and the upstream process and free the buffered frames"""
+        with self._condition:
+            self.finished = True
+            self.frames.clear()
+            self._condition.notify_all()
+        self.upstream.cleanup()  # Also unblocks a pipe read in progress
+
+class BroadcastSubscriber(discord.AudioSource):
+    """Per-guild view of a BroadcastHub with its own playback offset
+
+    With discord.py's player thread, reads wait for the next frame. Under the
+    multiplexed scheduler they return None on underrun instead, so one slow
+    decode never holds up the shared tick.
+    """
+
+    def __init__(self, hub, blocking=AUDIO_ENGINE != 'multiplexed'):
+        self.hub = hub
+        self.blocking = blocking
+        self.position = 0
+        self._current_error = None
+        self._closed = False
+
+    def read(self):
+        data = self.hub.read(self, self.blocking)
+        if data == b'':
+            self._current_error = self.hub.error
+        return data
+
+    def is_opus(self):
+        return True
+
+    def cleanup(self):
+        if not self._closed:
+            self._closed = True
+            self.hub.detach(self)
+            self.hub._registry.unsubscribe(self.hub)
+
+class BroadcastRegistry:
+    """Node-wide map of video id -> BroadcastHub"""
+
+    def __init__(self):
+        self._hubs = {}
+        self._lock = threading.Lock()
+
+    async def subscribe(self, video_id, stream_url, ffmpeg_options=None, before_options=None):
+        """Get a new subscriber for a video, starting a shared decode if none is running"""
+        with self._lock:
+            subscriber = self._join(video_id)
+            if subscriber:
+                print(f"Joined shared decode for {video_id} ({subscriber.hub.subscribers} subscriber(s))")
+                return subscriber
+
+        # Start a new upstream process (outside the lock, waiting for a slot may take a while)
+        if not await ffmpeg_supervisor.acquire_slot(timeout=30):
+            raise Exception("Timed out waiting for a free FFmpeg process slot")
+        try:
+            upstream = SupervisedFFmpegOpusAudio(
+                stream_url,
+                bitrate=128,
+                options=ffmpeg_options,
+                before_options=before_options
+            )
+        except Exception:
+            ffmpeg_supervisor.release_slot()
+            raise
+
+        with self._lock:
+            # Another guild may have started the same video while we were spawning
+            subscriber = self._join(video_id)
+            if subscriber is None:
+                # A hub that is already past its first frame keeps serving its subscribers unregistered
+                hub = BroadcastHub(video_id, stream_url, upstream, self)
+                hub.subscribers = 1
+                self._hubs[video_id] = hub
+                subscriber = hub.attach()
+                upstream = None
+
+        if upstream is not None:
+            upstream.cleanup()
+        return subscriber
+
+    def _join(self, video_id):
+        """Subscribe to the registered hub of a video from its start, if it can still serve that (lock held)"""
+        hub = self._hubs.get(video_id)
+        subscriber = hub.attach() if hub else None
+        if subscriber:
+            hub.subscribers += 1
+        return subscriber
+
+    def subscribe_nowait(self, video_id):
+        """Get a new subscriber for a running shared decode without starting one.
+        Returns None if none is running or its first frame is no longer buffered."""
+        with self._lock:
+            return self._join(video_id)
+
+    def get_stream_url(self, video_id):
+        """Get the stream URL of a running shared decode, or None if there is none"""
+        with self._lock:
+            hub = self._hubs.get(video_id)
+            return hub.stream_url if hub and not hub.error else None
+
+    def unsubscribe(self, hub):
+        """Drop one reference to a hub, closing it when the last subscriber leaves"""
+        with self._lock:
+            hub.subscribers -= 1
+            if hub.subscribers > 0:
+                return
+            if self._hubs.get(hub.video_id) is hub:
+                del self._hubs[hub.video_id]
+        print(f"Last subscriber left shared decode for {hub.video_id}, shutting it down")
+        hub.close()
+
+    def get_stats(self):
+        """Get the number of shared decodes and subscribers"""
+        with self._lock:
+            return {
+                'hubs': len(self._hubs),
+                'subscribers': sum(hub.subscribers for hub in self._hubs.values()),
+                'buffered_frames': sum(len(hub.frames) for hub in self._hubs.values())
+            }
+
+# Create global broadcast registry instance
+broadcast_registry = BroadcastRegistry()
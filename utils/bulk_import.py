@@ -0,0 +1,103 @@
+"""
+Bulk Import
+
+Playlists and song lists can hold hundreds of entries, and each one needs a
+YouTube search taking a second or more. Resolving them one after another
+before playing anything means minutes of silence, so bulk imports:
+- resolve a bounded number of entries at once (BULK_IMPORT_CONCURRENCY)
+- queue results in the original order as soon as every earlier entry is done
+- consume their source lazily, so paginated sources are fetched as needed
+- run in the background, reporting progress through a callback
+"""
+
+import os
+import asyncio
+from collections import deque
+
+BULK_IMPORT_CONCURRENCY = int(os.getenv('BULK_IMPORT_CONCURRENCY', '4'))
+
+async def _iterate(source):
+    if hasattr(source, '__aiter__'):
+        async for item in source:
+            yield item
+    else:
+        for item in source:
+            yield item
+
+async def _resolve_safely(resolve, item):
+    try:
+        return await resolve(item)
+    except Exception as e:
+        print(f"Error resolving {item!r}: {e}")
+        return None
+
+async def resolve_in_order(source, resolve, concurrency=BULK_IMPORT_CONCURRENCY):
+    """Resolve the items of a (sync or async) iterable with at most `concurrency` running at once,
+    yielding (item, result) in source order. Failed resolutions give None."""
+    pending = deque()
+    try:
+        async for item in _iterate(source):
+            pending.append((item, asyncio.ensure_future(_resolve_safely(resolve, item))))
+            if len(pending) >= concurrency:
+                item, task = pending.popleft()
+                yield item, await task
+        while pending:
+            item, task = pending.popleft()
+            yield item, await task
+    finally:
+        # The consumer stopped early: don't leave resolutions running
+        for _, task in pending:
+            task.cancel()
+
+class BulkImport:
+    """Resolves a list of entries into songs in the background and queues them in order"""
+
+    def __init__(self, music_player, resolve, make_song, concurrency=BULK_IMPORT_CONCURRENCY):
+        self.music_player = music_player
+        self.resolve = resolve  # async entry -> video info dict or None
+        self.make_song = make_song  # video info dict -> Song
+        self.concurrency = concurrency
+        self.done = 0
+        self.queued = 0
+        self.duplicates = 0
+        self.failed = []  # Entries that could not be resolved
+        self.skipped = []  # Entries that were resolved but could not be played or queued
+        self.cancelled = False
+
+    async def run(self, source, on_progress=None):
+        """Resolve and queue every entry of source, calling on_progress(self) after each one"""
+        async for entry, video_info in resolve_in_order(source, self.resolve, self.concurrency):
+            if self.cancelled:
+                break
+            self.done += 1
+            if video_info:
+                if self.music_player.enqueue(self.make_song(video_info)) is None:
+                    self.duplicates += 1
+                else:
+                    self.queued += 1
+                    await self._start_if_idle()
+            else:
+                self.failed.append(entry)
+            if on_progress:
+                await on_progress(self)
+        return self
+
+    async def _start_if_idle(self):
+        """Playback stops when the queue runs dry; pick it up again once songs arrive"""
+        player = self.music_player
+        if player.current_song is None and player.voice_client and player.voice_client.is_connected():
+            await player._play_next_in_queue()
+
+    def cancel(self):
+        self.cancelled = True
+
+    def summary(self):
+        """One line describing the outcome"""
+        text = f"{self.queued} song(s) queued"
+        if self.duplicates:
+            text += f", {self.duplicates} already in the queue"
+        if self.failed:
+            text += f", {len(self.failed)} not found"
+        if self.skipped:
+            text += f", {len(self.skipped)} skipped"
+        return text
@@ -0,0 +1,137 @@
+"""
+Fair-Share Queue Scheduling
+
+Plain FIFO lets one person's 500-track playlist block everyone else for
+hours. In fair-share mode the queue is kept as a sequence of rounds, each
+holding at most one song per requester, so requesters take turns:
+- a new song goes at the end of the round after its requester's last queued
+  song (or the current round if they have nothing queued)
+- the queue itself stays the single source of truth for play order, so
+  /queue, ETAs and persistence see exactly what will play
+- finding the insert position walks round sizes from the nearer end of the
+  queue; bulk imports by one requester land in the last round, which is O(1)
+- popping the next song is O(1); any other edit (move, remove, shuffle, ...)
+  marks the round bookkeeping stale and it is rebuilt from the queue order on
+  the next fair insert
+"""
+
+from collections import deque
+
+def requester_key(song):
+    """Who a song counts against: the requester's user id, or the plain requester value"""
+    requester_id = getattr(song, 'requester_id', None)
+    return requester_id if requester_id is not None else getattr(song, 'requester', None)
+
+class FairShareScheduler:
+    """Places new songs in an IndexedQueue so requesters are interleaved round-robin"""
+
+    def __init__(self, queue, key=requester_key):
+        self.queue = queue
+        self.key = key
+        self._rounds = deque()  # Song count per round, _rounds[0] is the round playing now
+        self._base = 0  # Absolute number of _rounds[0]
+        self._last_round = {}  # requester -> absolute round of their last queued song
+        self._counts = {}  # requester -> songs queued
+        self._stale = True
+        self._inserting = False
+        self.rebuilds = 0
+        queue.subscribe(self._on_change)
+
+    def close(self):
+        self.queue.unsubscribe(self._on_change)
+
+    def _on_change(self, op, *args):
+        if self._inserting:
+            return
+        if op == 'pop' and args[0] == 0 and not self._stale:
+            self._pop_front(args[1])
+        elif op == 'clear':
+            self._reset()
+            self._stale = False
+        else:
+            self._stale = True
+
+    def _reset(self):
+        self._rounds = deque()
+        self._base = 0
+        self._last_round = {}
+        self._counts = {}
+
+    def _pop_front(self, song):
+        """The head of the queue always belongs to the first non-empty round"""
+        requester = self.key(song)
+        self._rounds[0] -= 1
+        self._counts[requester] -= 1
+        if not self._counts[requester]:
+            del self._counts[requester]
+            del self._last_round[requester]
+        while self._rounds and not self._rounds[0]:
+            self._rounds.popleft()
+            self._base += 1
+
+    def rebuild(self):
+        """Recompute rounds from the current queue order without reordering it - O(n)"""
+        self._reset()
+        current = 0
+        for song in self.queue:
+            requester = self.key(song)
+            # Rounds never go backwards along the queue, and hold a requester at most once
+            if requester in self._last_round:
+                current = max(current, self._last_round[requester] + 1)
+            while len(self._rounds) <= current:
+                self._rounds.append(0)
+            self._rounds[current] += 1
+            self._last_round[requester] = current
+            self._counts[requester] = self._counts.get(requester, 0) + 1
+        self._stale = False
+        self.rebuilds += 1
+
+    def position_for(self, song):
+        """Where a new song goes, as (queue index, absolute round)"""
+        if self._stale:
+            self.rebuild()
+        requester = self.key(song)
+        target = self._last_round[requester] + 1 if requester in self._last_round else self._base
+        offset = target - self._base
+
+        if offset >= len(self._rounds) - 1:
+            return len(self.queue), target  # Last or a new round: append
+        if offset < len(self._rounds) // 2:
+            return sum(self._rounds[i] for i in range(offset + 1)), target
+        return len(self.queue) - sum(self._rounds[i] for i in range(offset + 1, len(self._rounds))), target
+
+    def insert(self, song):
+        """Insert a song at its fair position. Returns the queue index it went to."""
+        index, target = self.position_for(song)
+        self._inserting = True
+        try:
+            self.queue.insert(index, song)
+        finally:
+            self._inserting = False
+
+        requester = self.key(song)
+        while len(self._rounds) <= target - self._base:
+            self._rounds.append(0)
+        self._rounds[target - self._base] += 1
+        self._last_round[requester] = target
+        self._counts[requester] = self._counts.get(requester, 0) + 1
+        return index
+
+    def interleave(self):
+        """Reorder the whole queue round-robin by requester, keeping each requester's own order - O(n)"""
+        by_requester = {}
+        for song in self.queue:
+            by_requester.setdefault(self.key(song), deque()).append(song)
+
+        # Rotate through the requesters, dropping each one when their sub-queue runs out
+        rotation = deque(by_requester.values())
+        ordered = []
+        while rotation:
+            songs = rotation.popleft()
+            ordered.append(songs.popleft())
+            if songs:
+                rotation.append(songs)
+
+        self.queue.clear()
+        self.queue.extend(ordered)
+        self.rebuild()
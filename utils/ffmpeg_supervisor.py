@@ -0,0 +1,317 @@
+"""
+FFmpeg Process Supervisor
+
+Every stream runs in its own FFmpeg child process. This module keeps a
+node-wide registry of those processes so they can be capped, measured and
+cleaned up:
+- a concurrency cap with FIFO queuing for new streams
+- per-process CPU and RSS sampling (read from /proc)
+- reaping of orphaned processes left behind by failed or replaced streams
+"""
+
+import os
+import asyncio
+import threading
+import time
+from collections import deque
+
+import discord
+
+# Maximum number of FFmpeg processes allowed to run at once on this node
+MAX_FFMPEG_PROCESSES = int(os.getenv('MAX_FFMPEG_PROCESSES', '64'))
+
+# Processes that are no longer the active stream of their guild are killed after this many seconds
+ORPHAN_GRACE_SECONDS = 5
+
+try:
+    _CLOCK_TICKS = os.sysconf('SC_CLK_TCK')
+    _PAGE_SIZE = os.sysconf('SC_PAGE_SIZE')
+except (AttributeError, ValueError, OSError):
+    _CLOCK_TICKS = 100
+    _PAGE_SIZE = 4096
+
+class FFmpegProcessInfo:
+    """Bookkeeping for a single supervised FFmpeg process"""
+
+    def __init__(self, process, guild_id, source=None):
+        self.process = process
+        self.pid = process.pid
+        self.guild_id = guild_id
+        self.source = source
+        self.started_at = time.monotonic()
+        self.cpu_percent = None
+        self.rss_bytes = None
+        self._last_cpu_ticks = None
+        self._last_sample_time = None
+
+    def sample(self):
+        """Update CPU and memory usage from /proc (no-op on platforms without it)"""
+        try:
+            with open(f'/proc/{self.pid}/stat', 'rb') as f:
+                # Fields after the command name, which is wrapped in parentheses
+                fields = f.read().rsplit(b')', 1)[1].split()
+            with open(f'/proc/{self.pid}/statm', 'rb') as f:
+                rss_pages = int(f.read().split()[1])
+        except (OSError, IndexError, ValueError):
+            return False
+
+        cpu_ticks = int(fields[11]) + int(fields[12])  # utime + stime
+        now = time.monotonic()
+
+        if self._last_cpu_ticks is not None and now > self._last_sample_time:
+            elapsed = now - self._last_sample_time
+            self.cpu_percent = ((cpu_ticks - self._last_cpu_ticks) / _CLOCK_TICKS) / elapsed * 100
+
+        self._last_cpu_ticks = cpu_ticks
+        self._last_sample_time = now
+        self.rss_bytes = rss_pages * _PAGE_SIZE
+        return True
+
+class FFmpegSupervisor:
+    """Node-wide registry, concurrency limiter and reaper for FFmpeg processes"""
+
+    def __init__(self, max_processes=MAX_FFMPEG_PROCESSES):
+        self.max_processes = max_processes
+        self._processes = {}  # pid -> FFmpegProcessInfo
+        self._active_sources = {}  # guild_id -> source currently playing in that guild
+        self._slots_in_use = 0
+        self._waiters = deque()  # Futures waiting for a free slot, in arrival order
+        self._lock = threading.Lock()
+
+    async def acquire_slot(self, timeout=None):
+        """Wait for a free process slot. Returns False if the timeout expired first."""
+        loop = asyncio.get_running_loop()
+
+        with self._lock:
+            if self._slots_in_use < self.max_processes and not self._waiters:
+                self._slots_in_use += 1
+                return True
+
+            waiter = loop.create_future()
+            self._waiters.append(waiter)
+            print(f"FFmpeg process cap reached ({self.max_processes}), {len(self._waiters)} stream(s) waiting")
+
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), timeout)
+            return True
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            with self._lock:
+                granted = waiter.done() and not waiter.cancelled()
+                if not granted:
+                    waiter.cancel()
+                    try:
+                        self._waiters.remove(waiter)
+                    except ValueError:
+                        pass
+            if granted:
+                # The slot was handed over just as we gave up, pass it on
+                self.release_slot()
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            return False
+
+    def try_acquire_slot(self):
+        """Take a free slot without waiting (thread-safe). Returns False if none is free."""
+        with self._lock:
+            if self._slots_in_use < self.max_processes and not self._waiters:
+                self._slots_in_use += 1
+                return True
+            return False
+
+    def release_slot(self):
+        """Give a slot back, handing it to the next waiter if there is one (thread-safe)"""
+        with self._lock:
+            while self._waiters:
+                waiter = self._waiters.popleft()
+                if waiter.done():
+                    continue
+                # The slot passes directly to the waiter, so the in-use count is unchanged
+                waiter.get_loop().call_soon_threadsafe(self._grant, waiter)
+                return
+            self._slots_in_use = max(0, self._slots_in_use - 1)
+
+    def _grant(self, waiter):
+        """Resolve a waiter on its own loop, returning the slot if it already gave up"""
+        if waiter.done():
+            self.release_slot()
+        else:
+            waiter.set_result(True)
+
+    def register(self, process, guild_id, source=None):
+        """Start tracking a newly spawned FFmpeg process"""
+        with self._lock:
+            self._processes[process.pid] = FFmpegProcessInfo(process, guild_id, source)
+
+    def unregister(self, process):
+        """Stop tracking a process (called once it has been cleaned up)"""
+        with self._lock:
+            self._processes.pop(getattr(process, 'pid', None), None)
+
+    def set_active_source(self, guild_id, source):
+        """Record which source is currently playing for a guild"""
+        with self._lock:
+            self._active_sources[guild_id] = source
+
+    def clear_active_source(self, guild_id):
+        """Forget the active source of a guild (e.g. after leaving voice)"""
+        with self._lock:
+            self._active_sources.pop(guild_id, None)
+
+    def _kill(self, info):
+        """Kill a process and wait for it so it does not linger as a zombie"""
+        try:
+            if info.process.poll() is None:
+                info.process.kill()
+                try:
+                    loop = asyncio.get_running_loop()
+                except RuntimeError:
+                    loop = None  # Called outside the event loop
+                if loop:
+                    # A stuck FFmpeg must not stall the event loop while it dies
+                    loop.run_in_executor(None, self._wait, info)
+                else:
+                    self._wait(info)
+        except Exception as e:
+            print(f"Failed to kill FFmpeg process {info.pid}: {e}")
+
+        # Free the slot now rather than waiting for the player thread to clean up
+        release_slot = getattr(info.source, 'release_slot', None)
+        if release_slot:
+            release_slot()
+
+    @staticmethod
+    def _wait(info):
+        try:
+            info.process.wait(timeout=5)
+        except Exception as e:
+            print(f"FFmpeg process {info.pid} did not exit after being killed: {e}")
+
+    def reap_guild(self, guild_id, keep=None):
+        """Kill every process of a guild except the one belonging to `keep`. Returns the count killed."""
+        if guild_id is None:
+            return 0
+
+        with self._lock:
+            victims = [
+                info for info in self._processes.values()
+                if info.guild_id == guild_id and (keep is None or info.source is not keep)
+            ]
+            for info in victims:
+                del self._processes[info.pid]
+
+        for info in victims:
+            self._kill(info)
+        if victims:
+            print(f"Reaped {len(victims)} orphaned FFmpeg process(es) for guild {guild_id}")
+        return len(victims)
+
+    def reap_orphans(self, grace=ORPHAN_GRACE_SECONDS):
+        """Drop exited processes and kill ones that outlived their stream. Returns the count killed."""
+        now = time.monotonic()
+        with self._lock:
+            dead = []
+            orphans = []
+            for info in self._processes.values():
+                if info.process.poll() is not None:
+                    dead.append(info)
+                elif (info.guild_id is not None
+                        and self._active_sources.get(info.guild_id) is not info.source
+                        and now - info.started_at > grace):
+                    orphans.append(info)
+            for info in dead + orphans:
+                del self._processes[info.pid]
+
+        for info in dead:
+            release_slot = getattr(info.source, 'release_slot', None)
+            if release_slot:
+                release_slot()
+        for info in orphans:
+            self._kill(info)
+        if orphans:
+            print(f"Reaped {len(orphans)} orphaned FFmpeg process(es)")
+        return len(orphans)
+
+    def sample(self):
+        """Sample CPU and RSS for every tracked process"""
+        with self._lock:
+            infos = list(self._processes.values())
+        for info in infos:
+            info.sample()
+        return infos
+
+    def get_stats(self):
+        """Get a summary of node-wide and per-guild FFmpeg resource usage"""
+        with self._lock:
+            infos = list(self._processes.values())
+            waiting = sum(1 for waiter in self._waiters if not waiter.done())
+            slots_in_use = self._slots_in_use
+
+        per_guild = {}
+        for info in infos:
+            guild = per_guild.setdefault(info.guild_id, {'processes': 0, 'cpu_percent': 0.0, 'rss_bytes': 0})
+            guild['processes'] += 1
+            guild['cpu_percent'] += info.cpu_percent or 0.0
+            guild['rss_bytes'] += info.rss_bytes or 0
+
+        return {
+            'processes': len(infos),
+            'slots_in_use': slots_in_use,
+            'max_processes': self.max_processes,
+            'waiting': waiting,
+            'cpu_percent': sum(g['cpu_percent'] for g in per_guild.values()),
+            'rss_bytes': sum(g['rss_bytes'] for g in per_guild.values()),
+            'guilds': per_guild
+        }
+
+    async def monitor_loop(self, interval=15):
+        """Background task: periodically sample usage and reap orphans"""
+        while True:
+            try:
+                await asyncio.sleep(interval)
+                self.reap_orphans()
+                self.sample()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Error in FFmpeg supervisor loop: {e}")
+
+class _SupervisedFFmpegMixin:
+    """Registers an FFmpegAudio's process with the supervisor and releases its slot on cleanup"""
+
+    def __init__(self, source, *, guild_id=None, supervisor=None, **kwargs):
+        self._supervisor = supervisor or ffmpeg_supervisor
+        self._guild_id = guild_id
+        self._slot_released = False
+        self._slot_lock = threading.Lock()
+        super().__init__(source, **kwargs)
+
+    def _spawn_process(self, args, **subprocess_kwargs):
+        process = super()._spawn_process(args, **subprocess_kwargs)
+        self._supervisor.register(process, self._guild_id, self)
+        return process
+
+    def cleanup(self):
+        process = getattr(self, '_process', None)
+        try:
+            super().cleanup()
+        finally:
+            if process:
+                self._supervisor.unregister(process)
+            self.release_slot()
+
+    def release_slot(self):
+        """Return this source's process slot to the supervisor (only once)"""
+        with self._slot_lock:
+            if self._slot_released:
+                return
+            self._slot_released = True
+        self._supervisor.release_slot()
+
+class SupervisedFFmpegPCMAudio(_SupervisedFFmpegMixin, discord.FFmpegPCMAudio):
+    """FFmpegPCMAudio whose process is registered with the supervisor and holds a slot"""
+
+class SupervisedFFmpegOpusAudio(_SupervisedFFmpegMixin, discord.FFmpegOpusAudio):
+    """FFmpegOpusAudio whose process is registered with the supervisor and holds a slot"""
+
+# Create global FFmpeg supervisor instance
+ffmpeg_supervisor = FFmpegSupervisor()
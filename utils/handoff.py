@@ -0,0 +1,127 @@
+"""
+Process Handoff
+
+Lets a newly started bot process take over playback from the running one
+during a rolling deploy instead of every guild going silent:
+1. the incoming process connects to the outgoing one over a local Unix socket
+   and asks for its state
+2. the outgoing process sends its playback state (channels, current song with
+   its resolved stream URL, position, queue, repeat mode)
+3. once the incoming process has loaded the queue it says it is ready; the
+   outgoing process stops, leaves voice and reports where it stopped
+4. the incoming process joins voice and resumes from that position, reusing
+   the stream URL so no extraction is needed, then the outgoing process exits
+
+Messages are length-prefixed JSON. The silence between the old process
+stopping and the new one starting is measured and logged per guild.
+"""
+
+import os
+import asyncio
+import json
+import struct
+
+HANDOFF_SOCKET = os.getenv('HANDOFF_SOCKET')  # e.g. data/handoff.sock; unset disables handoff
+HANDOFF_TIMEOUT = float(os.getenv('HANDOFF_TIMEOUT', '10'))
+
+_LENGTH = struct.Struct('>I')
+
+async def write_message(writer, message):
+    data = json.dumps(message).encode('utf-8')
+    writer.write(_LENGTH.pack(len(data)) + data)
+    await writer.drain()
+
+async def read_message(reader):
+    header = await reader.readexactly(_LENGTH.size)
+    (length,) = _LENGTH.unpack(header)
+    return json.loads(await reader.readexactly(length))
+
+class HandoffServer:
+    """Outgoing side: hands the player over to the first process that asks, then calls on_complete"""
+
+    def __init__(self, music_player, path=HANDOFF_SOCKET, on_complete=None, timeout=HANDOFF_TIMEOUT):
+        self.music_player = music_player
+        self.path = path
+        self.on_complete = on_complete
+        self.timeout = timeout
+        self.handed_off = False
+        self._server = None
+
+    async def start(self):
+        """Listen on the socket (replacing a stale socket file left by an earlier process)"""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self._server = await asyncio.start_unix_server(self._handle, path=self.path)
+        print(f"Handoff socket listening on {self.path}")
+        return self
+
+    async def close(self):
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _handle(self, reader, writer):
+        try:
+            request = await asyncio.wait_for(read_message(reader), self.timeout)
+            if request.get('type') != 'request' or self.handed_off:
+                await write_message(writer, {'type': 'refused'})
+                return
+
+            state = self.music_player.export_state()
+            await write_message(writer, {'type': 'state', 'guilds': [state] if state else []})
+
+            ready = await asyncio.wait_for(read_message(reader), self.timeout)
+            if ready.get('type') != 'ready':
+                return  # Incoming process gave up, keep playing
+
+            self.handed_off = True
+            released = await self.music_player.release_for_handoff()
+            await write_message(writer, {'type': 'released', 'guilds': [released] if state else []})
+            print("Handed playback over to the new process")
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError, ValueError) as e:
+            print(f"Handoff aborted: {e}")
+        finally:
+            writer.close()
+
+        if self.handed_off and self.on_complete:
+            await self.on_complete()
+
+async def request_handoff(music_player, bot, path=HANDOFF_SOCKET, timeout=HANDOFF_TIMEOUT):
+    """Incoming side: take over from a running process if there is one.
+    Returns {guild_id: seconds of silence} for the guilds taken over, or None when nothing was handed over."""
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        reader, writer = await asyncio.open_unix_connection(path)
+    except (ConnectionRefusedError, FileNotFoundError):
+        return None  # Stale socket, no process to take over from
+
+    try:
+        await write_message(writer, {'type': 'request'})
+        state = await asyncio.wait_for(read_message(reader), timeout)
+        if state.get('type') != 'state':
+            return None
+
+        await write_message(writer, {'type': 'ready'})
+        released = await asyncio.wait_for(read_message(reader), timeout)
+        if released.get('type') != 'released':
+            return None
+    except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError, ValueError) as e:
+        print(f"Handoff failed: {e}")
+        return None
+    finally:
+        writer.close()
+
+    silences = {}
+    for guild_state, guild_released in zip(state['guilds'], released['guilds']):
+        silence = await music_player.resume_from_handoff(bot, guild_state, guild_released)
+        silences[guild_state['guild_id']] = silence
+        if silence is None:
+            print(f"Took over guild {guild_state['guild_id']} (nothing was playing)")
+        else:
+            print(f"Took over guild {guild_state['guild_id']} with {silence * 1000:.0f} ms of silence")
+    return silences
@@ -0,0 +1,75 @@
+"""
+Shared HTTP Client
+
+Metadata lookups (Spotify API, oEmbed, ...) are many small requests to a few
+hosts. Opening a session per call pays DNS, TCP and TLS setup every time, so
+every outbound metadata call goes through one process-wide aiohttp session:
+- keep-alive connection pooling with total and per-host limits
+- DNS results cached for HTTP_DNS_CACHE_TTL seconds
+- connect and total timeouts, so a hung host can't stall a command forever
+The session is created lazily on first use, inside the running event loop.
+"""
+
+import os
+
+import aiohttp
+
+HTTP_POOL_LIMIT = int(os.getenv('HTTP_POOL_LIMIT', '100'))  # Open connections in total
+HTTP_POOL_PER_HOST = int(os.getenv('HTTP_POOL_PER_HOST', '20'))  # Open connections per host
+HTTP_KEEPALIVE = float(os.getenv('HTTP_KEEPALIVE', '60'))  # Seconds an idle connection is kept
+HTTP_DNS_CACHE_TTL = int(os.getenv('HTTP_DNS_CACHE_TTL', '300'))
+HTTP_CONNECT_TIMEOUT = float(os.getenv('HTTP_CONNECT_TIMEOUT', '5'))
+HTTP_TIMEOUT = float(os.getenv('HTTP_TIMEOUT', '15'))  # Whole request, including reading the body
+
+class HttpClient:
+    """Lazily created, pooled aiohttp session shared by the whole process"""
+
+    def __init__(self, limit=HTTP_POOL_LIMIT, limit_per_host=HTTP_POOL_PER_HOST, keepalive=HTTP_KEEPALIVE,
+                 dns_cache_ttl=HTTP_DNS_CACHE_TTL, connect_timeout=HTTP_CONNECT_TIMEOUT, timeout=HTTP_TIMEOUT):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive = keepalive
+        self.dns_cache_ttl = dns_cache_ttl
+        self.timeout = aiohttp.ClientTimeout(total=timeout, connect=connect_timeout)
+        self._session = None
+        self.sessions_created = 0
+
+    def session(self):
+        """Get the shared session, creating it if needed"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                keepalive_timeout=self.keepalive,
+                ttl_dns_cache=self.dns_cache_ttl
+            )
+            self._session = aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+            self.sessions_created += 1
+        return self._session
+
+    def get(self, url, **kwargs):
+        """Shortcut for session().get, used as `async with http_client.get(url) as response`"""
+        return self.session().get(url, **kwargs)
+
+    def post(self, url, **kwargs):
+        """Shortcut for session().post"""
+        return self.session().post(url, **kwargs)
+
+    async def close(self):
+        """Close the shared session and its pooled connections"""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def get_stats(self):
+        """Get connection pool numbers"""
+        connector = self._session.connector if self._session is not None and not self._session.closed else None
+        return {
+            'sessions_created': self.sessions_created,
+            'limit': self.limit,
+            'limit_per_host': self.limit_per_host,
+            'acquired': len(connector._acquired) if connector is not None else 0
+        }
+
+# Create global HTTP client instance
+http_client = HttpClient()
@@ -0,0 +1,480 @@
+"""
+Indexed Queue
+
+Song queue for very large queues (imported playlists can reach 10,000+
+entries). Items are stored in a list of chunks with a Fenwick tree over the
+chunk lengths, which gives:
+- O(log n) lookup, insert, remove and move by position
+- jump in O(log n + k / CHUNK_SIZE) for k dropped items: whole chunks
+  dropped from the front stay in the positional index behind an offset
+  until a later compaction, and are handed back as a queue of their own
+  without copying items
+- O(1) amortized append/popleft, though at 2-5 µs still far slower than
+  deque's C implementation
+- remove(item) and index(item) scan from the front, so they cost
+  O(position of the item) - the bot removes songs at or near the front
+- O(n) in-place shuffle
+- slice views that read the queue without copying it
+- optional running totals of a per-item weight (song durations), so the
+  total and the sum before any position are O(log n)
+- mutation listeners, so the queue can be journaled or indexed elsewhere
+
+The interface is a superset of the parts of collections.deque the bot used.
+"""
+
+import random
+from itertools import islice
+
+class QueueView:
+    """Read-only live view of a range of an IndexedQueue (nothing is copied)"""
+
+    def __init__(self, queue, start, stop):
+        self._queue = queue
+        self._start = start
+        self._stop = stop
+
+    def _range(self):
+        length = len(self._queue)
+        return min(self._start, length), min(self._stop, length)
+
+    def __len__(self):
+        start, stop = self._range()
+        return max(0, stop - start)
+
+    def __bool__(self):
+        return len(self) > 0
+
+    def __iter__(self):
+        start, stop = self._range()
+        return self._queue._iter_range(start, stop)
+
+    def __getitem__(self, index):
+        start, stop = self._range()
+        if isinstance(index, slice):
+            sub_start, sub_stop, step = index.indices(stop - start)
+            if step != 1:
+                return list(self)[index]
+            return QueueView(self._queue, start + sub_start, start + max(sub_start, sub_stop))
+        if index < 0:
+            index += stop - start
+        if not 0 <= index < stop - start:
+            raise IndexError('queue view index out of range')
+        return self._queue[start + index]
+
+    def __repr__(self):
+        return f"QueueView({list(self)!r})"
+
+class IndexedQueue:
+    """Chunked list with a positional index, used as MusicPlayer.queue"""
+
+    CHUNK_SIZE = 256  # Chunks are split above twice this size
+
+    def __init__(self, iterable=(), weight=None):
+        self._weight = weight  # Optional item -> number, e.g. song duration
+        self._reset()
+        self.version = 0  # Bumped on every mutation, so renderers can cache by version
+        self._listeners = []
+        self.extend(iterable)
+
+    # Positional index
+
+    @staticmethod
+    def _build_tree(values):
+        tree = [0] * (len(values) + 1)
+        for i, value in enumerate(values, 1):
+            tree[i] += value
+            parent = i + (i & -i)
+            if parent < len(tree):
+                tree[parent] += tree[i]
+        return tree
+
+    def _reset(self):
+        self._chunks = []
+        self._tree = [0]  # 1-based Fenwick tree over chunk lengths
+        self._len = 0
+        self._chunk_weights = []  # Weight sum per chunk, parallel to _chunks
+        self._weight_tree = [0]  # Fenwick tree over _chunk_weights
+        self._total_weight = 0
+        # Chunks before _head were dropped from the front; the trees still count
+        # _offset items and _weight_offset weight for them until the next rebuild
+        self._head = 0
+        self._offset = 0
+        self._weight_offset = 0
+
+    def _rebuild_index(self):
+        """Rebuild the Fenwick trees after chunks were added, removed or reshaped - O(number of chunks)"""
+        if self._head:
+            del self._chunks[:self._head]
+            del self._chunk_weights[:self._head]
+            self._head = 0
+        self._offset = self._weight_offset = 0
+        self._tree = self._build_tree([len(chunk) for chunk in self._chunks])
+        if self._weight:
+            self._weight_tree = self._build_tree(self._chunk_weights)
+            self._total_weight = sum(self._chunk_weights)
+
+    def _index_add(self, chunk_index, delta, weight_delta=0):
+        i = chunk_index + 1
+        tree = self._tree
+        while i < len(tree):
+            tree[i] += delta
+            if weight_delta:
+                self._weight_tree[i] += weight_delta
+            i += i & -i
+        if weight_delta:
+            self._chunk_weights[chunk_index] += weight_delta
+            self._total_weight += weight_delta
+
+    def _item_weight(self, item):
+        return self._weight(item) if self._weight else 0
+
+    def _chunk_weight(self, chunk):
+        return sum(self._weight(item) for item in chunk) if self._weight else 0
+
+    def _compact_if_needed(self):
+        """Drop the dead chunks at the front once they make up half the chunk list - amortized O(1)"""
+        if self._head > 8 and 2 * self._head > len(self._chunks):
+            self._rebuild_index()
+
+    def _locate(self, index):
+        """Map a queue position to (chunk index, offset in chunk) - O(log n)"""
+        index += self._offset
+        tree = self._tree
+        position = 0
+        step = 1 << (len(tree).bit_length() - 1)
+        while step:
+            following = position + step
+            if following < len(tree) and tree[following] <= index:
+                position = following
+                index -= tree[following]
+            step >>= 1
+        return position, index
+
+    def _normalize(self, index, allow_end=False):
+        if index < 0:
+            index += self._len
+        upper = self._len if allow_end else self._len - 1
+        if not 0 <= index <= upper:
+            raise IndexError('queue index out of range')
+        return index
+
+    def _changed(self, op, *args):
+        """Bump the version and tell listeners what changed: ('insert', index, item), ('pop', index, item),
+        ('extend', items), ('jump', index, dropped), ('shuffle',) or ('clear',)"""
+        self.version += 1
+        for listener in self._listeners:
+            try:
+                listener(op, *args)
+            except Exception as e:
+                print(f"Queue listener failed on {op}: {e}")
+
+    def subscribe(self, listener):
+        """Call listener(op, *args) after every mutation"""
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    # Reading
+
+    def __len__(self):
+        return self._len
+
+    def __bool__(self):
+        return self._len > 0
+
+    def _live_chunks(self):
+        return islice(self._chunks, self._head, None)
+
+    def __iter__(self):
+        for chunk in self._live_chunks():
+            yield from chunk
+
+    def _iter_range(self, start, stop):
+        if start >= stop:
+            return
+        chunk_index, offset = self._locate(start)
+        remaining = stop - start
+        while remaining > 0 and chunk_index < len(self._chunks):
+            chunk = self._chunks[chunk_index]
+            part = chunk[offset:offset + remaining]
+            yield from part
+            remaining -= len(part)
+            chunk_index += 1
+            offset = 0
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self._len)
+            if step != 1:
+                return list(self)[index]
+            return QueueView(self, start, max(start, stop))
+        chunk_index, offset = self._locate(self._normalize(index))
+        return self._chunks[chunk_index][offset]
+
+    def __contains__(self, item):
+        return any(item in chunk for chunk in self._live_chunks())
+
+    def __repr__(self):
+        return f"IndexedQueue({list(self)!r})"
+
+    def total_weight(self):
+        """Sum of all item weights - O(1)"""
+        return self._total_weight
+
+    def weight_before(self, index):
+        """Sum of the weights of the items before position `index` - O(log n) plus a scan of one chunk"""
+        index = self._normalize(index, allow_end=True)
+        if index == self._len:
+            return self._total_weight
+        chunk_index, offset = self._locate(index)
+        total = -self._weight_offset
+        i = chunk_index
+        while i > 0:
+            total += self._weight_tree[i]
+            i -= i & -i
+        return total + sum(self._item_weight(item) for item in self._chunks[chunk_index][:offset])
+
+    def view(self, start=0, stop=None):
+        """Get a live view of a range of the queue without copying it"""
+        return QueueView(self, start, self._len if stop is None else stop)
+
+    def index(self, item):
+        """Position of the first occurrence of item - O(position)"""
+        position = 0
+        for chunk in self._live_chunks():
+            for offset, value in enumerate(chunk):
+                if value is item or value == item:
+                    return position + offset
+            position += len(chunk)
+        raise ValueError('item not in queue')
+
+    # Mutation
+
+    def insert(self, index, item):
+        """Insert before position `index` - O(log n)"""
+        if index < 0:
+            index = max(0, index + self._len)
+        index = min(index, self._len)
+
+        weight = self._item_weight(item)
+        if not self._len:
+            self._chunks.append([item])
+            self._chunk_weights.append(weight)
+            self._rebuild_index()
+        elif index == 0:
+            self._chunks[self._head].insert(0, item)
+            self._index_add(self._head, 1, weight)
+            self._split_if_needed(self._head)
+        elif index == self._len:
+            self._chunks[-1].append(item)
+            self._index_add(len(self._chunks) - 1, 1, weight)
+            self._split_if_needed(len(self._chunks) - 1)
+        else:
+            chunk_index, offset = self._locate(index)
+            self._chunks[chunk_index].insert(offset, item)
+            self._index_add(chunk_index, 1, weight)
+            self._split_if_needed(chunk_index)
+
+        self._len += 1
+        self._changed('insert', index, item)
+
+    def _split_if_needed(self, chunk_index):
+        chunk = self._chunks[chunk_index]
+        if len(chunk) > 2 * self.CHUNK_SIZE:
+            first, second = chunk[:self.CHUNK_SIZE], chunk[self.CHUNK_SIZE:]
+            first_weight = self._chunk_weight(first)
+            self._chunks[chunk_index:chunk_index + 1] = [first, second]
+            self._chunk_weights[chunk_index:chunk_index + 1] = [first_weight, self._chunk_weights[chunk_index] - first_weight]
+            self._rebuild_index()
+
+    def append(self, item):
+        if not self._len:
+            self.insert(0, item)
+            return
+        # Fast path for the most common mutation
+        chunk_index = len(self._chunks) - 1
+        self._chunks[chunk_index].append(item)
+        self._index_add(chunk_index, 1, self._item_weight(item))
+        self._len += 1
+        self._split_if_needed(chunk_index)
+        self._changed('insert', self._len - 1, item)
+
+    def appendleft(self, item):
+        self.insert(0, item)
+
+    def extend(self, items):
+        """Append many items, filling chunks directly - O(k)"""
+        items = added = list(items)
+        if not items:
+            return
+        if self._len:
+            room = max(0, 2 * self.CHUNK_SIZE - len(self._chunks[-1]))
+            self._chunks[-1].extend(items[:room])
+            self._chunk_weights[-1] += self._chunk_weight(items[:room])
+            items = items[room:]
+        self._len += len(added)
+        for start in range(0, len(items), self.CHUNK_SIZE):
+            chunk = items[start:start + self.CHUNK_SIZE]
+            self._chunks.append(chunk)
+            self._chunk_weights.append(self._chunk_weight(chunk))
+        self._rebuild_index()
+        self._changed('extend', added)
+
+    def pop(self, index=-1):
+        """Remove and return the item at `index` - O(log n)"""
+        if not self._len:
+            raise IndexError('pop from an empty queue')
+        index = self._normalize(index)
+        # Both ends skip the index lookup
+        if index == 0:
+            chunk_index, offset = self._head, 0
+        elif index == self._len - 1:
+            chunk_index, offset = len(self._chunks) - 1, len(self._chunks[-1]) - 1
+        else:
+            chunk_index, offset = self._locate(index)
+        item = self._remove_at(chunk_index, offset)
+        self._changed('pop', index, item)
+        return item
+
+    def _remove_at(self, chunk_index, offset):
+        chunk = self._chunks[chunk_index]
+        item = chunk.pop(offset)
+        self._len -= 1
+        self._index_add(chunk_index, -1, -self._item_weight(item))
+        if not chunk:
+            if not self._len:
+                self._reset()
+            elif chunk_index == self._head:
+                # Emptied from the front: its length in the trees is 0 already
+                self._head += 1
+                self._compact_if_needed()
+            else:
+                del self._chunks[chunk_index]
+                del self._chunk_weights[chunk_index]
+                self._rebuild_index()
+        return item
+
+    def popleft(self):
+        if not self._len:
+            raise IndexError('pop from an empty queue')
+        # Fast path for the most common mutation
+        item = self._remove_at(self._head, 0)
+        self._changed('pop', 0, item)
+        return item
+
+    def __delitem__(self, index):
+        self.pop(index)
+
+    def remove(self, item):
+        """Remove the first occurrence of item - O(position + log n)"""
+        self.pop(self.index(item))
+
+    def move(self, source, destination):
+        """Move the item at `source` so it ends up at position `destination` - O(log n)"""
+        source = self._normalize(source)
+        destination = self._normalize(destination)
+        if source == destination:
+            return self[source]
+        item = self.pop(source)
+        self.insert(destination, item)
+        return item
+
+    def jump(self, index):
+        """Drop everything before `index` so it becomes the front of the queue - O(log n + index / CHUNK_SIZE).
+        Returns the dropped items as an IndexedQueue of their own."""
+        index = self._normalize(index, allow_end=True)
+        dropped = type(self)(weight=self._weight)
+        if index == 0:
+            return dropped
+
+        if index == self._len:
+            chunks, weights = list(self._live_chunks()), self._chunk_weights[self._head:]
+            self._reset()
+        else:
+            chunk_index, offset = self._locate(index)
+            chunks, weights = self._chunks[self._head:chunk_index], self._chunk_weights[self._head:chunk_index]
+            # Whole chunks stay in the trees, skipped over by the offsets, until the next rebuild
+            whole_weight = sum(weights)
+            self._offset += index - offset
+            self._weight_offset += whole_weight
+            self._total_weight -= whole_weight
+            self._chunks[self._head:chunk_index] = [None] * (chunk_index - self._head)
+            self._head = chunk_index
+            if offset:
+                chunk = self._chunks[chunk_index]
+                partial = chunk[:offset]
+                del chunk[:offset]
+                partial_weight = self._chunk_weight(partial)
+                self._index_add(chunk_index, -offset, -partial_weight)
+                chunks.append(partial)
+                weights.append(partial_weight)
+            self._len -= index
+            self._compact_if_needed()
+
+        dropped._chunks, dropped._chunk_weights, dropped._len = chunks, weights, index
+        dropped._rebuild_index()
+        self._changed('jump', index, dropped)
+        return dropped
+
+    def shuffle(self, rng=random):
+        """Shuffle in place - O(n)"""
+        items = list(self)
+        rng.shuffle(items)
+        self._head = 0
+        self._chunks = [items[start:start + self.CHUNK_SIZE] for start in range(0, len(items), self.CHUNK_SIZE)]
+        self._chunk_weights = [self._chunk_weight(chunk) for chunk in self._chunks]
+        self._rebuild_index()
+        self._changed('shuffle')
+
+    def clear(self):
+        self._reset()
+        self._changed('clear')
+
+class QueueKeyIndex:
+    """Counts the items of an IndexedQueue by key (e.g. video id) for O(1) membership checks,
+    kept in sync through the queue's mutation listener"""
+
+    def __init__(self, queue, key):
+        self.queue = queue
+        self.key = key
+        self.counts = {}
+        for item in queue:
+            self._add(item)
+        queue.subscribe(self._on_change)
+
+    def close(self):
+        self.queue.unsubscribe(self._on_change)
+
+    def _add(self, item):
+        key = self.key(item)
+        self.counts[key] = self.counts.get(key, 0) + 1
+
+    def _remove(self, item):
+        key = self.key(item)
+        count = self.counts.get(key, 0) - 1
+        if count > 0:
+            self.counts[key] = count
+        else:
+            self.counts.pop(key, None)
+
+    def _on_change(self, op, *args):
+        if op == 'insert':
+            self._add(args[1])
+        elif op == 'pop':
+            self._remove(args[1])
+        elif op == 'extend':
+            for item in args[0]:
+                self._add(item)
+        elif op == 'jump':
+            for item in args[1]:
+                self._remove(item)
+        elif op == 'clear':
+            self.counts.clear()
+
+    def __contains__(self, key):
+        return key in self.counts
+
+    def __len__(self):
+        return len(self.counts)
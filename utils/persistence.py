@@ -0,0 +1,213 @@
+"""
+Persisted Player State
+
+Keeps each guild's queue, current song and playback position in SQLite so a
+restart or crash does not lose them:
+- queue mutations are appended to a journal, which is compacted into a
+  snapshot of the whole queue every PERSISTENCE_SNAPSHOT_EVERY entries
+- the current song, position and channels are one small row per guild
+- every write goes through a background thread and is committed in batches,
+  so recording a change only costs the caller a queue.put
+- the database runs in WAL mode, so loading never blocks the writer
+"""
+
+import os
+import json
+import queue
+import sqlite3
+import threading
+import time
+
+PERSISTENCE_ENABLED = os.getenv('PERSISTENCE_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+PERSISTENCE_DB = os.getenv(  # Relative to the repository root, not the working directory
+    'PERSISTENCE_DB',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'player_state.db')
+)
+PERSISTENCE_FLUSH_INTERVAL = float(os.getenv('PERSISTENCE_FLUSH_INTERVAL', '0.25'))  # Seconds a batch may wait
+PERSISTENCE_SNAPSHOT_EVERY = int(os.getenv('PERSISTENCE_SNAPSHOT_EVERY', '1000'))  # Journal entries per compaction
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS player_state (
+    guild_id INTEGER PRIMARY KEY,
+    state TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS queue_snapshots (
+    guild_id INTEGER PRIMARY KEY,
+    songs TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS queue_journal (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    guild_id INTEGER NOT NULL,
+    op TEXT NOT NULL,
+    args TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS queue_journal_guild ON queue_journal (guild_id, seq);
+"""
+
+def apply_queue_op(songs, op, args):
+    """Replay one journaled queue operation on a list of song dicts"""
+    if op == 'insert':
+        index, song = args
+        songs.insert(index, song)
+    elif op == 'pop':
+        songs.pop(args[0])
+    elif op == 'extend':
+        songs.extend(args[0])
+    elif op == 'jump':
+        del songs[:args[0]]
+    elif op == 'clear':
+        songs.clear()
+
+class StateStore:
+    """SQLite-backed store for player state with a batching writer thread"""
+
+    def __init__(self, path=PERSISTENCE_DB, flush_interval=PERSISTENCE_FLUSH_INTERVAL,
+                 snapshot_every=PERSISTENCE_SNAPSHOT_EVERY):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.snapshot_every = snapshot_every
+        self.writes = 0
+        self.batches = 0
+        self._pending = queue.Queue()
+        self._journal_sizes = {}  # guild_id -> journal entries since the last snapshot
+        self._thread = None
+
+    def _connect(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        connection = sqlite3.connect(self.path)
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute('PRAGMA synchronous=NORMAL')  # Durable across crashes of the bot, WAL keeps it consistent
+        connection.executescript(_SCHEMA)
+        return connection
+
+    def start(self):
+        """Start the writer thread"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='state-store-writer', daemon=True)
+            self._thread.start()
+        return self
+
+    # Recording (any thread, never blocks on I/O)
+
+    def record_queue_op(self, guild_id, op, args):
+        """Journal a queue mutation. Returns True when the journal is due for a snapshot."""
+        self._pending.put(('op', guild_id, op, args))
+        size = self._journal_sizes.get(guild_id, 0) + 1
+        self._journal_sizes[guild_id] = size
+        return size >= self.snapshot_every
+
+    def snapshot_queue(self, guild_id, songs):
+        """Replace a guild's journal with a snapshot of its whole queue"""
+        self._journal_sizes[guild_id] = 0
+        self._pending.put(('snapshot', guild_id, songs))
+
+    def save_player(self, guild_id, state):
+        """Store a guild's current song, position and channels"""
+        self._pending.put(('player', guild_id, state))
+
+    def flush(self, timeout=5):
+        """Wait until everything recorded so far is committed"""
+        if self._thread is None:
+            return False
+        done = threading.Event()
+        self._pending.put(('flush', done))
+        return done.wait(timeout)
+
+    def close(self, timeout=5):
+        """Commit what is pending and stop the writer thread"""
+        if self._thread is not None:
+            self._pending.put(None)
+            self._thread.join(timeout)
+            self._thread = None
+
+    # Writer thread
+
+    def _run(self):
+        connection = self._connect()
+        try:
+            while True:
+                batch = [self._pending.get()]
+                # Collect everything that arrives within the flush interval into one transaction
+                deadline = time.monotonic() + self.flush_interval
+                while batch[-1] is not None and batch[-1][0] != 'flush':
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(self._pending.get(timeout=remaining))
+                    except queue.Empty:
+                        break
+
+                writes = [item for item in batch if item is not None and item[0] != 'flush']
+                if writes:
+                    try:
+                        with connection:
+                            for item in writes:
+                                self._write(connection, item)
+                        self.writes += len(writes)
+                        self.batches += 1
+                    except sqlite3.Error as e:
+                        print(f"Failed to persist player state: {e}")
+
+                for item in batch:
+                    if item is not None and item[0] == 'flush':
+                        item[1].set()
+                if batch[-1] is None:
+                    return
+        finally:
+            connection.close()
+
+    def _write(self, connection, item):
+        kind, guild_id = item[0], item[1]
+        if kind == 'op':
+            connection.execute(
+                'INSERT INTO queue_journal (guild_id, op, args) VALUES (?, ?, ?)',
+                (guild_id, item[2], json.dumps(item[3]))
+            )
+        elif kind == 'snapshot':
+            connection.execute(
+                'INSERT OR REPLACE INTO queue_snapshots (guild_id, songs, updated_at) VALUES (?, ?, ?)',
+                (guild_id, json.dumps(item[2]), time.time())
+            )
+            # Everything journaled before the snapshot is already part of it
+            connection.execute('DELETE FROM queue_journal WHERE guild_id = ?', (guild_id,))
+        elif kind == 'player':
+            connection.execute(
+                'INSERT OR REPLACE INTO player_state (guild_id, state, updated_at) VALUES (?, ?, ?)',
+                (guild_id, json.dumps(item[2]), time.time())
+            )
+
+    # Loading
+
+    def load(self):
+        """Rebuild every guild's saved state: {guild_id: {'player': dict or None, 'queue': [song dicts], 'updated_at'}}"""
+        connection = self._connect()
+        try:
+            guilds = {}
+            for guild_id, state, updated_at in connection.execute('SELECT guild_id, state, updated_at FROM player_state'):
+                guilds[guild_id] = {'player': json.loads(state), 'queue': [], 'updated_at': updated_at}
+            for guild_id, songs, updated_at in connection.execute('SELECT guild_id, songs, updated_at FROM queue_snapshots'):
+                entry = guilds.setdefault(guild_id, {'player': None, 'queue': [], 'updated_at': updated_at})
+                entry['queue'] = json.loads(songs)
+            for guild_id, op, args in connection.execute('SELECT guild_id, op, args FROM queue_journal ORDER BY seq'):
+                entry = guilds.setdefault(guild_id, {'player': None, 'queue': [], 'updated_at': 0})
+                try:
+                    apply_queue_op(entry['queue'], op, json.loads(args))
+                except (IndexError, ValueError) as e:
+                    print(f"Skipping unreadable queue journal entry for guild {guild_id}: {e}")
+            return guilds
+        finally:
+            connection.close()
+
+    def get_stats(self):
+        """Get writer throughput numbers"""
+        return {
+            'pending': self._pending.qsize(),
+            'writes': self.writes,
+            'batches': self.batches,
+            'writes_per_batch': self.writes / self.batches if self.batches else 0.0
+        }
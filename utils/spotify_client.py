@@ -0,0 +1,184 @@
+"""
+Async Spotify Web API Client
+
+spotipy is synchronous, so calling it from a command stalls the event loop
+(voice included, for every guild) for a whole HTTPS round trip. This client
+runs on aiohttp instead:
+- requests go through the shared pooled session in http_client
+- client-credentials tokens are fetched once and refreshed shortly before
+  they expire; concurrent callers wait on a lock instead of each refreshing
+- 429 responses are retried after the Retry-After delay Spotify asks for,
+  401 responses after refreshing the token once
+"""
+
+import os
+import re
+import asyncio
+import base64
+import time
+
+from .http_client import http_client
+
+SPOTIFY_API_BASE = "https://api.spotify.com/v1"
+SPOTIFY_TOKEN_URL = "https://accounts.spotify.com/api/token"
+SPOTIFY_MAX_RETRIES = int(os.getenv('SPOTIFY_MAX_RETRIES', '3'))
+SPOTIFY_MAX_RETRY_AFTER = float(os.getenv('SPOTIFY_MAX_RETRY_AFTER', '30'))  # Longer waits fail instead
+
+# Refresh tokens this many seconds before Spotify says they expire
+TOKEN_REFRESH_MARGIN = 60
+
+# open.spotify.com links (optionally with an /intl-xx/ prefix) and spotify: URIs
+_SPOTIFY_LINK = re.compile(r'spotify\.com/(?:intl-[a-z-]+/)?(track|album|playlist)/([a-zA-Z0-9]+)')
+_SPOTIFY_URI = re.compile(r'^spotify:(track|album|playlist):([a-zA-Z0-9]+)$')
+
+# Page sizes the API allows for each collection
+_PAGE_LIMITS = {'playlist': 100, 'album': 50}
+
+def parse_spotify_url(url):
+    """Get (kind, id) from a Spotify link or URI, kind being 'track', 'album' or 'playlist'; None if it is neither"""
+    match = _SPOTIFY_URI.match(url.strip()) or _SPOTIFY_LINK.search(url)
+    return (match.group(1), match.group(2)) if match else None
+
+def is_spotify_url(query):
+    return parse_spotify_url(query) is not None
+
+def track_info(track):
+    """Title, artists, duration, YouTube search query and ids for a Spotify track object"""
+    artists = [artist['name'] for artist in track.get('artists') or []]
+    return {
+        'title': track['name'],
+        'artist': ', '.join(artists),
+        'artists': artists,
+        'query': f"{track['name']} {artists[0]}" if artists else track['name'],
+        'duration': track['duration_ms'] / 1000 if track.get('duration_ms') else None,
+        'spotify_id': track.get('id'),
+        'isrc': (track.get('external_ids') or {}).get('isrc')
+    }
+
+def _retry_after(headers):
+    """Seconds to wait from a Retry-After header (Spotify sends whole seconds)"""
+    try:
+        return max(0.0, float(headers.get('Retry-After', '1')))
+    except ValueError:
+        return 1.0
+
+class SpotifyError(Exception):
+    """A Spotify API request failed"""
+
+    def __init__(self, status, message):
+        super().__init__(f"Spotify API error {status}: {message}")
+        self.status = status
+
+class SpotifyClient:
+    """Minimal asyncio-native Spotify Web API client (static token or client credentials)"""
+
+    def __init__(self, access_token=None, client_id=None, client_secret=None,
+                 max_retries=SPOTIFY_MAX_RETRIES, max_retry_after=SPOTIFY_MAX_RETRY_AFTER,
+                 api_base=SPOTIFY_API_BASE, token_url=SPOTIFY_TOKEN_URL, client=None):
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.max_retries = max_retries
+        self.max_retry_after = max_retry_after
+        self.api_base = api_base
+        self.token_url = token_url
+        self._token = access_token
+        self._token_expires = None if access_token else 0  # None: static token that can't be refreshed
+        self._token_lock = asyncio.Lock()
+        self.http = client or http_client
+        self.requests = 0
+        self.rate_limited = 0
+        self.token_refreshes = 0
+
+    # Token handling
+
+    def _token_valid(self):
+        return self._token and (self._token_expires is None or self._token_expires - time.time() > TOKEN_REFRESH_MARGIN)
+
+    async def _get_token(self, force_refresh=False):
+        """Get a valid access token, refreshing it at most once across concurrent callers"""
+        stale_token = self._token
+        if self._token_valid() and not force_refresh:
+            return self._token
+
+        async with self._token_lock:
+            # Someone else refreshed while we waited for the lock
+            if self._token_valid() and not (force_refresh and self._token == stale_token):
+                return self._token
+            if not (self.client_id and self.client_secret):
+                raise SpotifyError(401, "access token expired and no client credentials to refresh it")
+            await self._refresh_token()
+            return self._token
+
+    async def _refresh_token(self):
+        credentials = base64.b64encode(f"{self.client_id}:{self.client_secret}".encode()).decode()
+        async with self.http.post(
+            self.token_url,
+            data={'grant_type': 'client_credentials'},
+            headers={'Authorization': f'Basic {credentials}'}
+        ) as response:
+            if response.status != 200:
+                raise SpotifyError(response.status, "token request failed")
+            data = await response.json()
+        self._token = data['access_token']
+        self._token_expires = time.time() + data.get('expires_in', 3600)
+        self.token_refreshes += 1
+
+    # Requests
+
+    async def get(self, path, params=None):
+        """GET an API path (e.g. '/tracks/{id}'), retrying rate-limited and unauthorized responses"""
+        refreshed = False
+        for attempt in range(self.max_retries + 1):
+            token = await self._get_token()
+            self.requests += 1
+            async with self.http.get(
+                f"{self.api_base}{path}",
+                params=params,
+                headers={'Authorization': f'Bearer {token}'}
+            ) as response:
+                if response.status == 200:
+                    return await response.json()
+                status = response.status
+                retry_after = _retry_after(response.headers)
+                body = await response.text()
+
+            # Wait outside the response so the pooled connection is released meanwhile
+            if status == 429 and attempt < self.max_retries:
+                self.rate_limited += 1
+                if retry_after > self.max_retry_after:
+                    raise SpotifyError(429, f"rate limited for {retry_after:.0f}s")
+                await asyncio.sleep(retry_after)
+            elif status == 401 and not refreshed and self.client_id and self.client_secret:
+                refreshed = True
+                await self._get_token(force_refresh=True)
+            else:
+                raise SpotifyError(status, body)
+
+        raise SpotifyError(429, "out of retries")
+
+    async def track(self, track_id):
+        """Get a track object"""
+        return await self.get(f"/tracks/{track_id}")
+
+    async def collection_tracks(self, kind, collection_id):
+        """Yield every track of a playlist or album, fetching one page at a time as they are consumed"""
+        limit = _PAGE_LIMITS[kind]
+        offset = 0
+        while True:
+            page = await self.get(f"/{kind}s/{collection_id}/tracks", params={'limit': limit, 'offset': offset})
+            for item in page.get('items') or []:
+                # Playlist items wrap the track; skip removed tracks, local files and podcast episodes
+                track = item.get('track') if kind == 'playlist' else item
+                if track and track.get('type', 'track') == 'track' and not track.get('is_local'):
+                    yield track
+            offset += limit
+            if not page.get('next') or offset >= page.get('total', 0):
+                return
+
+    def get_stats(self):
+        """Get request counters"""
+        return {
+            'requests': self.requests,
+            'rate_limited': self.rate_limited,
+            'token_refreshes': self.token_refreshes
+        }
@@ -0,0 +1,195 @@
+"""
+Batched Spotify Metadata
+
+Looking tracks up one /tracks/{id} call at a time burns through the rate
+limit as soon as a playlist or song list is involved. Lookups go through
+this layer instead:
+- concurrent lookups are collected for SPOTIFY_BATCH_WINDOW seconds and sent
+  as one /tracks?ids= call of up to 50 ids
+- results are cached by track id, in memory and in SQLite, so they survive
+  restarts; the database is only touched from the default executor
+- track objects that arrive some other way (e.g. playlist pages) are cached too
+- hit rate and API call counts are kept for monitoring
+Only the fields the bot uses are stored: name, artists, duration and ISRC.
+"""
+
+import os
+import json
+import asyncio
+import sqlite3
+import threading
+import time
+
+SPOTIFY_CACHE_DB = os.getenv('SPOTIFY_CACHE_DB', os.path.join('data', 'spotify_cache.db'))
+SPOTIFY_BATCH_WINDOW = float(os.getenv('SPOTIFY_BATCH_WINDOW', '0.05'))  # Seconds lookups wait for company
+SPOTIFY_BATCH_SIZE = 50  # Most ids the /tracks endpoint accepts per call
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS spotify_tracks (
+    track_id TEXT PRIMARY KEY,
+    track TEXT NOT NULL,
+    fetched_at REAL NOT NULL
+);
+"""
+
+def compact_track(track):
+    """The parts of a Spotify track object worth caching (same shape as the API's)"""
+    return {
+        'id': track['id'],
+        'name': track['name'],
+        'artists': [{'name': artist['name']} for artist in track.get('artists') or []],
+        'duration_ms': track.get('duration_ms'),
+        'external_ids': {'isrc': (track.get('external_ids') or {}).get('isrc')}
+    }
+
+class SpotifyMetadata:
+    """Batching, caching front for Spotify track lookups"""
+
+    def __init__(self, client, path=SPOTIFY_CACHE_DB, window=SPOTIFY_BATCH_WINDOW, batch_size=SPOTIFY_BATCH_SIZE):
+        self.client = client
+        self.path = path
+        self.window = window
+        self.batch_size = batch_size
+        self.tracks = {}  # track_id -> compact track, everything looked up by this process
+        self._pending = {}  # track_id -> futures waiting for it
+        self._in_flight = {}  # track_id -> futures waiting for a batch that was already sent
+        self._timer = None
+        self._batches = set()
+        self._connection = None
+        self._db_lock = threading.Lock()
+        self.hits = 0
+        self.db_hits = 0
+        self.misses = 0
+        self.api_calls = 0
+
+    # Lookups
+
+    async def track(self, track_id):
+        """Get a (compact) track object, or None if Spotify doesn't know the id"""
+        if track_id in self.tracks:
+            self.hits += 1
+            return self.tracks[track_id]
+
+        future = asyncio.get_running_loop().create_future()
+        if track_id in self._in_flight:
+            self._in_flight[track_id].append(future)
+            return await future
+        self._pending.setdefault(track_id, []).append(future)
+        if len(self._pending) >= self.batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.window, self._flush)
+        return await future
+
+    async def tracks_for(self, track_ids):
+        """Look up several tracks at once, in order"""
+        return await asyncio.gather(*(self.track(track_id) for track_id in track_ids))
+
+    def remember(self, track):
+        """Cache a full track object obtained elsewhere (e.g. from a playlist page)"""
+        if not track or not track.get('id') or track['id'] in self.tracks:
+            return
+        self.tracks[track['id']] = compact_track(track)
+        asyncio.get_running_loop().run_in_executor(None, self._store, [self.tracks[track['id']]])
+
+    def _flush(self):
+        """Send off one batch of pending lookups"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        track_ids = list(self._pending)[:self.batch_size]
+        waiting = {track_id: self._pending.pop(track_id) for track_id in track_ids}
+        self._in_flight.update(waiting)
+        task = asyncio.get_running_loop().create_task(self._fetch(waiting))
+        self._batches.add(task)
+        task.add_done_callback(self._batches.discard)
+
+        if self._pending:
+            self._timer = asyncio.get_running_loop().call_later(self.window, self._flush)
+
+    async def _fetch(self, waiting):
+        loop = asyncio.get_running_loop()
+        try:
+            found = await loop.run_in_executor(None, self._load, list(waiting))
+            self.db_hits += len(found)
+
+            missing = [track_id for track_id in waiting if track_id not in found]
+            if missing:
+                self.misses += len(missing)
+                self.api_calls += 1
+                response = await self.client.get('/tracks', params={'ids': ','.join(missing)})
+                fetched = [compact_track(track) for track in response.get('tracks') or [] if track]
+                found.update((track['id'], track) for track in fetched)
+                await loop.run_in_executor(None, self._store, fetched)
+
+            self.tracks.update(found)
+            for track_id, futures in waiting.items():
+                for future in futures:
+                    if not future.done():
+                        future.set_result(found.get(track_id))
+        except Exception as e:
+            for futures in waiting.values():
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+        finally:
+            for track_id in waiting:
+                self._in_flight.pop(track_id, None)
+
+    # SQLite (executor threads only)
+
+    def _connect(self):
+        if self._connection is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._connection = sqlite3.connect(self.path, check_same_thread=False)
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.executescript(_SCHEMA)
+        return self._connection
+
+    def _load(self, track_ids):
+        with self._db_lock:
+            try:
+                placeholders = ','.join('?' * len(track_ids))
+                rows = self._connect().execute(
+                    f'SELECT track_id, track FROM spotify_tracks WHERE track_id IN ({placeholders})', track_ids
+                )
+                return {track_id: json.loads(track) for track_id, track in rows}
+            except sqlite3.Error as e:
+                print(f"Failed to read Spotify metadata cache: {e}")
+                return {}
+
+    def _store(self, tracks):
+        if not tracks:
+            return
+        with self._db_lock:
+            try:
+                connection = self._connect()
+                with connection:
+                    connection.executemany(
+                        'INSERT OR REPLACE INTO spotify_tracks (track_id, track, fetched_at) VALUES (?, ?, ?)',
+                        [(track['id'], json.dumps(track), time.time()) for track in tracks]
+                    )
+            except sqlite3.Error as e:
+                print(f"Failed to write Spotify metadata cache: {e}")
+
+    def close(self):
+        with self._db_lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def get_stats(self):
+        """Get cache hit rate and API usage"""
+        lookups = self.hits + self.db_hits + self.misses
+        return {
+            'lookups': lookups,
+            'hits': self.hits,
+            'db_hits': self.db_hits,
+            'misses': self.misses,
+            'hit_rate': (self.hits + self.db_hits) / lookups if lookups else 0.0,
+            'api_calls': self.api_calls,
+            'cached_tracks': len(self.tracks)
+        }
@@ -0,0 +1,121 @@
+"""
+Proactive Stream URL Refresh
+
+googlevideo stream URLs expire a few hours after they are resolved, so a song
+resolved early in a long queue would otherwise be re-extracted right when it
+should start playing. The refresher keeps the next few queued songs resolved
+ahead of time:
+- it looks at the first STREAM_REFRESH_LOOKAHEAD songs of the queue and picks
+  the ones with no stream URL or one expiring within STREAM_REFRESH_MARGIN
+- the songs closest to the front are resolved first, one at a time, in small
+  batches per pass so it never competes with starting playback
+- resolutions are limited to STREAM_REFRESH_BUDGET per minute (sliding window)
+- a song that fails to resolve is left alone for STREAM_REFRESH_BACKOFF seconds,
+  doubling with every further failure, so a dead video doesn't use up the
+  budget of the songs behind it
+- songs served from the audio cache never need a stream URL and are skipped
+"""
+
+import os
+import asyncio
+import time
+from collections import deque
+
+from .streaming_youtube import youtube_streamer, is_stream_url_fresh
+from .audio_cache import audio_cache
+
+STREAM_REFRESH_ENABLED = os.getenv('STREAM_REFRESH_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+STREAM_REFRESH_LOOKAHEAD = int(os.getenv('STREAM_REFRESH_LOOKAHEAD', '5'))  # Queued songs kept resolved
+STREAM_REFRESH_MARGIN = int(os.getenv('STREAM_REFRESH_MARGIN', '1800'))  # Seconds before expiry to re-resolve
+STREAM_REFRESH_BUDGET = int(os.getenv('STREAM_REFRESH_BUDGET', '10'))  # Resolutions per minute
+STREAM_REFRESH_INTERVAL = float(os.getenv('STREAM_REFRESH_INTERVAL', '30'))  # Seconds between passes
+STREAM_REFRESH_BATCH = int(os.getenv('STREAM_REFRESH_BATCH', '3'))  # Resolutions per pass
+STREAM_REFRESH_BACKOFF = float(os.getenv('STREAM_REFRESH_BACKOFF', '60'))  # Seconds before retrying a failed song
+STREAM_REFRESH_MAX_BACKOFF = float(os.getenv('STREAM_REFRESH_MAX_BACKOFF', '3600'))
+
+class StreamRefresher:
+    """Background task that keeps stream URLs of upcoming queue items fresh"""
+
+    def __init__(self, music_player, lookahead=STREAM_REFRESH_LOOKAHEAD, margin=STREAM_REFRESH_MARGIN,
+                 budget=STREAM_REFRESH_BUDGET, batch_size=STREAM_REFRESH_BATCH, resolver=None,
+                 backoff=STREAM_REFRESH_BACKOFF, max_backoff=STREAM_REFRESH_MAX_BACKOFF):
+        self.music_player = music_player
+        self.lookahead = lookahead
+        self.margin = margin
+        self.budget = budget
+        self.batch_size = batch_size
+        self.resolver = resolver or youtube_streamer.get_stream_url
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._recent = deque()  # Monotonic times of resolutions within the last minute
+        self._failures = {}  # song url -> (consecutive failures, monotonic time it may be retried)
+        self.resolved = 0
+        self.failed = 0
+
+    def _remaining_budget(self, now):
+        while self._recent and now - self._recent[0] >= 60:
+            self._recent.popleft()
+        return max(0, self.budget - len(self._recent))
+
+    def due(self):
+        """Upcoming songs that need a stream URL soon, front of the queue first (failed ones once their backoff passed)"""
+        now = time.monotonic()
+        upcoming = self.music_player.queue.view(0, self.lookahead)
+        # Forget failures of songs that left the lookahead window
+        urls = {song.url for song in upcoming}
+        for url in [url for url in self._failures if url not in urls]:
+            del self._failures[url]
+
+        songs = []
+        for song in upcoming:
+            if audio_cache.is_cached(song.video_id):
+                continue
+            if song.url in self._failures and now < self._failures[song.url][1]:
+                continue
+            if not is_stream_url_fresh(song.stream_url, song.stream_expires, margin=self.margin):
+                songs.append(song)
+        return songs
+
+    def _record_failure(self, song):
+        failures = self._failures.get(song.url, (0, 0))[0] + 1
+        delay = min(self.backoff * 2 ** (failures - 1), self.max_backoff)
+        self._failures[song.url] = (failures, time.monotonic() + delay)
+
+    async def refresh(self):
+        """Resolve one batch of due songs within the budget. Returns how many were resolved."""
+        resolved = 0
+        for song in self.due():
+            if resolved >= self.batch_size or not self._remaining_budget(time.monotonic()):
+                break
+            self._recent.append(time.monotonic())
+            stream_url = await self.resolver(song.url)
+            if stream_url:
+                self.music_player._remember_stream_url(song, stream_url)
+                self._failures.pop(song.url, None)
+                self.resolved += 1
+                resolved += 1
+            else:
+                self._record_failure(song)
+                self.failed += 1
+        return resolved
+
+    async def run(self, interval=STREAM_REFRESH_INTERVAL):
+        """Background task: refresh upcoming stream URLs every interval"""
+        while True:
+            try:
+                await asyncio.sleep(interval)
+                await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Error in stream refresh loop: {e}")
+
+    def get_stats(self):
+        """Get refresh counters"""
+        return {
+            'resolved': self.resolved,
+            'failed': self.failed,
+            'backing_off': len(self._failures),
+            'budget_left': self._remaining_budget(time.monotonic()),
+            'due': len(self.due())
+        }
@@ -1,29 +1,172 @@
 import os
+import sys
 import asyncio
 import time
-import re
 import discord
 from collections import deque
 
 # Import YouTube streamer
-from .streaming_youtube import youtube_streamer
+from .streaming_youtube import youtube_streamer, extract_video_id, stream_url_expiry, is_stream_url_fresh
+from .broadcast import broadcast_registry
+from .audio_cache import audio_cache
+from .ffmpeg_supervisor import ffmpeg_supervisor
+from .indexed_queue import IndexedQueue, QueueKeyIndex
+from .fair_queue import FairShareScheduler
+from .spotify_client import SpotifyClient, parse_spotify_url, track_info
+from .http_client import http_client
+from .spotify_metadata import SpotifyMetadata
+from .track_mapping import TrackMapping
+from .suggestions import suggestion_index
 
 # Spotify authentication - token takes priority over client credentials
 SPOTIFY_ACCESS_TOKEN = os.getenv('SPOTIFY_ACCESS_TOKEN')
 SPOTIFY_CLIENT_ID = os.getenv('SPOTIFY_CLIENT_ID')  # Fallback for client credentials flow
 SPOTIFY_CLIENT_SECRET = os.getenv('SPOTIFY_CLIENT_SECRET')  # Fallback for client credentials flow
 
+YOUTUBE_THUMBNAIL_BASE = "https://i.ytimg.com/vi"
+
+# Looks up a Discord user by id when a song's requester is displayed (set by bot.py)
+_requester_resolver = None
+
+def set_requester_resolver(resolver):
+    """Set the function used to turn a requester id back into a user (e.g. bot.get_user)"""
+    global _requester_resolver
+    _requester_resolver = resolver
+
+class RequesterRef:
+    """Stand-in for a requester that is not in the user cache - enough to mention them"""
+    __slots__ = ('id',)
+
+    def __init__(self, user_id):
+        self.id = user_id
+
+    @property
+    def mention(self):
+        return f"<@{self.id}>"
+
+    @property
+    def display_name(self):
+        return str(self.id)
+
+    name = display_name
+
 class Song:
+    """A queued track. Kept small because imported playlists put thousands of these in a queue:
+    YouTube URLs are stored as the 11-character video id and the requester as a user id."""
+
+    __slots__ = ('title', 'video_id', '_url', 'duration', '_thumbnail', 'requester_id', '_requester',
+                 'stream_url', 'stream_expires')
+
     def __init__(self, title, url, duration, thumbnail=None, requester=None):
         self.title = title
         self.url = url
-        self.duration = duration
+        self.duration = int(duration or 0)
         self.thumbnail = thumbnail
         self.requester = requester
+        self.stream_url = None  # Resolved stream URL, reused while it is still valid
+        self.stream_expires = None  # Unix time the stream URL expires at
+
+    @property
+    def url(self):
+        if self._url is None and self.video_id:
+            return f"https://www.youtube.com/watch?v={self.video_id}"
+        return self._url
+
+    @url.setter
+    def url(self, url):
+        self.video_id = extract_video_id(url)
+        # Canonical watch URLs are rebuilt from the id, anything else is kept as given
+        canonical = self.video_id and url == f"https://www.youtube.com/watch?v={self.video_id}"
+        self._url = None if canonical else url
+
+    @property
+    def thumbnail(self):
+        if self._thumbnail and '/' not in self._thumbnail:
+            return f"{YOUTUBE_THUMBNAIL_BASE}/{self.video_id}/{self._thumbnail}"
+        return self._thumbnail
+
+    @thumbnail.setter
+    def thumbnail(self, thumbnail):
+        # YouTube thumbnails are rebuilt from the video id; the file name (hqdefault.jpg, ...) is shared
+        prefix = f"{YOUTUBE_THUMBNAIL_BASE}/{self.video_id}/"
+        if self.video_id and thumbnail and thumbnail.startswith(prefix) and '/' not in thumbnail[len(prefix):]:
+            thumbnail = sys.intern(thumbnail[len(prefix):])
+        self._thumbnail = thumbnail
+
+    @property
+    def requester(self):
+        if self.requester_id is None:
+            return self._requester  # Not a Discord user (None or a plain name)
+        user = _requester_resolver(self.requester_id) if _requester_resolver else None
+        return user or RequesterRef(self.requester_id)
+
+    @requester.setter
+    def requester(self, requester):
+        # Only the id of a Discord user is kept, so queued songs don't keep member objects alive
+        user_id = getattr(requester, 'id', None)
+        self.requester_id = user_id if isinstance(user_id, int) else None
+        self._requester = None if self.requester_id is not None else requester
+
+    def to_dict(self):
+        """Plain-data form of the song, for persistence and process handoff"""
+        return {
+            'title': self.title,
+            'url': self.url,
+            'duration': self.duration,
+            'thumbnail': self.thumbnail,
+            'requester_id': self.requester_id,
+            'stream_url': self.stream_url,
+            'stream_expires': self.stream_expires
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Rebuild a song saved with to_dict"""
+        requester_id = data.get('requester_id')
+        song = cls(
+            title=data['title'],
+            url=data['url'],
+            duration=data.get('duration'),
+            thumbnail=data.get('thumbnail'),
+            requester=RequesterRef(requester_id) if requester_id is not None else None
+        )
+        song.stream_url = data.get('stream_url')
+        song.stream_expires = data.get('stream_expires')
+        return song
+
+    @classmethod
+    def from_video_info(cls, video_info, requester=None):
+        """Create a song from a YouTube search or extraction result"""
+        song = cls(
+            title=video_info['title'],
+            url=video_info['url'],
+            duration=video_info['duration'],
+            thumbnail=video_info.get('thumbnail'),
+            requester=requester
+        )
+        # A full extraction already resolved the stream, so playing it needs no second one
+        if video_info.get('direct_url'):
+            song.stream_url = video_info['direct_url']
+            song.stream_expires = stream_url_expiry(song.stream_url)
+        return song
+
+def song_duration(song):
+    """Queue weight of a song: its duration in whole seconds (0 when unknown)"""
+    return int(getattr(song, 'duration', 0) or 0)
+
+def song_key(song):
+    """Identity of a song for duplicate checks: its YouTube video id, or its URL"""
+    return song.video_id or song.url
+
+# Queued songs resolved at once when advancing, so a run of unplayable entries is skipped quickly
+SKIP_AHEAD_CANDIDATES = int(os.getenv('SKIP_AHEAD_CANDIDATES', '3'))
+
+# Repeat modes: 'off', 'one' (repeat the current song) or 'queue' (finished songs go back to the end)
+LOOP_MODES = ('off', 'one', 'queue')
 
 class MusicPlayer:
     def __init__(self):
-        self.queue = deque()
+        self.queue = IndexedQueue(weight=song_duration)  # Keeps running duration totals
         self.history = deque(maxlen=10)  # Keep last 10 songs for backward functionality
         self.current_song = None
         self.voice_client = None
@@ -32,36 +175,33 @@ class MusicPlayer:
         self.current_position = 0  # Current playback position in seconds
         self.playback_start_time = None  # When current playback started (for position tracking)
         self.is_seeking = False  # Flag to prevent _after_playing from resetting song during seeks
+        self.stop_requested = False  # Set by stop_playback() so _after_playing knows the song was cut short
         self.last_text_channel = None  # Store last text channel for notifications
         self.bot_loop = None  # Store bot's event loop for thread-safe coroutine scheduling
+        self.loop_mode = 'off'  # Repeat mode, one of LOOP_MODES
+        self.state_store = None  # Optional StateStore that persists the queue and playback position
+        self._persisted_guild_id = None  # Guild whose queue the journal currently describes
+        self.handing_off = False  # Set while another process takes over playback
+        self.fair_share = None  # FairShareScheduler while fair-share mode is on
+        self.dedupe = None  # QueueKeyIndex of queued songs while dedupe mode is on
 
         # Initialize Spotify client (token takes priority, then client credentials)
-        if SPOTIFY_ACCESS_TOKEN:
-            try:
-                import spotipy
-                self.spotify = spotipy.Spotify(auth=SPOTIFY_ACCESS_TOKEN)
-                print("Spotify API client initialized with access token.")
-            except Exception as e:
-                print(f"Failed to initialize Spotify client with token: {e}")
-                self.spotify = None
-        elif SPOTIFY_CLIENT_ID and SPOTIFY_CLIENT_SECRET:
-            try:
-                import spotipy
-                from spotipy.oauth2 import SpotifyClientCredentials
-
-                client_credentials_manager = SpotifyClientCredentials(
-                    client_id=SPOTIFY_CLIENT_ID,
-                    client_secret=SPOTIFY_CLIENT_SECRET
-                )
-                self.spotify = spotipy.Spotify(client_credentials_manager=client_credentials_manager)
-                print("Spotify API client initialized with client credentials.")
-            except Exception as e:
-                print(f"Failed to initialize Spotify client with credentials: {e}")
-                self.spotify = None
+        if SPOTIFY_ACCESS_TOKEN or (SPOTIFY_CLIENT_ID and SPOTIFY_CLIENT_SECRET):
+            # Async client, so metadata lookups never block the event loop
+            self.spotify = SpotifyClient(
+                access_token=SPOTIFY_ACCESS_TOKEN,
+                client_id=SPOTIFY_CLIENT_ID,
+                client_secret=SPOTIFY_CLIENT_SECRET
+            )
+            print("Spotify API client initialized with " + ("access token." if SPOTIFY_ACCESS_TOKEN else "client credentials."))
         else:
             print("No Spotify authentication found. Using oEmbed fallback for Spotify URLs.")
             self.spotify = None
 
+        # Track lookups are batched and cached in front of the API client
+        self.spotify_metadata = SpotifyMetadata(self.spotify) if self.spotify else None
+        self.track_mapping = TrackMapping()  # Spotify tracks already matched to a YouTube video
+
     def format_time(self, seconds):
         """Format seconds into HH:MM:SS or MM:SS format"""
         total_seconds = int(seconds)
@@ -85,52 +225,49 @@ class MusicPlayer:
 
     async def extract_spotify_info(self, url):
         """Extract track information from Spotify URL using API token or oEmbed fallback"""
-        # Extract track ID from Spotify URL
-        match = re.search(r'spotify\.com/track/([a-zA-Z0-9]+)', url)
-        if not match:
+        # Extract track ID from Spotify URL or URI
+        parsed = parse_spotify_url(url)
+        if not parsed or parsed[0] != 'track':
             return None
 
-        track_id = match.group(1)
+        track_id = parsed[1]
 
         # Try using Spotify API first if we have authentication
         if self.spotify:
             try:
-                track = self.spotify.track(track_id)
-                return {
-                    'title': track['name'],
-                    'artist': ', '.join([artist['name'] for artist in track['artists']]),
-                    'query': f"{track['name']} {track['artists'][0]['name']}"
-                }
+                track = await self.spotify_metadata.track(track_id)
+                if track:
+                    return track_info(track)
+                print(f"Spotify track {track_id} not found, falling back to oEmbed")
             except Exception as e:
                 print(f"Spotify API request failed, falling back to oEmbed: {e}")
 
         # Fallback to oEmbed if API is not available or failed
         try:
-            import aiohttp
+            track_url = f"https://open.spotify.com/track/{track_id}"
+            async with http_client.get("https://open.spotify.com/oembed", params={'url': track_url}) as response:
+                if response.status != 200:
+                    print(f"oEmbed request failed with status: {response.status}")
+                    return None
 
-            oembed_url = f"https://open.spotify.com/oembed?url={url}"
+                data = await response.json()
 
-            async with aiohttp.ClientSession() as session:
-                async with session.get(oembed_url) as response:
-                    if response.status != 200:
-                        print(f"oEmbed request failed with status: {response.status}")
-                        return None
+                # Extract title from oEmbed data
+                title_text = data.get('title', '')
 
-                    data = await response.json()
+                if not title_text:
+                    return None
 
-                    # Extract title from oEmbed data
-                    title_text = data.get('title', '')
-
-                    if not title_text:
-                        return None
-
-                    # Spotify oEmbed only provides the track title, not the artist
-                    # We'll use just the title for YouTube search
-                    return {
-                        'title': title_text,
-                        'artist': 'Unknown (from Spotify)',  # Placeholder
-                        'query': title_text  # Search YouTube with just the title
-                    }
+                # Spotify oEmbed only provides the track title, not the artist
+                # We'll use just the title for YouTube search
+                return {
+                    'title': title_text,
+                    'artist': 'Unknown (from Spotify)',  # Placeholder
+                    'artists': [],
+                    'query': title_text,  # Search YouTube with just the title
+                    'spotify_id': track_id,
+                    'isrc': None
+                }
 
         except Exception as e:
             print(f"Error extracting Spotify info via oEmbed: {e}")
@@ -138,7 +275,39 @@ class MusicPlayer:
 
     async def search_youtube(self, query):
         """Search YouTube and return video info using the YouTube streamer"""
-        return await youtube_streamer.search_youtube(query)
+        video_info = await youtube_streamer.search_youtube(query)
+        if video_info:
+            suggestion_index.add_result(video_info['title'], video_info['url'], extract_video_id(video_info['url']))
+        return video_info
+
+    async def search_spotify_track(self, spotify_info):
+        """Search YouTube for a Spotify track, picking the result closest in title, artist and duration"""
+        artist = (spotify_info.get('artists') or [None])[0]  # oEmbed lookups don't know the artist
+        return await youtube_streamer.search_best_match(
+            spotify_info['query'], spotify_info['title'], artist, spotify_info.get('duration')
+        )
+
+    async def resolve_spotify_track(self, spotify_info):
+        """Find the YouTube video for a Spotify track, reusing an earlier match instead of searching again"""
+        loop = asyncio.get_running_loop()
+        spotify_id, isrc = spotify_info.get('spotify_id'), spotify_info.get('isrc')
+
+        mapped = await loop.run_in_executor(None, self.track_mapping.lookup, spotify_id, isrc)
+        if mapped:
+            return {
+                'title': mapped['title'] or spotify_info['title'],
+                'url': f"https://www.youtube.com/watch?v={mapped['video_id']}",
+                'duration': mapped['duration'] or 0,
+                'thumbnail': f"{YOUTUBE_THUMBNAIL_BASE}/{mapped['video_id']}/hqdefault.jpg"
+            }
+
+        video_info = await self.search_spotify_track(spotify_info)
+        if video_info:
+            video_id = extract_video_id(video_info['url'])
+            await loop.run_in_executor(
+                None, self.track_mapping.store, spotify_id, video_id, isrc, video_info['title'], video_info['duration']
+            )
+        return video_info
 
     async def stream_and_play(self, interaction, song, start_time=0):
         """Stream and play a song from a specific start time"""
@@ -170,14 +339,20 @@ class MusicPlayer:
         # Stream audio in real-time
         try:
             # Get streaming URL from YouTube streamer
-            stream_url = await youtube_streamer.get_stream_url(song.url)
+            stream_url = await self._get_stream_url(song)
 
             if not stream_url:
                 await interaction.followup.send("❌ Failed to get streaming URL")
                 return
 
             # Stream audio using YouTube streamer
-            success = await youtube_streamer.stream_audio(self.voice_client, stream_url, lambda e: self._after_playing(e), start_time)
+            success = await youtube_streamer.stream_audio(
+                self.voice_client,
+                stream_url,
+                lambda e: self._after_playing(e),
+                start_time,
+                video_id=song.video_id
+            )
 
             if success:
                 # Add current song to history if there was one
@@ -188,6 +363,9 @@ class MusicPlayer:
                 self.is_playing = True
                 self.current_position = start_time
                 self.playback_start_time = time.time() if start_time == 0 else None
+                self.save_state()
+                if start_time == 0:
+                    suggestion_index.record_play(song, self._state_guild_id())
                 await interaction.followup.send(f"🎵 Now streaming: **{song.title}**")
 
                 # Auto-send control panel when song starts
@@ -199,8 +377,78 @@ class MusicPlayer:
             print(f"Error streaming song: {e}")
             await interaction.followup.send(f"❌ Error streaming song: {str(e)}")
 
+    async def _get_stream_url(self, song):
+        """Resolve the stream URL for a song, skipping extraction for cached tracks and running shared decodes"""
+        video_id = song.video_id
+        if audio_cache.is_cached(video_id):
+            # stream_audio plays the local file for this video id
+            return audio_cache.path_for(video_id)
+
+        shared_url = broadcast_registry.get_stream_url(video_id)
+        if shared_url:
+            return shared_url
+
+        # Reuse the URL resolved on an earlier play (e.g. when looping) until it nears expiry
+        if is_stream_url_fresh(getattr(song, 'stream_url', None), getattr(song, 'stream_expires', None)):
+            return song.stream_url
+
+        stream_url = await youtube_streamer.get_stream_url(song.url)
+        self._remember_stream_url(song, stream_url)
+        return stream_url
+
+    def _remember_stream_url(self, song, stream_url):
+        """Store a resolved stream URL and its expiry on the song"""
+        if stream_url and hasattr(song, 'stream_url'):
+            song.stream_url = stream_url
+            song.stream_expires = stream_url_expiry(stream_url)
+
+    def set_loop_mode(self, mode):
+        """Set the repeat mode ('off', 'one' or 'queue')"""
+        if mode not in LOOP_MODES:
+            raise ValueError(f"Unknown loop mode: {mode}")
+        self.loop_mode = mode
+        return self.loop_mode
+
+    def stop_playback(self):
+        """Stop the current song on purpose (skip, stop, jump, ...), so repeat modes don't treat it as finished"""
+        if self.voice_client and (self.voice_client.is_playing() or self.voice_client.is_paused()):
+            # Set first: the player thread may run the after callback before stop() returns
+            self.stop_requested = True
+            self.voice_client.stop()
+
+    def _replay_current_song(self):
+        """Restart the current song immediately for repeat-one (called from the player thread)"""
+        song = self.current_song
+        stream_url = song.stream_url if is_stream_url_fresh(song.stream_url, song.stream_expires) else None
+
+        if not youtube_streamer.replay_nowait(
+            self.voice_client,
+            stream_url,
+            lambda e: self._after_playing(e),
+            video_id=song.video_id
+        ):
+            return False
+
+        self.is_playing = True
+        self.current_position = 0
+        self.playback_start_time = time.time()
+        return True
+
+    async def _restart_current_song(self):
+        """Repeat-one fallback when the song could not be restarted immediately"""
+        try:
+            await self._start_stream_from_position(self.current_song, 0)
+        except Exception as e:
+            print(f"Failed to repeat current song: {e}")
+            if self.queue:
+                await self._play_next_in_queue()
+
     def _after_playing(self, error=None):
         """Called when audio finishes playing - runs in Discord's player thread"""
+        stopped, self.stop_requested = self.stop_requested, False
+        if self.handing_off:
+            return  # Another process is taking over, keep the song and queue as they are
+
         if error:
             # Convert error to string for checking, handling both Exception objects and strings
             if isinstance(error, Exception):
@@ -242,6 +490,20 @@ class MusicPlayer:
                 if not self.voice_client or not self.voice_client.is_connected():
                     print("Voice client not connected")
 
+        # Repeat modes only apply when the song ran to its end (not after skip/stop/seek)
+        if not error and self.current_song and not self.is_seeking and not stopped:
+            if self.loop_mode == 'one' and self.voice_client and self.voice_client.is_connected():
+                if self._replay_current_song():
+                    print(f"Repeating: {self.current_song.title}")
+                    return
+                loop = self._get_event_loop()
+                if loop:
+                    asyncio.run_coroutine_threadsafe(self._restart_current_song(), loop)
+                    return
+            elif self.loop_mode == 'queue':
+                # Keeps its resolved stream URL, so it won't be extracted again if still valid
+                self.enqueue(self.current_song)
+
         # Add current song to history if it exists and we're not seeking
         if self.current_song and not self.is_seeking:
             self.history.append(self.current_song)
@@ -252,6 +514,7 @@ class MusicPlayer:
         # Only reset current_song if we're not seeking (seeking handles its own state)
         if not self.is_seeking:
             self.current_song = None
+            self.save_state()
 
         # Auto-play next song in queue if available
         # Note: This is called from Discord's voice client, which runs in a separate thread
@@ -332,7 +595,7 @@ class MusicPlayer:
             # Add queue info
             queue_info = self.get_queue_info()
             if queue_info['queue']:
-                queue_text = f"📋 **{len(queue_info['queue'])}** song(s) in queue"
+                queue_text = f"📋 **{len(queue_info['queue'])}** song(s) in queue ({self.format_time(queue_info['total_duration'])} total)"
                 if len(queue_info['queue']) <= 3:
                     queue_text += "\n" + "\n".join([f"• {song.title}" for song in queue_info['queue'][:3]])
                 embed.add_field(
@@ -376,6 +639,7 @@ class MusicPlayer:
 
             # Get a fresh stream URL (the old one might have expired)
             stream_url = await youtube_streamer.get_stream_url(self.current_song.url)
+            self._remember_stream_url(self.current_song, stream_url)
 
             if not stream_url:
                 print("Failed to get fresh stream URL for recovery")
@@ -421,66 +685,103 @@ class MusicPlayer:
             if loop:
                 asyncio.run_coroutine_threadsafe(self._handle_recovery_failure(), loop)
 
-    async def _play_next_in_queue(self):
-        """Auto-play the next song in the queue"""
-        try:
-            if not self.queue:
-                return
+    async def _resolve_candidates(self):
+        """Resolve the next SKIP_AHEAD_CANDIDATES queued songs concurrently and yield (song, stream_url) in queue order"""
+        candidates = list(self.queue.view(0, SKIP_AHEAD_CANDIDATES))
+        tasks = [asyncio.ensure_future(self._get_stream_url(song)) for song in candidates]
+        # Later candidates keep resolving in the background; their URLs are remembered on the song either way
+        for song, task in zip(candidates, tasks):
+            try:
+                stream_url = await task
+            except Exception as e:
+                print(f"Error resolving {song.title}: {e}")
+                stream_url = None
+            yield song, stream_url
 
-            if not self.voice_client or not self.voice_client.is_connected():
-                print("Cannot play next song: voice client not connected")
-                return
+    def _take_from_queue(self, song):
+        """Remove a song that is about to play or be skipped, unless it was removed meanwhile"""
+        try:
+            self.queue.remove(song)
+            return True
+        except ValueError:
+            return False
 
-            next_song = self.queue.popleft()
-            print(f"Auto-playing next song: {next_song.title}")
+    async def _report_skipped(self, skipped):
+        """Send one message listing the queued songs that could not be played"""
+        if not skipped or not self.last_text_channel:
+            return
+        titles = ", ".join(f"**{song.title}**" for song in skipped[:5])
+        if len(skipped) > 5:
+            titles += f" and {len(skipped) - 5} more"
+        try:
+            await self.last_text_channel.send(f"⚠️ Skipped {len(skipped)} unplayable song(s): {titles}")
+        except Exception as e:
+            print(f"Failed to report skipped songs: {e}")
 
-            # Get fresh stream URL
-            stream_url = await youtube_streamer.get_stream_url(next_song.url)
-            if not stream_url:
-                print(f"Failed to get stream URL for {next_song.title}, trying next song")
-                # Try next song in queue
+    async def _play_next_in_queue(self, note=""):
+        """Auto-play the next playable song in the queue, skipping unplayable ones. Returns True if one started."""
+        skipped = []
+        try:
+            if not self.voice_client or not self.voice_client.is_connected():
                 if self.queue:
-                    await self._play_next_in_queue()
-                else:
-                    self.current_song = None
-                return
+                    print("Cannot play next song: voice client not connected")
+                return False
 
-            # Add previous song to history
-            if self.current_song:
-                self.history.append(self.current_song)
+            # Resolve a few candidates at a time so a run of dead videos doesn't cost one extraction each in turn
+            while self.queue:
+                async for next_song, stream_url in self._resolve_candidates():
+                    if not self._take_from_queue(next_song):
+                        continue  # Removed from the queue while resolving
 
-            # Play the next song
-            success = await youtube_streamer.stream_audio(
-                self.voice_client,
-                stream_url,
-                lambda e: self._after_playing(e),
-                0
-            )
+                    if not stream_url:
+                        print(f"Failed to get stream URL for {next_song.title}, trying next song")
+                        skipped.append(next_song)
+                        continue
 
-            if success:
-                self.current_song = next_song
-                self.is_playing = True
-                self.current_position = 0
-                self.playback_start_time = time.time()
-                
-                if self.last_text_channel:
-                    await self.last_text_channel.send(f"🎵 Now playing: **{next_song.title}**")
-                
-                # Send control panel
-                await self._send_control_panel()
-            else:
-                print(f"Failed to start next song, trying next in queue")
-                # Try next song
-                if self.queue:
-                    await self._play_next_in_queue()
-                else:
-                    self.current_song = None
+                    print(f"Auto-playing next song: {next_song.title}")
+                    success = await youtube_streamer.stream_audio(
+                        self.voice_client,
+                        stream_url,
+                        lambda e: self._after_playing(e),
+                        0,
+                        video_id=next_song.video_id
+                    )
+                    if not success:
+                        print(f"Failed to start {next_song.title}, trying next in queue")
+                        skipped.append(next_song)
+                        continue
+
+                    # Add previous song to history
+                    if self.current_song:
+                        self.history.append(self.current_song)
+
+                    self.current_song = next_song
+                    self.is_playing = True
+                    self.current_position = 0
+                    self.playback_start_time = time.time()
+                    self.save_state()
+                    suggestion_index.record_play(next_song, self._state_guild_id())
+
+                    await self._report_skipped(skipped)
+                    if self.last_text_channel:
+                        await self.last_text_channel.send(f"🎵 Now playing: **{next_song.title}**{note}")
+
+                    # Send control panel
+                    await self._send_control_panel()
+                    return True
+
+            # Nothing in the queue could be played
+            if skipped:
+                self.current_song = None
+            await self._report_skipped(skipped)
+            return False
 
         except Exception as e:
             print(f"Error playing next song in queue: {e}")
             if not self.is_seeking:
                 self.current_song = None
             self.is_playing = False
+            return False
 
     async def _handle_recovery_failure(self):
         """Handle the case when stream recovery fails - try next song or cleanup"""
@@ -495,24 +796,10 @@ class MusicPlayer:
             # Try to play next song in queue if available
             if self.queue:
                 print(f"Recovery failed, trying next song in queue ({len(self.queue)} songs remaining)")
-                next_song = self.queue.popleft()
-                self.current_song = next_song
-                
-                # Get a fresh stream URL for the next song
-                stream_url = await youtube_streamer.get_stream_url(next_song.url)
-                if stream_url:
-                    success = await youtube_streamer.stream_audio(
-                        self.voice_client,
-                        stream_url,
-                        lambda e: self._after_playing(e),
-                        0
-                    )
-                    if success:
-                        self.is_playing = True
-                        self.playback_start_time = time.time()
-                        if self.last_text_channel:
-                            await self.last_text_channel.send(f"🎵 Now playing: **{next_song.title}** (recovered from previous error)")
-                        return
+                if not self.is_seeking:
+                    self.current_song = None  # Already in history
+                if await self._play_next_in_queue(" (recovered from previous error)"):
+                    return
 
             # No queue or next song failed, reset state
             print("No more songs in queue after recovery failure")
@@ -536,20 +823,292 @@ class MusicPlayer:
 
     async def add_to_queue(self, song):
         """Add a song to the queue"""
+        return self.enqueue(song)
+
+    def enqueue(self, song):
+        """Add a song at the end of the queue, or at its turn in fair-share mode. Returns its 1-based position,
+        or None when dedupe mode skipped it because it is already queued."""
+        if self.dedupe and song_key(song) in self.dedupe:
+            return None
+        if self.fair_share:
+            return self.fair_share.insert(song) + 1
         self.queue.append(song)
+        return len(self.queue)
+
+    def enqueue_many(self, songs):
+        """Add several songs at once. Returns (queued, duplicates).
+        Outside fair-share mode they go in with one queue extend, so one mutation is journaled."""
+        if self.fair_share:
+            positions = [self.enqueue(song) for song in songs]
+            queued = sum(position is not None for position in positions)
+            return queued, len(positions) - queued
+
+        songs = list(songs)
+        fresh = songs
+        if self.dedupe:
+            seen = set()
+            fresh = []
+            for song in songs:
+                key = song_key(song)
+                if key not in self.dedupe and key not in seen:
+                    seen.add(key)
+                    fresh.append(song)
+        self.queue.extend(fresh)
+        return len(fresh), len(songs) - len(fresh)
+
+    def set_dedupe(self, enabled):
+        """Turn dedupe mode on or off; while on, songs already in the queue are not queued again"""
+        if enabled and not self.dedupe:
+            self.dedupe = QueueKeyIndex(self.queue, song_key)
+        elif not enabled and self.dedupe:
+            self.dedupe.close()
+            self.dedupe = None
+        return bool(self.dedupe)
+
+    def set_fair_share(self, enabled, interleave=True):
+        """Turn fair-share mode on or off; turning it on interleaves the existing queue by requester"""
+        if enabled and not self.fair_share:
+            self.fair_share = FairShareScheduler(self.queue)
+            if interleave:
+                self.fair_share.interleave()
+        elif not enabled and self.fair_share:
+            self.fair_share.close()
+            self.fair_share = None
+        return bool(self.fair_share)
 
     def clear_queue(self):
         """Clear the music queue"""
         self.queue.clear()
 
+    def remove_from_queue(self, position):
+        """Remove the song at a 1-based queue position and return it"""
+        return self.queue.pop(position - 1)
+
+    def move_in_queue(self, source, destination):
+        """Move a song between 1-based queue positions and return it"""
+        return self.queue.move(source - 1, destination - 1)
+
+    def jump_in_queue(self, position):
+        """Make the song at a 1-based queue position the next one to play, returning the songs passed over"""
+        passed = self.queue.jump(position - 1)
+        # In repeat-queue mode the songs passed over stay in the rotation
+        if self.loop_mode == 'queue':
+            self.queue.extend(passed)
+        return passed
+
+    def shuffle_queue(self):
+        """Shuffle the queue in place"""
+        self.queue.shuffle()
+
+    def queue_duration(self):
+        """Total length of the queued songs in seconds - O(1)"""
+        return self.queue.total_weight()
+
+    def time_until(self, position):
+        """Seconds until the song at a 1-based queue position starts - O(log n)"""
+        remaining = 0
+        if self.current_song:
+            remaining = max(0, song_duration(self.current_song) - self.get_current_position())
+        return remaining + self.queue.weight_before(position - 1)
+
     def get_queue_info(self):
         """Get information about the current queue"""
         return {
             'current': self.current_song,
-            'queue': list(self.queue),
+            'queue': self.queue.view(),  # Live view, the queue is not copied
+            'total_duration': self.queue_duration(),
             'is_playing': self.is_playing
         }
 
+    def attach_state_store(self, state_store):
+        """Persist the queue and playback state to a StateStore from now on"""
+        self.state_store = state_store
+        self.queue.subscribe(self._journal_queue_op)
+
+    def _state_guild_id(self):
+        """Guild the player is serving (None before the first command)"""
+        if self.voice_client and getattr(self.voice_client, 'guild', None):
+            return self.voice_client.guild.id
+        guild = getattr(self.last_text_channel, 'guild', None)
+        return guild.id if guild else None
+
+    def _journal_queue_op(self, op, *args):
+        """Queue listener: append each mutation to the persisted journal (may run in the player thread)"""
+        guild_id = self._state_guild_id()
+        if not self.state_store or guild_id is None or self.handing_off:
+            return
+        if guild_id != self._persisted_guild_id or op == 'shuffle':
+            # A new guild, or a reordering the journal can't describe: store the whole queue
+            self._snapshot_queue(guild_id)
+            return
+
+        if op == 'insert':
+            args = (args[0], args[1].to_dict())
+        elif op == 'pop':
+            args = (args[0],)
+        elif op == 'extend':
+            args = ([song.to_dict() for song in args[0]],)
+        elif op == 'jump':
+            args = (args[0],)
+
+        if self.state_store.record_queue_op(guild_id, op, args):
+            self._snapshot_queue(guild_id)
+
+    def _snapshot_queue(self, guild_id):
+        self._persisted_guild_id = guild_id
+        self.state_store.snapshot_queue(guild_id, [song.to_dict() for song in self.queue])
+
+    def player_state(self):
+        """Plain-data playback state: channels, current song and position, repeat mode and volume"""
+        connected = self.voice_client and self.voice_client.is_connected()
+        return {
+            'channel_id': self.voice_client.channel.id if connected else None,
+            'text_channel_id': getattr(self.last_text_channel, 'id', None),
+            'current': self.current_song.to_dict() if self.current_song else None,
+            'position': self.get_current_position() if self.current_song else 0,
+            'is_paused': bool(connected and self.voice_client.is_paused()),
+            'loop_mode': self.loop_mode,
+            'fair_share': bool(self.fair_share),
+            'dedupe': bool(self.dedupe),
+            'volume': self.volume,
+            'saved_at': time.time()
+        }
+
+    def save_state(self):
+        """Persist the current song, position and channels (cheap, the write happens in the background)"""
+        guild_id = self._state_guild_id()
+        if not self.state_store or guild_id is None or self.handing_off:
+            return
+        if guild_id != self._persisted_guild_id:
+            self._snapshot_queue(guild_id)
+        self.state_store.save_player(guild_id, self.player_state())
+
+    async def state_save_loop(self, interval=10):
+        """Keep the persisted playback position fresh while something is playing"""
+        while True:
+            await asyncio.sleep(interval)
+            if self.current_song and self.is_playing:
+                self.save_state()
+
+    def _load_saved_queue(self, guild, player_state, songs):
+        """Take over a saved queue, repeat mode, volume and text channel"""
+        self.loop_mode = player_state.get('loop_mode', self.loop_mode)
+        self.volume = player_state.get('volume', self.volume)
+        self.last_text_channel = guild.get_channel(player_state.get('text_channel_id') or 0)
+
+        if self.state_store:
+            self.queue.unsubscribe(self._journal_queue_op)  # Restoring must not be journaled again
+        try:
+            self.queue.extend(Song.from_dict(song) for song in songs)
+        finally:
+            if self.state_store:
+                self.queue.subscribe(self._journal_queue_op)
+        self._persisted_guild_id = None  # Next save writes a fresh snapshot
+        # The saved order already reflects fair-share turns, so it is kept as is
+        self.set_fair_share(player_state.get('fair_share', False), interleave=False)
+        self.set_dedupe(player_state.get('dedupe', False))
+
+    async def _resume_saved_song(self, guild, player_state, position):
+        """Rejoin the saved voice channel and continue the saved song from `position`. Returns True on success."""
+        current = Song.from_dict(player_state['current']) if player_state.get('current') else None
+        channel = guild.get_channel(player_state.get('channel_id') or 0)
+        resumed = False
+
+        if current and channel and any(not member.bot for member in channel.members):
+            try:
+                self.voice_client = await channel.connect()
+                self.bot_loop = asyncio.get_running_loop()
+                # A still-valid stream URL travels with the song, so this skips extraction
+                await self._start_stream_from_position(current, position)
+                if player_state.get('is_paused'):
+                    self.pause()
+                resumed = True
+                print(f"Resumed {current.title} at {self.format_time(position)} in {channel.name}")
+            except Exception as e:
+                print(f"Failed to resume playback: {e}")
+
+        if current and not resumed:
+            # Keep the interrupted song so it is not lost
+            self.queue.appendleft(current)
+        return resumed
+
+    async def restore_state(self, bot):
+        """Warm restart: reload the saved queue, rejoin voice and resume the current song where it left off"""
+        if not self.state_store:
+            return False
+
+        loop = asyncio.get_running_loop()
+        saved = await loop.run_in_executor(None, self.state_store.load)
+        if not saved:
+            return False
+
+        # One player serves one guild at a time: resume the one that was active most recently
+        guild_id, data = max(saved.items(), key=lambda item: item[1]['updated_at'])
+        guild = bot.get_guild(guild_id)
+        if not guild:
+            print(f"Saved state belongs to guild {guild_id}, which is not available")
+            return False
+
+        player_state = data['player'] or {}
+        self._load_saved_queue(guild, player_state, data['queue'])
+        position = player_state.get('position', 0)
+        if await self._resume_saved_song(guild, player_state, position) and self.last_text_channel:
+            await self.last_text_channel.send(
+                f"🔄 Back after a restart: resuming **{self.current_song.title}** at {self.format_time(position)}"
+            )
+
+        print(f"Restored {len(self.queue)} queued song(s) for guild {guild.name}")
+        self.save_state()
+        return True
+
+    # Process handoff (see utils/handoff.py)
+
+    def export_state(self):
+        """Everything the next process needs to take over: the guild, playback state and the whole queue"""
+        guild_id = self._state_guild_id()
+        if guild_id is None:
+            return None
+        state = self.player_state()
+        state['guild_id'] = guild_id
+        state['queue'] = [song.to_dict() for song in self.queue]
+        return state
+
+    async def release_for_handoff(self):
+        """Stop playing and leave voice without clearing anything, so another process can take over.
+        Returns where playback stopped and when."""
+        self.handing_off = True  # No more state writes or auto-play from this process
+        guild_id = self._state_guild_id()
+        position = self.get_current_position() if self.current_song else 0
+
+        if self.voice_client:
+            self.voice_client.stop()
+            stopped_at = time.time()
+            try:
+                await self.voice_client.disconnect()
+            except Exception as e:
+                print(f"Error leaving voice during handoff: {e}")
+            if guild_id is not None:
+                ffmpeg_supervisor.clear_active_source(guild_id)
+        else:
+            stopped_at = time.time()
+
+        if self.state_store:
+            self.state_store.flush()
+        return {'guild_id': guild_id, 'position': position, 'stopped_at': stopped_at}
+
+    async def resume_from_handoff(self, bot, state, released):
+        """Take over a guild handed over by the previous process. Returns the seconds of silence, or None."""
+        guild = bot.get_guild(state['guild_id'])
+        if not guild:
+            print(f"Handed-over guild {state['guild_id']} is not available")
+            return None
+
+        self._load_saved_queue(guild, state, state['queue'])
+        position = released.get('position', state.get('position', 0))
+        resumed = await self._resume_saved_song(guild, state, position)
+        self.save_state()
+        return time.time() - released['stopped_at'] if resumed else None
+
     def set_volume(self, volume_level):
         """Set the playback volume (0-100)"""
         # Clamp volume between 0 and 100
@@ -573,6 +1132,7 @@ class MusicPlayer:
                 self.current_position = self.get_current_position()
                 self.playback_start_time = None
             self.is_playing = False
+            self.save_state()
             return True
         return False
 
@@ -583,6 +1143,7 @@ class MusicPlayer:
             self.is_playing = True
             # Reset playback start time for position tracking
             self.playback_start_time = time.time()
+            self.save_state()
             return True
         return False
 
@@ -613,11 +1174,13 @@ class MusicPlayer:
             if immediate_check:
                 # Immediate check - leave right away
                 print(f"No users in voice channel {channel.name}. Leaving immediately.")
+                ffmpeg_supervisor.clear_active_source(channel.guild.id)
                 await self.voice_client.disconnect()
                 self.voice_client = None
                 self.is_playing = False
                 self.current_song = None
                 self.queue.clear()
+                self.save_state()
 
                 # Send notification message
                 await self._send_leave_notification(channel.name, "all users left")
@@ -638,11 +1201,13 @@ class MusicPlayer:
                 human_members = [member for member in channel.members if not member.bot]
                 if len(human_members) == 0:
                     print(f"Still no users in voice channel. Leaving now.")
+                    ffmpeg_supervisor.clear_active_source(channel.guild.id)
                     await self.voice_client.disconnect()
                     self.voice_client = None
                     self.is_playing = False
                     self.current_song = None
                     self.queue.clear()
+                    self.save_state()
 
                     # Send notification message
                     await self._send_leave_notification(channel.name, "channel remained empty")
@@ -722,8 +1287,7 @@ class MusicPlayer:
             self.is_seeking = True
 
             # Stop current playback first
-            if self.voice_client.is_playing():
-                self.voice_client.stop()
+            self.stop_playback()
 
             # Small delay to ensure clean stop
             await asyncio.sleep(0.1)
@@ -768,8 +1332,7 @@ class MusicPlayer:
             self.is_seeking = True
 
             # Stop current playback first
-            if self.voice_client.is_playing():
-                self.voice_client.stop()
+            self.stop_playback()
 
             # Small delay to ensure clean stop
             await asyncio.sleep(0.1)
@@ -797,20 +1360,27 @@ class MusicPlayer:
             raise Exception("Song URL is empty or invalid")
 
         try:
-            # Get streaming URL from YouTube streamer
-            stream_url = await youtube_streamer.get_stream_url(song.url)
+            # Get streaming URL from YouTube streamer (cached tracks seek locally)
+            stream_url = await self._get_stream_url(song)
 
             if not stream_url:
                 raise Exception("Failed to get stream URL from YouTube")
 
             # Stream audio using YouTube streamer from position
-            success = await youtube_streamer.stream_audio(self.voice_client, stream_url, lambda e: self._after_playing(e), start_time)
+            success = await youtube_streamer.stream_audio(
+                self.voice_client,
+                stream_url,
+                lambda e: self._after_playing(e),
+                start_time,
+                video_id=song.video_id
+            )
 
             if success:
                 self.current_song = song
                 self.is_playing = True
                 self.current_position = start_time
                 self.playback_start_time = time.time()
+                self.save_state()
                 print(f"Successfully started streaming: {song.title if hasattr(song, 'title') else 'Unknown'} from {self.format_time(start_time)}")
             else:
                 raise Exception("Failed to start audio stream")
@@ -829,11 +1399,14 @@ class MusicPlayer:
             await interaction.followup.send("❌ No more songs in queue!", ephemeral=True)
             return
 
+        # In repeat-queue mode a skipped song stays in the rotation
+        if self.loop_mode == 'queue' and self.current_song:
+            self.enqueue(self.current_song)
+
         next_song = self.queue.popleft()
 
         # Stop current song
-        if self.voice_client and self.voice_client.is_playing():
-            self.voice_client.stop()
+        self.stop_playback()
 
         # Play next song
         await self.stream_and_play(interaction, next_song)
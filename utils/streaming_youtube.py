@@ -1,6 +1,52 @@
+import os
 import asyncio
+import re
+import time
 import yt_dlp
-import discord
+
+from .ffmpeg_supervisor import ffmpeg_supervisor, SupervisedFFmpegPCMAudio
+from .audio_scheduler import play_audio
+from .broadcast import broadcast_registry, SHARED_DECODE
+from .audio_cache import audio_cache
+from .track_matching import best_match
+
+def extract_video_id(url):
+    """Extract the YouTube video id from a watch/short/youtu.be URL (None if not a YouTube URL)"""
+    if not url:
+        return None
+    match = re.search(r'(?:v=|youtu\.be/|/shorts/|/embed/)([A-Za-z0-9_-]{11})', url)
+    return match.group(1) if match else None
+
+def extract_playlist_id(url):
+    """Get the playlist id of a YouTube playlist link (None for other URLs and for auto-generated mixes)"""
+    if not url or not re.search(r'(?:youtube\.com|youtu\.be)/', url):
+        return None
+    match = re.search(r'[?&]list=([A-Za-z0-9_-]+)', url)
+    # RD... mixes are generated endlessly around one video; play just that video
+    if not match or match.group(1).startswith('RD'):
+        return None
+    return match.group(1)
+
+def stream_url_expiry(stream_url):
+    """Get the unix time a googlevideo stream URL expires at (None if it carries no expiry)"""
+    if not stream_url:
+        return None
+    match = re.search(r'[?&/]expire[=/](\d+)', stream_url)
+    return int(match.group(1)) if match else None
+
+def is_stream_url_fresh(stream_url, expires_at, margin=300):
+    """Check that a resolved stream URL is still valid for at least `margin` seconds"""
+    if not stream_url:
+        return False
+    if expires_at is None:
+        return True
+    return expires_at - time.time() > margin
+
+# Search results scored when looking for a known track (see utils/track_matching.py)
+SEARCH_CANDIDATES = int(os.getenv('SEARCH_CANDIDATES', '5'))
+
+# FFmpeg input options: reconnect on dropped connections
+FFMPEG_BEFORE_OPTIONS = '-reconnect 1 -reconnect_streamed 1 -reconnect_delay_max 2'
 
 class YouTubeStreamer:
     """Handles YouTube streaming functionality"""
@@ -64,6 +110,73 @@ class YouTubeStreamer:
 
         return None
 
+    async def search_candidates(self, query, limit=SEARCH_CANDIDATES):
+        """Get the top search results without resolving any of them (one flat search call)"""
+        loop = asyncio.get_event_loop()
+        ydl = yt_dlp.YoutubeDL({**self.ydl_opts, 'extract_flat': 'in_playlist'})
+
+        try:
+            info = await loop.run_in_executor(None, lambda: ydl.extract_info(f"ytsearch{limit}:{query}", download=False))
+            return [entry for entry in (info or {}).get('entries') or [] if entry and entry.get('id')]
+        except Exception as e:
+            print(f"Error searching YouTube: {e}")
+            return []
+
+    async def search_best_match(self, query, title, artist=None, duration=None, limit=SEARCH_CANDIDATES):
+        """Search for a known track, score the top results and fully extract only the best one"""
+        candidate = best_match(await self.search_candidates(query, limit), title, artist, duration)
+        if candidate is None:
+            return await self.search_youtube(query)
+        return await self.extract_video(f"https://www.youtube.com/watch?v={candidate['id']}")
+
+    async def extract_video(self, url):
+        """Fully extract one video, returning the same info as search_youtube"""
+        loop = asyncio.get_event_loop()
+        ydl = yt_dlp.YoutubeDL(self.ydl_opts)
+
+        try:
+            video = await loop.run_in_executor(None, lambda: ydl.extract_info(url, download=False))
+            if video:
+                return {
+                    'title': video['title'],
+                    'url': video.get('webpage_url', url),
+                    'duration': video.get('duration', 0),
+                    'thumbnail': video.get('thumbnail'),
+                    'direct_url': video.get('url')
+                }
+        except Exception as e:
+            print(f"Error extracting {url}: {e}")
+
+        return None
+
+    async def extract_playlist(self, playlist_id):
+        """List a playlist's videos without resolving them (one flat extraction instead of one per video)"""
+        loop = asyncio.get_event_loop()
+        ydl = yt_dlp.YoutubeDL({**self.ydl_opts, 'noplaylist': False, 'extract_flat': 'in_playlist'})
+        url = f"https://www.youtube.com/playlist?list={playlist_id}"
+
+        try:
+            info = await loop.run_in_executor(None, lambda: ydl.extract_info(url, download=False))
+        except Exception as e:
+            print(f"Error extracting YouTube playlist: {e}")
+            return None
+        if not info:
+            return None
+
+        entries = []
+        for entry in info.get('entries') or []:
+            # Private and deleted videos stay listed, without a duration
+            if not entry or not entry.get('id') or entry.get('title') in ('[Private video]', '[Deleted video]'):
+                continue
+            thumbnails = entry.get('thumbnails') or []
+            entries.append({
+                'title': entry.get('title') or entry['id'],
+                'url': f"https://www.youtube.com/watch?v={entry['id']}",
+                'duration': entry.get('duration') or 0,
+                'thumbnail': thumbnails[-1]['url'] if thumbnails else None
+            })
+        return {'title': info.get('title') or "YouTube playlist", 'entries': entries}
+
     async def get_stream_url(self, url):
         """Get streaming URL from YouTube video URL"""
         loop = asyncio.get_event_loop()
@@ -80,30 +193,71 @@ class YouTubeStreamer:
 
         return None
 
-    async def stream_audio(self, voice_client, stream_url, after_callback=None, start_time=0, max_retries=3):
-        """Stream audio to Discord voice channel from a specific start time with retry logic"""
+    def _ffmpeg_options(self, start_time=0):
+        """Build FFmpeg output options for streaming from a given position"""
+        # Optimized streaming options for stability
+        # Added options to handle network interruptions and buffering better
+        ffmpeg_options = (
+            '-vn -b:a 128k -bufsize 2048k -probesize 2048k -analyzeduration 5000000 '
+            '-reconnect 1 -reconnect_at_eof 1 -reconnect_streamed 1 -reconnect_delay_max 5 '
+            '-timeout 30000000 -rw_timeout 30000000'  # 30 second timeouts
+        )
+
+        if start_time > 0:
+            ffmpeg_options = f'-ss {start_time} {ffmpeg_options}'
+
+        return ffmpeg_options
+
+    async def stream_audio(self, voice_client, stream_url, after_callback=None, start_time=0, max_retries=3, video_id=None):
+        """Stream audio to Discord voice channel from a specific start time with retry logic
+
+        When a video id is given, a locally cached copy is played if there is one
+        (see utils/audio_cache.py). Otherwise, when playback starts from the beginning,
+        the decode is shared with every other guild playing the same video (see
+        utils/broadcast.py).
+        """
         last_error = None
+        shared = SHARED_DECODE and video_id is not None and start_time == 0
+        guild = getattr(voice_client, 'guild', None)
+        guild_id = guild.id if guild else None
 
         for attempt in range(max_retries):
+            audio_source = None
             try:
-                # Create FFmpeg audio source with optimized streaming options for stability
-                # Added options to handle network interruptions and buffering better
-                ffmpeg_options = (
-                    '-vn -b:a 128k -bufsize 2048k -probesize 2048k -analyzeduration 5000000 '
-                    '-reconnect 1 -reconnect_at_eof 1 -reconnect_streamed 1 -reconnect_delay_max 5 '
-                    '-timeout 30000000 -rw_timeout 30000000'  # 30 second timeouts
-                )
-
-                if start_time > 0:
-                    ffmpeg_options = f'-ss {start_time} {ffmpeg_options}'
+                ffmpeg_options = self._ffmpeg_options(start_time)
 
                 print(f"Attempting to stream audio (attempt {attempt + 1}/{max_retries})")
 
-                audio_source = discord.FFmpegPCMAudio(
-                    stream_url,
-                    options=ffmpeg_options,
-                    before_options='-reconnect 1 -reconnect_streamed 1 -reconnect_delay_max 2'
-                )
+                before_options = FFMPEG_BEFORE_OPTIONS
+
+                cached_source = audio_cache.open_source(video_id, start_time) if video_id else None
+
+                if cached_source:
+                    # Pre-encoded local file: no extraction, network or FFmpeg process needed
+                    audio_source = cached_source
+                elif shared:
+                    # Subscribe to (or start) the node-wide decode of this video
+                    audio_source = await broadcast_registry.subscribe(
+                        video_id,
+                        stream_url,
+                        ffmpeg_options=ffmpeg_options,
+                        before_options=before_options
+                    )
+                else:
+                    # Wait for a free FFmpeg slot so the node never runs more processes than the cap
+                    if not await ffmpeg_supervisor.acquire_slot(timeout=30):
+                        raise Exception("Timed out waiting for a free FFmpeg process slot")
+
+                    try:
+                        audio_source = SupervisedFFmpegPCMAudio(
+                            stream_url,
+                            guild_id=guild_id,
+                            options=ffmpeg_options,
+                            before_options=before_options
+                        )
+                    except Exception:
+                        ffmpeg_supervisor.release_slot()
+                        raise
 
                 # Stop any currently playing audio
                 if voice_client.is_playing():
@@ -112,11 +266,16 @@ class YouTubeStreamer:
                 # Small delay to ensure clean state
                 await asyncio.sleep(0.1)
 
-                # Start streaming the audio
-                if after_callback:
-                    voice_client.play(audio_source, after=after_callback)
-                else:
-                    voice_client.play(audio_source)
+                # Start streaming the audio (thread-per-player or shared scheduler, see AUDIO_ENGINE)
+                play_audio(voice_client, audio_source, after=after_callback)
+
+                # Kill any processes left over from earlier attempts or the previous song
+                ffmpeg_supervisor.set_active_source(guild_id, audio_source)
+                ffmpeg_supervisor.reap_guild(guild_id, keep=audio_source)
+
+                # Count full plays so hot tracks get cached in the background
+                if video_id and start_time == 0:
+                    audio_cache.record_play(video_id)
 
                 print(f"Successfully started audio stream (attempt {attempt + 1})")
                 return True
@@ -125,6 +284,10 @@ class YouTubeStreamer:
                 last_error = e
                 print(f"Stream attempt {attempt + 1} failed: {e}")
 
+                # Don't leave the FFmpeg process of a failed attempt running
+                if audio_source is not None:
+                    audio_source.cleanup()
+
                 # If this isn't the last attempt, wait before retrying
                 if attempt < max_retries - 1:
                     await asyncio.sleep(1)  # Brief pause before retry
@@ -133,5 +296,45 @@ class YouTubeStreamer:
         print(f"All {max_retries} stream attempts failed. Last error: {last_error}")
         return False
 
+    def replay_nowait(self, voice_client, stream_url, after_callback=None, video_id=None):
+        """Restart a track from the beginning without awaiting anything (safe to call from a player thread)
+
+        Tries, in order: the local cache, the still-running shared decode, and a new FFmpeg
+        process on the already resolved stream URL. Returns False if none was available
+        immediately, so the caller can fall back to stream_audio.
+        """
+        guild = getattr(voice_client, 'guild', None)
+        guild_id = guild.id if guild else None
+        audio_source = None
+
+        try:
+            if video_id:
+                audio_source = audio_cache.open_source(video_id)
+            if audio_source is None and SHARED_DECODE and video_id:
+                audio_source = broadcast_registry.subscribe_nowait(video_id)
+            if audio_source is None and stream_url and ffmpeg_supervisor.try_acquire_slot():
+                try:
+                    audio_source = SupervisedFFmpegPCMAudio(
+                        stream_url,
+                        guild_id=guild_id,
+                        options=self._ffmpeg_options(),
+                        before_options=FFMPEG_BEFORE_OPTIONS
+                    )
+                except Exception:
+                    ffmpeg_supervisor.release_slot()
+                    raise
+            if audio_source is None:
+                return False
+
+            play_audio(voice_client, audio_source, after=after_callback)
+            ffmpeg_supervisor.set_active_source(guild_id, audio_source)
+            return True
+
+        except Exception as e:
+            print(f"Immediate replay failed: {e}")
+            if audio_source is not None:
+                audio_source.cleanup()
+            return False
+
 # Create global YouTube streamer instance
 youtube_streamer = YouTubeStreamer()
\ No newline at end of file
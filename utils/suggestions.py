@@ -0,0 +1,382 @@
+"""
+Play Suggestions
+
+/play autocomplete has to answer within Discord's 3 second window while the
+user is still typing, which a live YouTube search can't do. Suggestions come
+from an in-memory index instead:
+- built from songs played, per guild and globally, and from recent search
+  results (which start with no plays)
+- title words are kept in a sorted list, so the titles with a word starting
+  with what was typed are found by bisection; every typed word must prefix
+  some word of the title
+- title words are also indexed by trigram, a fallback for typos
+- matches are ranked by plays in the guild asking, then plays overall; played
+  songs are kept in that order (a play moves just that song, by bisection),
+  so when a prefix matches too many titles to rank them all, the order is
+  walked until enough matches are found
+- at most SUGGESTIONS_MAX_ENTRIES songs are kept: the oldest search results
+  are dropped first, then the least played songs, whose history is deleted
+Play counts are kept in SQLite so the index is rebuilt after a restart; the
+database is only touched from the default executor.
+"""
+
+import os
+import time
+import asyncio
+import sqlite3
+import threading
+import heapq
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from itertools import chain
+
+from .track_matching import normalize
+
+SUGGESTIONS_DB = os.getenv(  # Relative to the repository root, not the working directory
+    'SUGGESTIONS_DB',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'play_history.db')
+)
+SUGGESTIONS_MAX_ENTRIES = int(os.getenv('SUGGESTIONS_MAX_ENTRIES', '20000'))  # Search results go first, then the least played
+SUGGESTION_LIMIT = 25  # Most choices Discord shows
+CHOICE_MAX_LENGTH = 100  # Discord limit for choice names and values
+RANK_ALL_LIMIT = 256  # Prefix matches up to which all are ranked; above it the play order is walked
+TRIGRAM_MIN_OVERLAP = 0.6  # Share of the typed text's trigrams a fuzzy match must have
+FUZZY_MAX_CANDIDATES = 10000  # The typo fallback is skipped when it would have to check more titles
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS plays (
+    guild_id INTEGER NOT NULL,
+    key TEXT NOT NULL,
+    title TEXT NOT NULL,
+    value TEXT NOT NULL,
+    plays INTEGER NOT NULL,
+    last_played REAL NOT NULL,
+    PRIMARY KEY (guild_id, key)
+);
+"""
+
+def trigrams(text):
+    """Character trigrams of the words of normalized text, each word padded like "  word " """
+    return {
+        padded[i:i + 3]
+        for padded in (f"  {word} " for word in text.split())
+        for i in range(len(padded) - 2)
+    }
+
+class SuggestionIndex:
+    """Prefix and trigram index over played and searched songs"""
+
+    def __init__(self, path=SUGGESTIONS_DB, max_entries=SUGGESTIONS_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.entries = {}  # key -> {'title', 'value', 'words', 'plays', 'guild_plays': {guild_id: plays}}
+        self._words = []  # Sorted (word, key) pairs of every title
+        self._trigrams = {}  # trigram -> keys of titles containing it
+        self._ranked = []  # Sorted (-plays, -last_played, key) of played songs: most played first
+        self._guild_ranked = {}  # guild_id -> sorted (-guild plays, -plays, key) of songs played there
+        self._unplayed = OrderedDict()  # Keys only known from searches, oldest first
+        self._connection = None
+        self._db_lock = threading.Lock()
+        self.lookups = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+
+    # Building the index
+
+    def _add(self, key, title, value, keep_sorted=True):
+        """Get the entry for key, indexing its title if it is new"""
+        entry = self.entries.get(key)
+        if entry is not None:
+            return entry
+
+        text = normalize(title)
+        entry = {'title': title, 'value': value, 'words': tuple(set(text.split())),
+                 'plays': 0, 'last_played': 0, 'guild_plays': {}}
+        self.entries[key] = entry
+        for word in entry['words']:
+            if keep_sorted:
+                insort(self._words, (word, key))
+            else:
+                self._words.append((word, key))
+        for trigram in trigrams(text):
+            self._trigrams.setdefault(trigram, set()).add(key)
+        return entry
+
+    def _remove(self, key):
+        entry = self.entries.pop(key)
+        for word in entry['words']:
+            i = bisect_left(self._words, (word, key))
+            if i < len(self._words) and self._words[i] == (word, key):
+                del self._words[i]
+        for trigram in trigrams(normalize(entry['title'])):
+            keys = self._trigrams.get(trigram)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._trigrams[trigram]
+
+    def _evict(self):
+        """Drop the oldest search results, then the least (and least recently) played songs,
+        until the index is within max_entries. Returns the played keys that were dropped."""
+        forgotten = []
+        while len(self.entries) > self.max_entries:
+            if self._unplayed:
+                key, _ = self._unplayed.popitem(last=False)
+            elif self._ranked:
+                key = self._ranked.pop()[-1]
+                entry = self.entries[key]
+                for guild_id, guild_plays in entry['guild_plays'].items():
+                    ranking = self._guild_ranked[guild_id]
+                    del ranking[bisect_left(ranking, (-guild_plays, -entry['plays'], key))]
+                    if not ranking:
+                        del self._guild_ranked[guild_id]
+                forgotten.append(key)
+            else:
+                break
+            self._remove(key)
+        return forgotten
+
+    @staticmethod
+    def _move(ranking, old, new):
+        """Replace one sort key in a sorted ranking list, in O(log n) comparisons"""
+        if old is not None:
+            del ranking[bisect_left(ranking, old)]
+        insort(ranking, new)
+
+    def _count_play(self, key, title, value, guild_id, plays=1, last_played=None, keep_sorted=True):
+        """Add plays to a song. With keep_sorted=False the caller rebuilds the rankings afterwards."""
+        entry = self._add(key, title, value, keep_sorted)
+        self._unplayed.pop(key, None)
+        old_plays, old_last = entry['plays'], entry['last_played']
+        entry['plays'] += plays
+        entry['last_played'] = max(old_last, time.time() if last_played is None else last_played)
+        if guild_id is not None:
+            entry['guild_plays'][guild_id] = entry['guild_plays'].get(guild_id, 0) + plays
+        if not keep_sorted:
+            return entry
+
+        # Reposition just this song: overall, and in every guild that played it (their ties break on overall plays)
+        self._move(self._ranked, (-old_plays, -old_last, key) if old_plays else None,
+                   (-entry['plays'], -entry['last_played'], key))
+        for played_in, guild_plays in entry['guild_plays'].items():
+            before = guild_plays - plays if played_in == guild_id else guild_plays
+            self._move(self._guild_ranked.setdefault(played_in, []),
+                       (-before, -old_plays, key) if before else None,
+                       (-guild_plays, -entry['plays'], key))
+        return entry
+
+    def _rebuild_rankings(self):
+        """Sort every ranking from scratch (after a bulk load)"""
+        self._ranked = sorted((-entry['plays'], -entry['last_played'], key)
+                              for key, entry in self.entries.items() if entry['plays'])
+        self._guild_ranked = {}
+        for key, entry in self.entries.items():
+            for guild_id, guild_plays in entry['guild_plays'].items():
+                self._guild_ranked.setdefault(guild_id, []).append((-guild_plays, -entry['plays'], key))
+        for ranking in self._guild_ranked.values():
+            ranking.sort()
+
+    def record_play(self, song, guild_id=None):
+        """Count a song that started playing"""
+        key = song.video_id or song.url
+        if not key or not song.title:
+            return
+        # The choice value is fed back into /play as the query, so it must fit Discord's limit
+        value = song.url if song.url and len(song.url) <= CHOICE_MAX_LENGTH else song.title[:CHOICE_MAX_LENGTH]
+        self._count_play(key, song.title, value, guild_id)
+        forgotten = self._evict()
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None  # Called outside the event loop
+        for write, args in ((self._store, (guild_id, key, song.title, value)), (self._forget, (forgotten,))):
+            if loop:
+                loop.run_in_executor(None, write, *args)
+            else:
+                write(*args)
+
+    def add_result(self, title, url, key=None):
+        """Make a search result suggestible before anyone plays it"""
+        key = key or url
+        if not key or not title or not url or len(url) > CHOICE_MAX_LENGTH:
+            return
+        if key in self.entries:
+            if key in self._unplayed:
+                self._unplayed.move_to_end(key)
+            return
+        self._add(key, title, url)
+        self._unplayed[key] = True
+        self._evict()
+
+    def add_results(self, results):
+        """Index flat search results ({'id', 'title'} entries)"""
+        for result in results:
+            if result.get('id') and result.get('title'):
+                self.add_result(result['title'], f"https://www.youtube.com/watch?v={result['id']}", result['id'])
+
+    # Lookups
+
+    def _rank(self, guild_id):
+        entries = self.entries
+        return lambda key: (entries[key]['guild_plays'].get(guild_id, 0), entries[key]['plays'])
+
+    def _walk(self, guild_id, limit, accept=None, played_only=False):
+        """The first keys accept() takes, in rank order: the guild's most played, the most played
+        overall, then search results, newest first"""
+        order = (ranked[-1] for ranked in chain(self._guild_ranked.get(guild_id, ()), self._ranked))
+        if not played_only:
+            order = chain(order, reversed(self._unplayed))
+        found, seen = [], set()
+        for key in order:
+            if key not in seen and (accept is None or accept(key)):
+                seen.add(key)
+                found.append(key)
+                if len(found) == limit:
+                    break
+        return found
+
+    def _prefix_matches(self, words, guild_id, limit):
+        """Best ranked titles where every typed word prefixes some title word"""
+        ranges = sorted(
+            ((word, bisect_left(self._words, (word,)), bisect_left(self._words, (word + '\U0010ffff',))) for word in words),
+            key=lambda found: found[2] - found[1]
+        )
+        # Intersect the titles matching each word, fewest first, until few enough are left to check one by one
+        candidates = None
+        others = []
+        for word, start, stop in ranges:
+            if candidates is not None and len(candidates) <= RANK_ALL_LIMIT:
+                others.append(word)
+                continue
+            keys = {key for _, key in self._words[start:stop]}
+            candidates = keys if candidates is None else candidates & keys
+
+        def accept(key):
+            if key not in candidates:
+                return False
+            title_words = self.entries[key]['words']
+            return all(any(title_word.startswith(word) for title_word in title_words) for word in others)
+
+        if len(candidates) <= RANK_ALL_LIMIT:
+            return heapq.nlargest(limit, filter(accept, candidates), key=self._rank(guild_id))
+        return self._walk(guild_id, limit, accept)
+
+    def _fuzzy_matches(self, text, guild_id, limit, exclude):
+        """Best ranked titles sharing at least TRIGRAM_MIN_OVERLAP of the typed text's trigrams"""
+        wanted = trigrams(text)
+        needed = max(1, int(len(wanted) * TRIGRAM_MIN_OVERLAP))
+        postings = sorted((self._trigrams.get(trigram, ()) for trigram in wanted), key=len)
+        # A match lacks at most len(wanted) - needed trigrams, so it has one of the rarest len(wanted) - needed + 1
+        rarest = postings[:len(wanted) - needed + 1]
+        if sum(map(len, rarest)) > FUZZY_MAX_CANDIDATES:
+            return []
+        candidates = set().union(*rarest) - exclude
+
+        def accept(key):
+            return key in candidates and sum(key in keys for keys in postings) >= needed
+
+        if len(candidates) <= RANK_ALL_LIMIT:
+            return heapq.nlargest(limit, filter(accept, candidates), key=self._rank(guild_id))
+        return self._walk(guild_id, limit, accept)
+
+    def suggest(self, text, guild_id=None, limit=SUGGESTION_LIMIT):
+        """Best matches for what the user typed so far, as [{'title', 'value', 'plays'}]"""
+        started = time.perf_counter()
+        text = normalize(text)
+
+        if not text:
+            # Nothing typed yet: the most played songs
+            keys = self._walk(guild_id, limit, played_only=True)
+        else:
+            keys = self._prefix_matches(text.split(), guild_id, limit)
+            if len(keys) < limit and len(text) >= 3:
+                keys += self._fuzzy_matches(text, guild_id, limit - len(keys), set(keys))
+
+        elapsed = time.perf_counter() - started
+        self.lookups += 1
+        self.total_time += elapsed
+        self.max_time = max(self.max_time, elapsed)
+        return [
+            {'title': self.entries[key]['title'], 'value': self.entries[key]['value'], 'plays': self.entries[key]['plays']}
+            for key in keys
+        ]
+
+    # SQLite (executor threads only, except load)
+
+    def _connect(self):
+        if self._connection is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._connection = sqlite3.connect(self.path, check_same_thread=False)
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.executescript(_SCHEMA)
+        return self._connection
+
+    def _read(self):
+        with self._db_lock:
+            try:
+                return self._connect().execute('SELECT guild_id, key, title, value, plays, last_played FROM plays').fetchall()
+            except sqlite3.Error as e:
+                print(f"Failed to read play history: {e}")
+                return []
+
+    def _store(self, guild_id, key, title, value):
+        with self._db_lock:
+            try:
+                connection = self._connect()
+                with connection:
+                    connection.execute(
+                        'INSERT INTO plays (guild_id, key, title, value, plays, last_played) VALUES (?, ?, ?, ?, 1, ?) '
+                        'ON CONFLICT (guild_id, key) DO UPDATE SET title = excluded.title, value = excluded.value, '
+                        'plays = plays + 1, last_played = excluded.last_played',
+                        (guild_id or 0, key, title, value, time.time())
+                    )
+            except sqlite3.Error as e:
+                print(f"Failed to write play history: {e}")
+
+    def _forget(self, keys):
+        """Delete the play history of songs evicted from the index"""
+        if not keys:
+            return
+        with self._db_lock:
+            try:
+                connection = self._connect()
+                with connection:
+                    connection.executemany('DELETE FROM plays WHERE key = ?', [(key,) for key in keys])
+            except sqlite3.Error as e:
+                print(f"Failed to delete play history: {e}")
+
+    async def load(self):
+        """Rebuild the index from the saved play history"""
+        loop = asyncio.get_running_loop()
+        rows = await loop.run_in_executor(None, self._read)
+        for guild_id, key, title, value, plays, last_played in rows:
+            self._count_play(key, title, value, guild_id or None, plays, last_played, keep_sorted=False)
+        self._words.sort()  # Once, instead of an insertion per title
+        self._rebuild_rankings()
+        forgotten = self._evict()  # The history may predate a lower SUGGESTIONS_MAX_ENTRIES
+        if forgotten:
+            await loop.run_in_executor(None, self._forget, forgotten)
+        print(f"Loaded {len(rows)} play history entries for suggestions")
+
+    def close(self):
+        with self._db_lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def get_stats(self):
+        """Get index size and lookup times"""
+        return {
+            'entries': len(self.entries),
+            'unplayed': len(self._unplayed),
+            'words': len(self._words),
+            'trigrams': len(self._trigrams),
+            'lookups': self.lookups,
+            'avg_ms': self.total_time / self.lookups * 1000 if self.lookups else 0.0,
+            'max_ms': self.max_time * 1000
+        }
+
+# Create global suggestion index instance
+suggestion_index = SuggestionIndex()
@@ -0,0 +1,118 @@
+"""
+Spotify to YouTube Track Mapping
+
+Playing a Spotify track means searching YouTube for it, which is slow and
+may pick a different upload each time. Once a track has been matched, the
+match is kept in SQLite:
+- keyed by Spotify track id, with the ISRC as a second key, so the same
+  recording on another album or single is found too
+- shared by the bot and backend/app.py through the same database file, so a
+  track matched by either one never needs a YouTube search again
+This module only uses the standard library, so the backend can import it
+without the bot's dependencies. Calls block on SQLite: run them in an
+executor from async code.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+
+# Anchored at the repository root, so the bot and the backend open the same file whatever their working directory
+TRACK_MAPPING_DB = os.getenv(
+    'TRACK_MAPPING_DB',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'track_mapping.db')
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS track_mappings (
+    spotify_id TEXT PRIMARY KEY,
+    isrc TEXT,
+    video_id TEXT NOT NULL,
+    title TEXT,
+    duration INTEGER,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS track_mappings_isrc ON track_mappings (isrc);
+"""
+
+class TrackMapping:
+    """Persistent Spotify track id / ISRC -> YouTube video id map"""
+
+    def __init__(self, path=TRACK_MAPPING_DB):
+        self.path = path
+        self._connection = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _connect(self):
+        if self._connection is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._connection = sqlite3.connect(self.path, check_same_thread=False, timeout=5)
+            self._connection.execute('PRAGMA journal_mode=WAL')  # The other process may be reading
+            self._connection.executescript(_SCHEMA)
+        return self._connection
+
+    def lookup(self, spotify_id=None, isrc=None):
+        """Get the mapped video as {'video_id', 'title', 'duration'}, by track id first, then ISRC; None if unmapped"""
+        with self._lock:
+            try:
+                connection = self._connect()
+                row = None
+                if spotify_id:
+                    row = connection.execute(
+                        'SELECT video_id, title, duration FROM track_mappings WHERE spotify_id = ?', (spotify_id,)
+                    ).fetchone()
+                if row is None and isrc:
+                    row = connection.execute(
+                        'SELECT video_id, title, duration FROM track_mappings WHERE isrc = ? ORDER BY updated_at DESC LIMIT 1',
+                        (isrc,)
+                    ).fetchone()
+            except (sqlite3.Error, OSError) as e:
+                # e.g. a read-only deploy: fall back to searching
+                print(f"Failed to read track mapping: {e}")
+                row = None
+
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return {'video_id': row[0], 'title': row[1], 'duration': row[2]}
+
+    def store(self, spotify_id, video_id, isrc=None, title=None, duration=None):
+        """Remember which video a Spotify track was matched to"""
+        if not spotify_id or not video_id:
+            return
+        with self._lock:
+            try:
+                connection = self._connect()
+                with connection:
+                    # Keep a known ISRC when the caller doesn't have one (e.g. oEmbed lookups)
+                    connection.execute(
+                        'INSERT INTO track_mappings (spotify_id, isrc, video_id, title, duration, updated_at) '
+                        'VALUES (?, ?, ?, ?, ?, ?) '
+                        'ON CONFLICT (spotify_id) DO UPDATE SET isrc = COALESCE(excluded.isrc, isrc), '
+                        'video_id = excluded.video_id, title = excluded.title, duration = excluded.duration, '
+                        'updated_at = excluded.updated_at',
+                        (spotify_id, isrc, video_id, title, int(duration) if duration else None, time.time())
+                    )
+            except (sqlite3.Error, OSError) as e:
+                print(f"Failed to write track mapping: {e}")
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def get_stats(self):
+        """Get lookup hit rate"""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
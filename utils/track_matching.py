@@ -0,0 +1,66 @@
+"""
+Track Matching
+
+The first YouTube search hit for "{title} {artist}" is often a live version,
+a lyric video with a long intro or a one-hour loop. When the track is known
+(e.g. from Spotify), search candidates are scored instead:
+- title similarity on normalized strings (case, punctuation and bracketed
+  "(Official Video)"-style suffixes removed), using difflib
+- a bonus when the artist appears in the video title or channel name
+- a penalty growing with the difference from the known duration
+- a penalty for versions the track title doesn't ask for (live, cover,
+  remix, sped up, 1 hour, ...)
+"""
+
+import re
+from difflib import SequenceMatcher
+
+# Words marking a different version of a song, penalized unless the wanted title has them too
+UNWANTED_VERSIONS = (
+    'live', 'cover', 'karaoke', 'instrumental', 'remix', 'acoustic', 'sped up', 'slowed',
+    'nightcore', 'reverb', '8d', 'hour', 'loop', 'reaction', 'tutorial', 'lesson'
+)
+
+def normalize(text):
+    """Lowercase, drop bracketed parts and punctuation, collapse whitespace"""
+    text = re.sub(r'[\(\[][^\)\]]*[\)\]]', ' ', (text or '').lower())
+    text = re.sub(r'[^\w\s]', ' ', text)
+    return ' '.join(text.split())
+
+def similarity(a, b):
+    return SequenceMatcher(None, a, b).ratio()
+
+def match_score(candidate, title, artist=None, duration=None):
+    """Score a search result against the wanted track; higher is better"""
+    wanted_title = normalize(title)
+    wanted_artist = normalize(artist)
+    candidate_title = normalize(candidate.get('title'))
+    raw_title = (candidate.get('title') or '').lower()
+    channel = normalize(candidate.get('channel') or candidate.get('uploader'))
+
+    # Uploads are titled "Artist - Title" or just "Title" (e.g. on "Artist - Topic" channels)
+    score = max(
+        similarity(wanted_title, candidate_title),
+        similarity(f"{wanted_artist} {wanted_title}".strip(), candidate_title)
+    )
+
+    if wanted_artist and (wanted_artist in candidate_title or wanted_artist in channel):
+        score += 0.2
+
+    candidate_duration = candidate.get('duration')
+    if duration and candidate_duration:
+        difference = abs(candidate_duration - duration)
+        if difference <= 3:
+            score += 0.1
+        score -= min(difference / duration, 1.0)
+
+    wanted_raw = (title or '').lower()
+    for word in UNWANTED_VERSIONS:
+        if re.search(rf'\b{word}\b', raw_title) and not re.search(rf'\b{word}\b', wanted_raw):
+            score -= 0.3
+
+    return score
+
+def best_match(candidates, title, artist=None, duration=None):
+    """Pick the best scoring candidate (None if there are none)"""
+    return max(candidates, key=lambda candidate: match_score(candidate, title, artist, duration), default=None)